@@ -8,10 +8,11 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from core.config import settings
 from core.db_connection.database import Base
-from core.models.user import User #noqa
+from core.models.user import User, RevokedToken #noqa
 from core.models.budgets import Category #noqa
-from core.models.currencies import Currency #noqa
+from core.models.currencies import Currency, CurrencyRate #noqa
 from core.models.transactions import Transactions, TransactionsType #noqa
+from core.models.daily_balances import DailyBalance #noqa
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
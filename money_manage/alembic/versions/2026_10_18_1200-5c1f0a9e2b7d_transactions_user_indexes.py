@@ -0,0 +1,49 @@
+"""transactions user indexes
+
+Revision ID: 5c1f0a9e2b7d
+Revises: 7eab8d9095c1
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1f0a9e2b7d"
+down_revision: Union[str, None] = "7eab8d9095c1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps transactions writable while the indexes build; it cannot
+    # run inside a transaction, hence the autocommit block.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transactions_user_id_date_id",
+            "transactions",
+            ["user_id", sa.text("date DESC"), "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_transactions_user_id_category_id_date",
+            "transactions",
+            ["user_id", "category_id", "date"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_transactions_user_id_category_id_date", table_name="transactions",
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_transactions_user_id_date_id", table_name="transactions",
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,59 @@
+"""daily balances
+
+Revision ID: 9a4d2e61c8b3
+Revises: 5c1f0a9e2b7d
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4d2e61c8b3"
+down_revision: Union[str, None] = "5c1f0a9e2b7d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "daily_balances",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("transaction_type_id", sa.Integer(), nullable=False),
+        sa.Column("currency_id", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.DECIMAL(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"]),
+        sa.ForeignKeyConstraint(["currency_id"], ["currencies.id"]),
+        sa.ForeignKeyConstraint(["transaction_type_id"], ["transactions_type.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id", "date", "category_id", "transaction_type_id", "currency_id",
+            name="uq_daily_balances_key",
+        ),
+    )
+    # Let in-flight writes commit before the backfill reads, and hold new ones until the
+    # migration commits, so no transaction is left out of the rollup.
+    op.execute("LOCK TABLE transactions IN SHARE MODE")
+    op.execute(
+        """
+        INSERT INTO daily_balances (user_id, date, category_id, transaction_type_id, currency_id, amount, count)
+        SELECT user_id, date, category_id, transaction_type_id, currency_id, sum(amount), count(*)
+        FROM transactions
+        GROUP BY user_id, date, category_id, transaction_type_id, currency_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("daily_balances")
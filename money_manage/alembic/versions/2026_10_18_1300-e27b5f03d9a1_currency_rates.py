@@ -0,0 +1,42 @@
+"""currency rates
+
+Revision ID: e27b5f03d9a1
+Revises: 9a4d2e61c8b3
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e27b5f03d9a1"
+down_revision: Union[str, None] = "9a4d2e61c8b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "currency_rates",
+        sa.Column("currency_id", sa.Integer(), nullable=False),
+        sa.Column("valid_from", sa.Date(), nullable=False),
+        sa.Column("rate", sa.DECIMAL(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["currency_id"], ["currencies.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "currency_id", "valid_from",
+            name="uq_currency_rates_currency_id_valid_from",
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("currency_rates")
@@ -0,0 +1,103 @@
+"""transactions description search
+
+Revision ID: 4b8e6d2f1a70
+Revises: e27b5f03d9a1
+Create Date: 2026-10-18 13:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4b8e6d2f1a70"
+down_revision: Union[str, None] = "e27b5f03d9a1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows per backfill UPDATE; each batch commits on its own so row locks stay short.
+BACKFILL_BATCH = 10000
+
+
+def _available_extensions() -> set[str]:
+    rows = op.get_bind().execute(sa.text(
+        "SELECT name FROM pg_available_extensions WHERE name IN ('pg_trgm', 'btree_gin')"
+    ))
+    return {name for (name,) in rows}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Both extensions are contrib modules that some installs leave out. Without btree_gin
+    # the GIN index cannot lead with user_id; without pg_trgm there is no trigram index
+    # and substring search falls back to scanning the user's rows.
+    extensions = _available_extensions()
+    for extension in sorted(extensions):
+        op.execute(f"CREATE EXTENSION IF NOT EXISTS {extension}")
+
+    # A plain nullable column is a catalog-only change. A STORED generated column would
+    # rewrite the whole table under an ACCESS EXCLUSIVE lock instead.
+    op.add_column("transactions", sa.Column("description_tsv", postgresql.TSVECTOR(), nullable=True))
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION transactions_description_tsv() RETURNS trigger AS $$
+        BEGIN
+            NEW.description_tsv := to_tsvector('simple', coalesce(NEW.description, ''));
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER trg_transactions_description_tsv "
+        "BEFORE INSERT OR UPDATE OF description ON transactions "
+        "FOR EACH ROW EXECUTE FUNCTION transactions_description_tsv()"
+    )
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        last_id = bind.execute(sa.text("SELECT coalesce(max(id), 0) FROM transactions")).scalar()
+        for low in range(0, last_id, BACKFILL_BATCH):
+            bind.execute(
+                sa.text(
+                    "UPDATE transactions SET description_tsv = to_tsvector('simple', coalesce(description, '')) "
+                    "WHERE id > :low AND id <= :high AND description_tsv IS NULL"
+                ),
+                {"low": low, "high": low + BACKFILL_BATCH},
+            )
+
+        op.create_index(
+            "ix_transactions_user_id_description_tsv",
+            "transactions",
+            ["user_id", "description_tsv"] if "btree_gin" in extensions else ["description_tsv"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        if "pg_trgm" in extensions:
+            op.create_index(
+                "ix_transactions_user_id_description_trgm",
+                "transactions",
+                ["user_id", "description"] if "btree_gin" in extensions else ["description"],
+                postgresql_using="gin",
+                postgresql_ops={"description": "gin_trgm_ops"},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_transactions_user_id_description_trgm", table_name="transactions",
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_transactions_user_id_description_tsv", table_name="transactions",
+                      postgresql_concurrently=True, if_exists=True)
+    op.execute("DROP TRIGGER IF EXISTS trg_transactions_description_tsv ON transactions")
+    op.execute("DROP FUNCTION IF EXISTS transactions_description_tsv()")
+    op.drop_column("transactions", "description_tsv")
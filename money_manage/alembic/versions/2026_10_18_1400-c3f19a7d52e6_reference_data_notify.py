@@ -0,0 +1,47 @@
+"""reference data notify
+
+Revision ID: c3f19a7d52e6
+Revises: 4b8e6d2f1a70
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f19a7d52e6"
+down_revision: Union[str, None] = "4b8e6d2f1a70"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REFERENCE_TABLES = ("categories", "currencies", "transactions_type")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_reference_data_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('reference_data_changed', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in REFERENCE_TABLES:
+        op.execute(
+            f"CREATE TRIGGER trg_{table}_reference_data_changed "
+            f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION notify_reference_data_changed()"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in REFERENCE_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_reference_data_changed ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS notify_reference_data_changed()")
@@ -0,0 +1,32 @@
+"""users transactions version
+
+Revision ID: f8a24c6e1b93
+Revises: c3f19a7d52e6
+Create Date: 2026-10-18 14:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f8a24c6e1b93"
+down_revision: Union[str, None] = "c3f19a7d52e6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column("transactions_version", sa.BigInteger(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "transactions_version")
@@ -1,23 +1,43 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import partial
+
 import jwt
 from fastapi import Cookie, HTTPException, APIRouter, Request, Depends
 from fastapi.params import Depends, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.responses import JSONResponse
 
-from api.api_v1.auth.helpers import create_access_token, create_refresh_token
-from api.api_v1.auth.utils import validate_password, decode_jwt
-from core.db_connection.db_helper import db_helper
+from api.api_v1.auth.helpers import create_access_token, create_refresh_token, create_access_token_for
+from api.api_v1.auth.utils import validate_password_async, decode_jwt_cached
+from core.cache import TTLCache
+from core.config import Lazy, settings
+from core.db_connection.db_helper import db_helper, read_session_getter, session_getter
 from core.exceptions import TokenExpiredException, TokenInvalidException
 from core.models.user import User
 from core.schemas.user import UserOut, UserForm
-from crud.user import get_user, add_user_in_db
+from crud.user import get_user, add_user_in_db, get_cached_user_id, cache_user_id, user_cache, MISSING_USER, \
+    revoke_token_db, is_token_revoked_db
 
 router = APIRouter(prefix="/auth",
     tags=["auth"],)
 
-async def authenticate_user(password: str, session: AsyncSession, username: str | None = None):
+async def get_user_for_read(session: AsyncSession, username: str) -> User | None:
+    """
+    `get_user` on a read session. A miss on a replica is retried on the primary,
+    since a user who just registered may not have been replicated yet.
+    """
     user = await get_user(username=username, session=session)
-    if user and validate_password(password, user.password):
+    if user is None and session.info.get("replica"):
+        async with db_helper.session_getter_md() as primary_session:
+            user = await get_user(username=username, session=primary_session)
+    return user
+
+async def authenticate_user(password: str, session: AsyncSession, username: str | None = None):
+    user = await get_user_for_read(session=session, username=username)
+    if user and await validate_password_async(password, user.password):
         return user
     else:
         return None
@@ -25,18 +45,18 @@ async def authenticate_user(password: str, session: AsyncSession, username: str
 
 async def get_current_user(
         token: str = Cookie(default=None, alias="access_token"),
-        session: AsyncSession = Depends(db_helper.session_getter)
+        session: AsyncSession = Depends(read_session_getter)
 ):
     if token is None:
         raise HTTPException(status_code=401, detail="No access token provided")
 
     try:
-        payload = decode_jwt(token)
+        payload = decode_jwt_cached(token)
         username = payload.get("username")
         if username is None:
             raise HTTPException(status_code=401, detail="Invalid token")
 
-        user = await get_user(username=username, session=session)
+        user = await get_user_for_read(session=session, username=username)
         if user is None:
             raise HTTPException(status_code=401, detail="User not found")
         return user
@@ -48,7 +68,7 @@ async def get_current_user(
 
 
 @router.post("/login")
-async def login(username: str = Form(), password: str = Form(), session: AsyncSession = Depends(db_helper.session_getter)):
+async def login(username: str = Form(), password: str = Form(), session: AsyncSession = Depends(read_session_getter)):
     """
             Login user
     """
@@ -63,35 +83,114 @@ async def login(username: str = Form(), password: str = Form(), session: AsyncSe
     response.set_cookie(key="refresh_token", value=refresh_token, httponly=True, secure=True)
     return response
 
-async def refresh_token(refresh_token: str, session: AsyncSession):
-    if refresh_token is None:
-        raise TokenExpiredException("Refresh token is missing")
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+async def _check_not_revoked(key: str) -> None:
+    """
+    With Redis every worker sees the revocations in the cache, so nothing else is checked.
+    The per-process cache only knows this worker's revocations; the database is asked
+    then, and a "not revoked" answer is trusted for `revocation_check_seconds`.
+    """
+    if await user_cache.get(f"revoked:{key}"):
+        raise TokenInvalidException("Refresh token has been revoked")
+    if user_cache.shared or await user_cache.get(f"not_revoked:{key}"):
+        return
+    async with db_helper.session_getter_md() as session:
+        if await is_token_revoked_db(session, key):
+            await user_cache.set(f"revoked:{key}", "1", ttl=settings.cache.revocation_check_seconds)
+            raise TokenInvalidException("Refresh token has been revoked")
+    await user_cache.set(f"not_revoked:{key}", "1", ttl=settings.cache.revocation_check_seconds)
+
+async def _issue_access_token(refresh_token: str) -> str:
     try:
-        payload = decode_jwt(refresh_token)
-        username = payload.get("username")
+        payload = decode_jwt_cached(refresh_token)
+    except jwt.ExpiredSignatureError:
+        raise TokenExpiredException("Refresh token has expired")
+    except jwt.InvalidTokenError:
+        raise TokenInvalidException("Invalid refresh token")
 
-        if username is None:
-            raise TokenInvalidException("Invalid refresh token")
+    username = payload.get("username")
+    if username is None:
+        raise TokenInvalidException("Invalid refresh token")
+
+    user_id = await get_cached_user_id(username)
+    if user_id is None:
+        async with db_helper.read_session_getter_md() as session:
+            user = await get_user_for_read(session=session, username=username)
+        user_id = user.id if user else None
+        await cache_user_id(username, user_id)
+    if user_id is None or user_id == MISSING_USER:
+        raise TokenInvalidException("User not found")
+
+    return create_access_token_for(user_id=user_id, username=username)
 
-        user = await get_user(username=username, session=session)
-        if not user:
-            raise TokenInvalidException("User not found")
 
-        access_token = create_access_token(user)
+# Access tokens recently issued per refresh token, and reissues in progress. Concurrent requests
+# carrying the same expired access token share one reissue instead of each doing their own.
+_reissued_tokens = Lazy(lambda: TTLCache(maxsize=settings.cache.size, ttl=settings.cache.reissue_ttl_seconds))
+_reissue_in_flight: dict[str, asyncio.Future] = {}
 
+async def refresh_token(refresh_token: str) -> str:
+    if refresh_token is None:
+        raise TokenExpiredException("Refresh token is missing")
+
+    key = _token_key(refresh_token)
+    # A logout on this worker drops the token from the reissue cache, and the entries only live
+    # for `reissue_ttl_seconds`, so a hit skips the revocation check.
+    access_token = _reissued_tokens.get(key)
+    if access_token is not None:
         return access_token
+    await _check_not_revoked(key)
 
-    except jwt.ExpiredSignatureError:
-        raise TokenExpiredException("Refresh token has expired")
+    task = _reissue_in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_issue_access_token(refresh_token))
+        _reissue_in_flight[key] = task
+        task.add_done_callback(partial(_reissue_done, key))
+
+    return await asyncio.shield(task)
+
+def _reissue_done(key: str, task: asyncio.Future):
+    _reissue_in_flight.pop(key, None)
+    if not task.cancelled() and task.exception() is None:
+        _reissued_tokens.set(key, task.result())
+
+async def revoke_refresh_token(refresh_token: str) -> None:
+    try:
+        payload = decode_jwt_cached(refresh_token)
     except jwt.InvalidTokenError:
-        raise TokenInvalidException("Invalid refresh token")
+        return
+    key = _token_key(refresh_token)
+    # Kept until the token would have expired anyway. Workers without Redis look in the database.
+    if not user_cache.shared:
+        async with db_helper.session_getter_md() as session:
+            await revoke_token_db(session, key,
+                                  datetime.fromtimestamp(payload["exp"], timezone.utc).replace(tzinfo=None))
+        await user_cache.delete(f"not_revoked:{key}")
+    _reissued_tokens.pop(key)
+    await user_cache.set(f"revoked:{key}", "1", ttl=payload["exp"] - time.time())
+
+@router.post("/logout")
+async def logout(request: Request):
+    """
+            Logout user. The refresh token stays revoked until it expires.
+    """
+    refr_token = request.cookies.get("refresh_token")
+    if refr_token:
+        await revoke_refresh_token(refr_token)
+
+    response = JSONResponse(content={"message": "Logged out"})
+    response.delete_cookie("access_token", httponly=True, secure=True)
+    response.delete_cookie("refresh_token", httponly=True, secure=True)
+    return response
 
 @router.get("/protected")
 async def protected_route(current_user: User = Depends(get_current_user)):
     return {"message": f"Hello, {current_user.username}"}
 
 @router.post("/register", response_model=UserOut)
-async def add_user(user: UserForm, session: AsyncSession = Depends(db_helper.session_getter)):
+async def add_user(user: UserForm, session: AsyncSession = Depends(session_getter)):
     user = await add_user_in_db(username=user.username, password=user.password, email=user.email, session=session)
     return user
 
@@ -1,18 +1,64 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 
 import jwt
 import bcrypt
+from jwt.algorithms import get_default_algorithms
 
-from core.config import settings
+from core.cache import TTLCache
+from core.config import Lazy, settings
+from core.metrics import Gauge, registry, jwt_verify_seconds, bcrypt_seconds
+
+
+class KeyFile:
+    """
+    PEM key parsed once into a key object and re-read when the file's mtime changes,
+    so a rotated key is picked up without a restart. The file is stat'ed at most
+    every `check_interval` seconds.
+    """
+
+    def __init__(self, path: Path, algorithm: str, check_interval: float):
+        self.path = path
+        self.algorithm = algorithm
+        self.check_interval = check_interval
+        self.version = 0
+        self._key = None
+        self._mtime = None
+        self._checked_at = 0.0
+
+    def get(self):
+        now = time.monotonic()
+        if self._key is None or now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            mtime = self.path.stat().st_mtime_ns
+            if mtime != self._mtime:
+                self._key = get_default_algorithms()[self.algorithm].prepare_key(self.path.read_bytes())
+                self._mtime = mtime
+                self.version += 1
+        return self._key
+
+
+private_key_file = Lazy(lambda: KeyFile(settings.auth_jwt.private_key, settings.auth_jwt.algorithm,
+                                        settings.auth_jwt.key_check_seconds))
+public_key_file = Lazy(lambda: KeyFile(settings.auth_jwt.public_key, settings.auth_jwt.algorithm,
+                                       settings.auth_jwt.key_check_seconds))
 
 
 def encode_jwt(
         payload: dict,
-        private_key: str = settings.auth_jwt.private_key.read_text(),
-        algorithm: str = settings.auth_jwt.algorithm,
+        private_key=None,
+        algorithm: str | None = None,
         expire_timedelta: timedelta | None = None,
-        expire_minutes: int = settings.auth_jwt.expire_minutes,
+        expire_minutes: int | None = None,
 ):
+    # None means the configured value; defaults are resolved here, not at import.
+    algorithm = algorithm or settings.auth_jwt.algorithm
+    if expire_minutes is None:
+        expire_minutes = settings.auth_jwt.expire_minutes
     to_encode = payload.copy()
     now = datetime.now(timezone.utc)
     if expire_timedelta:
@@ -22,19 +68,103 @@ def encode_jwt(
     to_encode.update(exp=expire_time,
                      iat=now,
                      )
+    if private_key is None:
+        private_key = private_key_file.get()
     encoded = jwt.encode(to_encode, private_key, algorithm=algorithm)
     return encoded
 
 def decode_jwt(token: str | bytes,
-               public_key: str = settings.auth_jwt.public_key.read_text(),
-               algorithm: str = settings.auth_jwt.algorithm,
+               public_key=None,
+               algorithm: str | None = None,
                ):
-    decoded = jwt.decode(token, public_key, algorithms=[algorithm])
-    return decoded
+    algorithm = algorithm or settings.auth_jwt.algorithm
+    if public_key is None:
+        public_key = public_key_file.get()
+    if not registry.enabled:
+        return jwt.decode(token, public_key, algorithms=[algorithm])
+
+    start = time.perf_counter()
+    try:
+        return jwt.decode(token, public_key, algorithms=[algorithm])
+    finally:
+        jwt_verify_seconds.observe(time.perf_counter() - start)
+
+
+# Verified payloads keyed by sha256 of the token. An entry lives until the token's `exp`
+# and is dropped when the public key is rotated.
+_token_cache = Lazy(lambda: TTLCache(maxsize=settings.auth_jwt.token_cache_size))
+
+def decode_jwt_cached(token: str | bytes) -> dict:
+    """
+    Same as `decode_jwt` with the default key, but skips the signature check for tokens
+    that were already verified. Raises the same jwt exceptions.
+    """
+    raw = token.encode() if isinstance(token, str) else token
+    key = hashlib.sha256(raw).digest()
+    public_key = public_key_file.get()
+
+    cached = _token_cache.get(key)
+    if cached is not None:
+        key_version, payload = cached
+        if key_version == public_key_file.version:
+            return payload
 
-def hash_password(password: str) -> str:
-    salt = bcrypt.gensalt()
+    payload = decode_jwt(token, public_key=public_key)
+    exp = payload.get("exp")
+    if exp is not None:
+        _token_cache.set(key, (public_key_file.version, payload), ttl=exp - time.time())
+    return payload
+
+def hash_password(password: str, rounds: int | None = None) -> str:
+    salt = bcrypt.gensalt(rounds=rounds or settings.auth_jwt.bcrypt_rounds)
     return bcrypt.hashpw(password.encode(), salt).decode()
 
 def validate_password(password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(password.encode(), hashed_password.encode())
\ No newline at end of file
+    return bcrypt.checkpw(password.encode(), hashed_password.encode())
+
+
+# bcrypt takes 100+ ms per call, so async handlers hand it to a bounded pool
+# instead of blocking the event loop. At most `hash_workers` hashes run at once.
+_hash_executor: Executor | None = None
+_hash_pending = 0
+
+def _get_hash_executor() -> Executor:
+    global _hash_executor
+    if _hash_executor is None:
+        workers = settings.auth_jwt.hash_workers
+        if settings.auth_jwt.hash_executor == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            _hash_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+    return _hash_executor
+
+async def _run_in_hash_pool(op: str, func, *args):
+    global _hash_pending
+    _hash_pending += 1
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        _hash_pending -= 1
+        if registry.enabled:
+            bcrypt_seconds.observe(time.perf_counter() - start, op)
+
+def hash_queue_depth() -> int:
+    """
+    Number of hash/verify calls submitted to the pool that have not finished yet (running or queued).
+    """
+    return _hash_pending
+
+registry.register(Gauge("bcrypt_queue_depth", "bcrypt calls running or queued in the hash pool.", hash_queue_depth))
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_hash_pool("hash", hash_password, password, settings.auth_jwt.bcrypt_rounds)
+
+async def validate_password_async(password: str, hashed_password: str) -> bool:
+    return await _run_in_hash_pool("verify", validate_password, password, hashed_password)
+
+def shutdown_hash_executor():
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
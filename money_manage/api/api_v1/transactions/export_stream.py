@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import AsyncIterator, Literal, Sequence
+
+ExportFormat = Literal["csv", "ndjson", "parquet"]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _plain(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+async def encode_csv(columns: Sequence[str], partitions: AsyncIterator[Sequence[tuple]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in partitions:
+        writer.writerows([[_plain(value) for value in row] for row in rows])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def encode_ndjson(columns: Sequence[str], partitions: AsyncIterator[Sequence[tuple]]) -> AsyncIterator[bytes]:
+    async for rows in partitions:
+        yield "".join(json.dumps(dict(zip(columns, map(_plain, row)))) + "\n" for row in rows).encode()
+
+
+class _DrainableSink(io.RawIOBase):
+    """
+    Write-only file for pyarrow that hands out what was written so far, while `tell()`
+    keeps counting from the start of the file as the Parquet footer needs.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa
+    except ImportError:
+        return False
+    return True
+
+
+async def encode_parquet(columns: Sequence[str], partitions: AsyncIterator[Sequence[tuple]]) -> AsyncIterator[bytes]:
+    """
+    One Parquet row group per partition, so only one partition is held in memory.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {
+        "id": pa.int64(),
+        "date": pa.date32(),
+        "category_id": pa.int64(),
+        "description": pa.string(),
+        "amount": pa.float64(),
+        "transaction_type_id": pa.int64(),
+        "currency_id": pa.int64(),
+        "created_at": pa.timestamp("us"),
+        "updated_at": pa.timestamp("us"),
+    }
+    schema = pa.schema([(name, types[name]) for name in columns])
+
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        async for rows in partitions:
+            data = {name: [row[index] for row in rows] for index, name in enumerate(columns)}
+            data["amount"] = [float(value) for value in data["amount"]]
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+ENCODERS = {
+    "csv": encode_csv,
+    "ndjson": encode_ndjson,
+    "parquet": encode_parquet,
+}
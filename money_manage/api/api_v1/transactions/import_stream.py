@@ -0,0 +1,92 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Literal
+
+ImportFormat = Literal["csv", "ndjson"]
+
+# Reference columns an import row can point at; foreign key names contain the column name.
+REFERENCE_COLUMNS = ("category_id", "currency_id", "transaction_type_id")
+
+
+def detect_format(content_type: str | None) -> ImportFormat | None:
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/jsonl", "application/x-jsonlines"):
+        return "ndjson"
+    return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a byte stream into text lines without holding more than one chunk in memory.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    async for chunk in chunks:
+        lines = (tail + decoder.decode(chunk)).split("\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: ImportFormat) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """
+    Yields `(line number, record, error)` for every non-empty line of the body.
+    CSV bodies must start with a header row naming TransactionIn fields; quoted
+    values may not span lines.
+    """
+    header = None
+    line_no = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+
+        if fmt == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "Expected a JSON object"
+                continue
+            yield line_no, record, None
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield line_no, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield line_no, {name: (value if value != "" else None) for name, value in zip(header, values)}, None
+
+
+def describe_row_error(db_error) -> str:
+    """
+    Short reason for a row the database rejected. The driver's own message echoes the whole
+    failing row, so only known constraint violations are named and everything else is generic.
+    """
+    cause = getattr(db_error.orig, "__cause__", None)
+    constraint = getattr(cause, "constraint_name", None) or ""
+    sqlstate = getattr(db_error.orig, "sqlstate", None) or getattr(cause, "sqlstate", None)
+
+    if sqlstate == "23514" and "check_amount_positive" in constraint:
+        return "amount: must be between 0 and 999999999999"
+    if sqlstate == "23503":
+        for column in REFERENCE_COLUMNS:
+            if column in constraint:
+                return f"{column}: does not exist"
+    if sqlstate == "22003":
+        return "A value is out of range"
+    if sqlstate == "22001":
+        return "A value is too long"
+    return "Rejected by the database"
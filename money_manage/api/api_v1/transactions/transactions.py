@@ -1,24 +1,94 @@
-from typing import Dict
+import hashlib
+from datetime import date, timedelta
+from typing import Dict, List
 
 from fastapi import APIRouter, HTTPException, Request, Query
 from fastapi.params import Depends
-from sqlalchemy.exc import SQLAlchemyError
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError, DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
+from starlette.responses import StreamingResponse, Response
 
 from api.api_v1.auth.jwt_auth import get_current_user_id
-from core.db_connection.db_helper import db_helper
-from core.schemas.transaction import TransactionIn, TransactionOut, TransactionListResponse, TransactionUpdate
-from crud.transactions import add_transaction_in_db, get_transaction_by_id, get_transactions_db, update_transaction_db
+from api.api_v1.transactions.export_stream import ExportFormat, ENCODERS, MEDIA_TYPES, parquet_available
+from api.api_v1.transactions.import_stream import ImportFormat, detect_format, iter_records, describe_row_error, \
+    REFERENCE_COLUMNS
+from core.currency_conversion import currency_converter, UnknownCurrencyError
+from core.db_connection.db_helper import db_helper, read_session_getter, session_getter
+from core.reference_data import check_reference_ids, unknown_reference_ids
+from core.pagination import decode_date_id_cursor, decode_rank_id_cursor, encode_cursor
+from core.serialization import RowSerializer, dumps
+from core.schemas.transaction import TransactionIn, TransactionOut, TransactionListResponse, TransactionUpdate, TransactionFilter, \
+    TransactionImportRow, TransactionImportError, TransactionImportResponse, TransactionBulkUpdate, TransactionBulkDelete, \
+    TransactionBulkResponse, TransactionSearchResponse, SearchMode, TransactionSummaryResponse, SummaryGroup, \
+    SummaryPeriod
+from crud.transaction_query import check_query_cost, QueryRejected
+from crud.transactions import add_transaction_in_db, get_transaction_row_by_id, get_transaction_rows_db, update_transaction_db, \
+    count_transactions_db, get_transactions_version_db, OUT_COLUMNS, search_transactions_db, bulk_update_transactions_db, bulk_delete_transactions_db, add_transactions_batch_in_db, forget_transaction_counts, get_transactions_summary_db, stream_transactions_db, \
+    EXPORT_COLUMNS
 
 router = APIRouter(prefix="/transactions",
     tags=["transaction"],)
 
+MAX_REPORTED_IMPORT_ERRORS = 1000
+
+# Read endpoints skip ORM objects and pydantic: rows are turned into TransactionOut-shaped dicts
+# and encoded with orjson. response_model is kept on those routes for the OpenAPI schema.
+transaction_serializer = RowSerializer(OUT_COLUMNS, float_columns=("amount",),
+                                       extra={"converted_amount": None, "converted_currency_id": None})
+
+search_serializer = RowSerializer((*OUT_COLUMNS, "rank"), float_columns=("amount",),
+                                  extra={"converted_amount": None, "converted_currency_id": None})
+
+def _json_response(content, headers: Dict[str, str] | None = None) -> Response:
+    return Response(content=dumps(content), media_type="application/json", headers=headers)
+
+# Clients may keep responses but must revalidate them; a revalidation that matches costs
+# one primary-key lookup of the user's transactions_version and returns 304 without a body.
+CACHE_CONTROL = "private, no-cache"
+
+def _etag(request: Request, version: int, *extra) -> str:
+    """
+    Weak ETag from the user's transactions_version and everything else the body depends on:
+    the path, the query string and `extra` (e.g. the exchange rates version).
+    """
+    digest = hashlib.sha1(repr((request.url.path, request.url.query, extra)).encode()).hexdigest()[:16]
+    return f'W/"{version}-{digest}"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: the W/ prefix is ignored on both sides.
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+async def _conditional_etag(request: Request, session: AsyncSession, user_id: str, *extra) -> tuple[str, Response | None]:
+    """
+    The ETag for this request and, when the client's If-None-Match already matches it, the 304 to return.
+    """
+    version = await get_transactions_version_db(session=session, user_id=user_id)
+    etag = _etag(request, version, *extra)
+    if _etag_matches(request, etag):
+        return etag, Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                              headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return etag, None
+
+async def _check_references(session: AsyncSession, item) -> None:
+    try:
+        await check_reference_ids(session, category_id=item.category_id, currency_id=item.currency_id,
+                                  transaction_type_id=item.transaction_type_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=str(e))
+
 @router.post("/add", response_model=TransactionOut, status_code=status.HTTP_201_CREATED, summary="Add transaction")
 async def add_transaction(
     transaction_in: TransactionIn,
     user_id: int = Depends(get_current_user_id),
-    session: AsyncSession = Depends(db_helper.session_getter),
+    session: AsyncSession = Depends(session_getter),
 
 ):
     """
@@ -42,10 +112,12 @@ async def add_transaction(
       - Returns the created transaction object.
     - **400 Bad Request**: Invalid input data, failed to create a transaction.
       - `detail`: Error message explaining what went wrong.
+    - **422 Unprocessable Content**: The category, currency or transaction type does not exist.
     - **500 Internal Server Error**: Database error during the transaction creation process.
     """
 
     try:
+        await _check_references(session, transaction_in)
         transaction_in.user_id = int(user_id)
         transaction = await add_transaction_in_db(transaction=transaction_in, session=session)
     except SQLAlchemyError as db_error:
@@ -65,8 +137,9 @@ async def add_transaction(
 
 @router.get("/get_transaction", response_model=TransactionOut, status_code=status.HTTP_200_OK, summary="Get transaction")
 async def get_transaction(transaction_id: int,
+                          request: Request,
                           user_id: str = Depends(get_current_user_id),
-                          session: AsyncSession = Depends(db_helper.session_getter)
+                          session: AsyncSession = Depends(read_session_getter)
                           ):
     """
         Get a transaction.
@@ -81,48 +154,227 @@ async def get_transaction(transaction_id: int,
         **Responses:**
         - **200 Fetched**: Successfully fetched a transaction.
           - Returns the fetched transaction object.
+        - **304 Not Modified**: `If-None-Match` matches the current `ETag`; no body.
         - **400 Bad Request**: Invalid input data, failed to fetch a transaction.
           - `detail`: Error message explaining what went wrong.
         - **500 Internal Server Error**: Database error during the transaction creation process.
         """
 
     try:
-        transaction = await get_transaction_by_id(transaction_id=transaction_id, user_id=user_id, session=session)
+        etag, not_modified = await _conditional_etag(request, session, user_id)
+        if not_modified is not None:
+            return not_modified
 
-        if transaction:
-            return transaction
+        row = await get_transaction_row_by_id(transaction_id=transaction_id, user_id=user_id, session=session)
+
+        if row:
+            return _json_response(transaction_serializer.to_dict(row),
+                                  headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction not found")
 
     except SQLAlchemyError as db_error:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error while getting transaction: {db_error}")
 
+async def _convert_transactions(session: AsyncSession, items: list[dict], convert_to: str) -> None:
+    snapshot = await currency_converter.snapshot(session)
+    to_currency_id = snapshot.currency_id(convert_to)
+    amounts = snapshot.convert_many(((item["amount"], item["currency_id"], item["date"]) for item in items), to_currency_id)
+    for item, amount in zip(items, amounts):
+        item["converted_amount"] = amount
+        item["converted_currency_id"] = to_currency_id
+
+def _truncate_period(day: date, period: SummaryPeriod | None) -> date | None:
+    # Same buckets as Postgres date_trunc: weeks start on Monday.
+    if period == "day":
+        return day
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return None
+
+async def _convert_summary(session: AsyncSession, items: list[dict], convert_to: str,
+                           period: SummaryPeriod | None) -> list[dict]:
+    """
+    `items` are per-day totals; each is converted at that day's rate and then merged into `period` buckets.
+    """
+    snapshot = await currency_converter.snapshot(session)
+    to_currency_id = snapshot.currency_id(convert_to)
+    incomes = snapshot.convert_many(((item["income"], item["currency_id"], item["period"]) for item in items), to_currency_id)
+    expenses = snapshot.convert_many(((item["expense"], item["currency_id"], item["period"]) for item in items), to_currency_id)
+
+    merged: dict[tuple, dict] = {}
+    for item, income, expense in zip(items, incomes, expenses):
+        group = {key: value for key, value in item.items() if key in ("category_id", "transaction_type_id")}
+        if period is not None:
+            group["period"] = _truncate_period(item["period"], period)
+        total = merged.setdefault(tuple(sorted(group.items())),
+                                  {**group, "currency_id": to_currency_id, "income": 0, "expense": 0, "count": 0})
+        total["income"] += income
+        total["expense"] += expense
+        total["count"] += item["count"]
+
+    for total in merged.values():
+        total["balance"] = total["income"] - total["expense"]
+    return list(merged.values())
+
+
 @router.get("/get_transactions", response_model=TransactionListResponse, status_code=status.HTTP_200_OK, summary="Get transactions with pagination")
-async def get_transactions(user_id: str = Depends(get_current_user_id),
+async def get_transactions(request: Request,
+                           user_id: str = Depends(get_current_user_id),
                            offset: int = Query(0, ge=0),
                           limit: int = Query(10, ge=1, le=100),
-                          session: AsyncSession = Depends(db_helper.session_getter)
+                          cursor: str | None = Query(None),
+                          include_total: bool = Query(True),
+                          convert_to: str | None = Query(None),
+                          filters: TransactionFilter = Depends(),
+                          session: AsyncSession = Depends(read_session_getter)
                           ):
     """
-        Get a list of transactions with pagination.
+        Get a filtered, sorted list of transactions with pagination (newest first by default).
 
-        - **offset**: which element to start with
+        - **offset**: which element to start with (ignored when `cursor` is given)
         - **limit**: how many elements to return (max 100)
+        - **cursor**: `next_cursor` from the previous page; fetches the following page without OFFSET
+        - **include_total**: return the total number of user's transactions (cached for a few seconds; `null` when filters are set)
+        - **convert_to**: currency code; fills `converted_amount` using the exchange rates in effect on each transaction's date
+        - **date_from** / **date_to**, **amount_min** / **amount_max**: inclusive ranges
+        - **category_id**, **currency_id**, **transaction_type_id**: exact matches
+        - **sort**: `-date` (default), `date`, `-amount` or `amount`
+
+        Queries that cannot use an index are rejected with 400: sorting by amount and filtering by
+        amount, `currency_id` or `transaction_type_id` need a bounded `date_from`/`date_to` window,
+        and amount sorts page with `offset` only.
+
+        `next_cursor` is `null` on the last page and for amount sorts.
+
+        Responses carry a weak `ETag` that changes whenever any of the user's transactions change;
+        send it back in `If-None-Match` to get an empty **304 Not Modified** while nothing changed.
         """
 
     try:
-        transactions = await get_transactions_db(limit=limit, offset=offset, user_id=user_id, session=session)
-        total = len(transactions)
-        return {"total": total, "items": transactions}
+        page_cursor = decode_date_id_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
 
+    try:
+        check_query_cost(user_id=user_id, filters=filters, cursor=page_cursor)
+    except QueryRejected as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        # Converted amounts also depend on the exchange rates.
+        rates_version = (await currency_converter.snapshot(session)).version if convert_to else ()
+        etag, not_modified = await _conditional_etag(request, session, user_id, rates_version)
+        if not_modified is not None:
+            return not_modified
+
+        rows = await get_transaction_rows_db(limit=limit + 1, offset=offset, cursor=page_cursor, filters=filters,
+                                             user_id=user_id, session=session)
+        items = transaction_serializer.to_dicts(rows[:limit])
+        next_cursor = None
+        if len(rows) > limit and filters.sort in ("date", "-date"):
+            next_cursor = encode_cursor(items[-1]["date"], items[-1]["id"])
+
+        if convert_to:
+            await _convert_transactions(session, items, convert_to)
+
+        filtered = filters.model_dump(exclude={"sort"}, exclude_none=True)
+        total = None
+        if include_total and not filtered:
+            total = await count_transactions_db(user_id=user_id, session=session)
+        return _json_response({"total": total, "items": items, "next_cursor": next_cursor},
+                              headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+    except UnknownCurrencyError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except SQLAlchemyError as db_error:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error while getting transactions: {db_error}")
 
 
+@router.get("/search", response_model=TransactionSearchResponse, status_code=status.HTTP_200_OK, summary="Search transactions by description")
+async def search_transactions(q: str = Query(..., min_length=1, max_length=256),
+                              mode: SearchMode = Query("fts"),
+                              limit: int = Query(10, ge=1, le=100),
+                              cursor: str | None = Query(None),
+                              user_id: int = Depends(get_current_user_id),
+                              session: AsyncSession = Depends(read_session_getter),
+                              ):
+    """
+        Search the user's transactions by description, best matches first.
+
+        - **q**: search text
+        - **mode**: `fts` matches whole words (web search syntax: `uber -eats`, `"taxi ride"`);
+          `substring` matches any part of the description (at least 3 characters)
+        - **limit**: how many elements to return (max 100)
+        - **cursor**: `next_cursor` from the previous page
+
+        Every item carries its `rank`; `next_cursor` is `null` on the last page.
+        """
+    if mode == "substring" and len(q) < 3:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Substring search needs at least 3 characters")
+
+    try:
+        page_cursor = decode_rank_id_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    try:
+        rows = await search_transactions_db(session=session, user_id=user_id, q=q, mode=mode,
+                                            limit=limit + 1, cursor=page_cursor)
+        items = search_serializer.to_dicts(rows[:limit])
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(items[-1]["rank"], items[-1]["id"])
+        return _json_response({"items": items, "next_cursor": next_cursor})
+
+    except SQLAlchemyError as db_error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error while searching transactions: {db_error}")
+
+
+@router.get("/summary", response_model=TransactionSummaryResponse, status_code=status.HTTP_200_OK, summary="Get transaction totals")
+async def get_transactions_summary(user_id: int = Depends(get_current_user_id),
+                                   group_by: List[SummaryGroup] = Query([]),
+                                   period: SummaryPeriod | None = Query(None),
+                                   date_from: date | None = Query(None),
+                                   date_to: date | None = Query(None),
+                                   convert_to: str | None = Query(None),
+                                   session: AsyncSession = Depends(read_session_getter),
+                                   ):
+    """
+        Get income, expense and balance totals computed on the server.
+
+        Totals are always split by currency.
+
+        - **group_by**: additionally split by `category` and/or `type` (may be repeated)
+        - **period**: additionally split by `day`, `week` or `month`
+        - **date_from** / **date_to**: inclusive date range
+        - **convert_to**: currency code; totals of all currencies are converted at the rate of their day and merged into this one
+
+        **Response:**
+        - `items`: one entry per group with `income`, `expense`, `balance` and `count`
+        """
+
+    try:
+        # Converting needs per-day totals so each day is converted at its own historical rate.
+        items = await get_transactions_summary_db(session=session, user_id=user_id, group_by=group_by,
+                                                  period="day" if convert_to else period,
+                                                  date_from=date_from, date_to=date_to)
+        if convert_to:
+            items = await _convert_summary(session, items, convert_to, period)
+        return {"items": items}
+
+    except UnknownCurrencyError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except SQLAlchemyError as db_error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error while getting summary: {db_error}")
+
+
 @router.patch("/update_transaction", response_model=TransactionOut, status_code=status.HTTP_201_CREATED, summary="Update a transaction")
 async def get_transactions(transaction_update: TransactionUpdate,
                            transaction_id: int,
                            user_id: int = Depends(get_current_user_id),
-                           session: AsyncSession = Depends(db_helper.session_getter),
+                           session: AsyncSession = Depends(session_getter),
                           ):
     """
         Update an existing transaction.
@@ -143,10 +395,12 @@ async def get_transactions(transaction_update: TransactionUpdate,
         **Possible errors:**
         - `404 Not Found` if the transaction does not exist or does not belong to the user.
         - `400 Bad Request` if invalid data provided.
+        - `422 Unprocessable Content` if the category, currency or transaction type does not exist.
         - `500 Internal Server Error` if database operation fails.
     """
 
     try:
+        await _check_references(session, transaction_update)
         transaction_update.user_id = int(user_id)
         transaction = await update_transaction_db(transaction_id=transaction_id, transaction_update=transaction_update, session=session)
 
@@ -162,4 +416,204 @@ async def get_transactions(transaction_update: TransactionUpdate,
             detail="Failed to create transaction. Invalid input data."
         )
 
-    return transaction
\ No newline at end of file
+    return transaction
+
+
+@router.patch("/bulk_update", response_model=TransactionBulkResponse, status_code=status.HTTP_200_OK, summary="Update many transactions")
+async def bulk_update_transactions(bulk_update: TransactionBulkUpdate,
+                                   user_id: int = Depends(get_current_user_id),
+                                   session: AsyncSession = Depends(session_getter),
+                                   ):
+    """
+        Update every transaction of the user that matches a filter, in one set-based UPDATE.
+
+        **Request Body:**
+        - `filter`: `ids`, `date_from`, `date_to`, `category_id` and/or `description_contains` (case-insensitive); at least one is required
+        - `changes`: fields to set on all matching transactions (only provided fields are changed)
+        - `chunk_size`: optional; update and commit this many rows at a time to keep locks short
+
+        **Response:**
+        - `affected`: number of updated transactions
+        """
+    changes = bulk_update.changes.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No changes provided")
+
+    try:
+        await _check_references(session, bulk_update.changes)
+        affected = await bulk_update_transactions_db(session=session, user_id=user_id, bulk_filter=bulk_update.filter,
+                                                     changes=changes, chunk_size=bulk_update.chunk_size)
+        return {"affected": affected}
+
+    except SQLAlchemyError as db_error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error while updating transactions: {db_error}")
+
+
+@router.post("/bulk_delete", response_model=TransactionBulkResponse, status_code=status.HTTP_200_OK, summary="Delete many transactions")
+async def bulk_delete_transactions(bulk_delete: TransactionBulkDelete,
+                                   user_id: int = Depends(get_current_user_id),
+                                   session: AsyncSession = Depends(session_getter),
+                                   ):
+    """
+        Delete every transaction of the user that matches a filter, in one set-based DELETE.
+
+        **Request Body:**
+        - `filter`: `ids`, `date_from`, `date_to`, `category_id` and/or `description_contains` (case-insensitive); at least one is required
+        - `chunk_size`: optional; delete and commit this many rows at a time to keep locks short
+
+        **Response:**
+        - `affected`: number of deleted transactions
+        """
+    try:
+        affected = await bulk_delete_transactions_db(session=session, user_id=user_id, bulk_filter=bulk_delete.filter,
+                                                     chunk_size=bulk_delete.chunk_size)
+        return {"affected": affected}
+
+    except SQLAlchemyError as db_error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error while deleting transactions: {db_error}")
+
+
+async def _import_batch(session: AsyncSession, batch: list[tuple[int, TransactionImportRow]]) -> tuple[int, list[TransactionImportError]]:
+    user_ids = {row.user_id for _, row in batch}
+
+    # Reject rows naming unknown categories, currencies or types up front instead of
+    # letting their foreign keys fail the whole batch.
+    errors = []
+    unknown = await unknown_reference_ids(session, **{column: {getattr(row, column) for _, row in batch}
+                                                      for column in REFERENCE_COLUMNS})
+    if unknown:
+        valid = []
+        for line_no, row in batch:
+            reasons = [f"Unknown {column}: {getattr(row, column)}" for column in REFERENCE_COLUMNS
+                       if getattr(row, column) in unknown.get(column, ())]
+            if reasons:
+                errors.append(TransactionImportError(line=line_no, error="; ".join(reasons)))
+            else:
+                valid.append((line_no, row))
+        batch = valid
+        if not batch:
+            return 0, errors
+
+    try:
+        ids = await add_transactions_batch_in_db(session=session, transactions=[row for _, row in batch])
+        await session.commit()
+        forget_transaction_counts(user_ids)
+        return len(ids), errors
+    except DBAPIError:
+        await session.rollback()
+
+    # Some row broke a constraint: redo the batch row by row so only the bad rows are rejected.
+    inserted = 0
+    for line_no, row in batch:
+        try:
+            async with session.begin_nested():
+                await add_transactions_batch_in_db(session=session, transactions=[row])
+            inserted += 1
+        except DBAPIError as db_error:
+            errors.append(TransactionImportError(line=line_no, error=describe_row_error(db_error)))
+    await session.commit()
+    forget_transaction_counts(user_ids)
+    return inserted, errors
+
+
+@router.post("/import", response_model=TransactionImportResponse, status_code=status.HTTP_200_OK, summary="Import transactions")
+async def import_transactions(request: Request,
+                              format: ImportFormat | None = Query(None),
+                              batch_size: int = Query(1000, ge=1, le=10000),
+                              user_id: int = Depends(get_current_user_id),
+                              session: AsyncSession = Depends(session_getter),
+                              ):
+    """
+        Import transactions from a CSV or NDJSON request body.
+
+        The body is read as a stream and inserted in batches of `batch_size` rows, each batch
+        committed on its own. Rows that fail validation or a database constraint are skipped
+        and reported; the rest of the file is still imported.
+
+        - **format**: `csv` or `ndjson`; taken from `Content-Type` (`text/csv`, `application/x-ndjson`) when omitted
+        - **batch_size**: rows per INSERT/commit (max 10000)
+
+        Every row has the `TransactionIn` fields plus an optional `date` (defaults to today).
+        CSV bodies start with a header row.
+
+        **Response:**
+        - `inserted`: number of imported rows
+        - `failed`: number of rejected rows
+        - `errors`: line number and reason for the first rejected rows
+    """
+    fmt = format or detect_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown import format, pass ?format=csv or ?format=ndjson")
+
+    inserted, failed = 0, 0
+    errors: list[TransactionImportError] = []
+    batch: list[tuple[int, TransactionImportRow]] = []
+
+    def reject(line_no: int, error: str):
+        nonlocal failed, errors
+        failed += 1
+        # Database errors for a batch arrive after the validation errors of later lines,
+        # so keep the lowest line numbers rather than the first ones reported.
+        errors.append(TransactionImportError(line=line_no, error=error))
+        if len(errors) >= 2 * MAX_REPORTED_IMPORT_ERRORS:
+            errors = sorted(errors, key=lambda e: e.line)[:MAX_REPORTED_IMPORT_ERRORS]
+
+    try:
+        async for line_no, record, error in iter_records(request.stream(), fmt):
+            if error is not None:
+                reject(line_no, error)
+                continue
+            try:
+                batch.append((line_no, TransactionImportRow.model_validate({**record, "user_id": user_id})))
+            except ValidationError as e:
+                reject(line_no, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+                continue
+
+            if len(batch) >= batch_size:
+                batch_inserted, batch_errors = await _import_batch(session, batch)
+                inserted += batch_inserted
+                for batch_error in batch_errors:
+                    reject(batch_error.line, batch_error.error)
+                batch = []
+
+        if batch:
+            batch_inserted, batch_errors = await _import_batch(session, batch)
+            inserted += batch_inserted
+            for batch_error in batch_errors:
+                reject(batch_error.line, batch_error.error)
+
+    except SQLAlchemyError as db_error:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database error while importing transactions: {db_error}")
+
+    return {"inserted": inserted, "failed": failed,
+            "errors": sorted(errors, key=lambda e: e.line)[:MAX_REPORTED_IMPORT_ERRORS]}
+
+
+@router.get("/export", status_code=status.HTTP_200_OK, summary="Export transactions")
+async def export_transactions(format: ExportFormat = Query("csv"),
+                              batch_size: int = Query(10000, ge=100, le=100000),
+                              user_id: int = Depends(get_current_user_id),
+                              ):
+    """
+        Download all of the user's transactions, newest first.
+
+        Rows are read through a server-side cursor and encoded while they are sent,
+        so memory use does not depend on the number of transactions.
+
+        - **format**: `csv`, `ndjson` or `parquet` (one row group per batch, needs pyarrow on the server)
+        - **batch_size**: rows fetched from the database per round trip
+        """
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Parquet export is not available on this server")
+
+    async def partitions():
+        # The session belongs to the response stream, not to the request: it has to outlive the handler.
+        async with db_helper.read_session_getter_md(user_id=str(user_id)) as session:
+            async for rows in stream_transactions_db(session=session, user_id=user_id, batch_size=batch_size):
+                yield rows
+
+    return StreamingResponse(
+        ENCODERS[format](EXPORT_COLUMNS, partitions()),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'},
+    )
@@ -0,0 +1,172 @@
+"""
+Scripted workloads against `main_app` through an in-process ASGI client: no network and no
+uvicorn, just the middleware stack, the endpoints and the database. Run `bench.seed` first.
+
+    python -m bench.load --workloads login refresh list bulk_add --requests 2000 --concurrency 32 --out bench.json
+
+Reports throughput and p50/p95/p99 latency per workload as JSON. The per-user rate limiter is
+switched off unless --keep-rate-limit is given, since every worker reuses a few bench users.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from bench.seed import BENCH_PASSWORD, bench_username
+from core.config import settings
+
+API = settings.api.prefix
+WORKLOADS = ("login", "refresh", "list", "bulk_add")
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+async def login(client: httpx.AsyncClient, username: str) -> httpx.Response:
+    return await client.post(f"{API}/auth/login", data={"username": username, "password": BENCH_PASSWORD})
+
+
+class Worker:
+    """
+    One simulated client: its own cookie jar, logged in as one bench user.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, username: str):
+        self.client = client
+        self.username = username
+        self.cursor = None
+        self.template = None
+
+    async def setup(self, workload: str):
+        if workload == "login":
+            return
+        response = await login(self.client, self.username)
+        response.raise_for_status()
+        if workload == "bulk_add":
+            page = await self.client.get(f"{API}/transactions/get_transactions", params={"limit": 1})
+            page.raise_for_status()
+            item = page.json()["items"][0]
+            self.template = {key: item[key] for key in ("category_id", "transaction_type_id", "currency_id")}
+
+    async def step(self, workload: str, batch_size: int) -> httpx.Response:
+        if workload == "login":
+            return await login(self.client, self.username)
+
+        if workload == "refresh":
+            # Only the refresh token is sent, so jwt_middleware reissues an access token every time.
+            self.client.cookies.delete("access_token")
+            return await self.client.get(f"{API}/transactions/get_transactions",
+                                         params={"limit": 10, "include_total": "false"})
+
+        if workload == "list":
+            params = {"limit": 50, "include_total": "false"}
+            if self.cursor:
+                params["cursor"] = self.cursor
+            response = await self.client.get(f"{API}/transactions/get_transactions", params=params)
+            if response.status_code == 200:
+                self.cursor = response.json().get("next_cursor")
+            return response
+
+        if workload == "bulk_add":
+            body = "\n".join(json.dumps({**self.template, "amount": 1.5, "description": "bench"})
+                             for _ in range(batch_size))
+            return await self.client.post(f"{API}/transactions/import", params={"format": "ndjson"},
+                                          content=body, headers={"Content-Type": "application/x-ndjson"})
+
+        raise ValueError(f"Unknown workload: {workload}")
+
+
+async def run_workload(app, workload: str, requests: int, concurrency: int, users: int, batch_size: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    # https so the Secure auth cookies are sent back.
+    clients = [httpx.AsyncClient(transport=transport, base_url="https://bench") for _ in range(concurrency)]
+    workers = [Worker(client, bench_username(n % users)) for n, client in enumerate(clients)]
+    try:
+        await asyncio.gather(*(worker.setup(workload) for worker in workers))
+
+        latencies: list[float] = []
+        errors = 0
+        remaining = requests
+
+        async def loop(worker: Worker):
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                response = await worker.step(workload, batch_size)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(loop(worker) for worker in workers))
+        return summarize(latencies, errors, time.perf_counter() - started)
+    finally:
+        await asyncio.gather(*(client.aclose() for client in clients))
+
+
+async def run(args) -> dict:
+    if not args.keep_rate_limit:
+        settings.rate_limit.enabled = False
+
+    from main import main_app
+
+    results = {}
+    async with main_app.router.lifespan_context(main_app):
+        for workload in args.workloads:
+            requests = args.requests // 10 if workload == "login" and not args.full_login else args.requests
+            results[workload] = await run_workload(main_app, workload, requests, args.concurrency,
+                                                   args.users, args.batch_size)
+    return {
+        "config": {"requests": args.requests, "concurrency": args.concurrency, "users": args.users,
+                   "batch_size": args.batch_size, "bcrypt_rounds": settings.auth_jwt.bcrypt_rounds,
+                   "pool_size": settings.db.pool_size, "max_overflow": settings.db.max_overflow},
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS, default=list(WORKLOADS))
+    parser.add_argument("--requests", type=int, default=1000, help="requests per workload")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=100, help="number of seeded bench users to spread over")
+    parser.add_argument("--batch-size", type=int, default=100, help="rows per bulk_add request")
+    parser.add_argument("--full-login", action="store_true",
+                        help="run --requests logins instead of a tenth of them (bcrypt makes logins slow)")
+    parser.add_argument("--keep-rate-limit", action="store_true")
+    parser.add_argument("--out", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Micro-benchmarks for the per-request CPU work that does not touch the database:
+JWT verification (uncached and through the token cache), bcrypt hashing/verification
+and transaction list serialization.
+
+    python -m bench.micro --out micro.json
+"""
+import argparse
+import json
+import statistics
+import timeit
+
+from api.api_v1.auth.helpers import create_access_token_for
+from api.api_v1.auth.utils import decode_jwt, decode_jwt_cached, hash_password, validate_password
+from bench import serialization
+from core.config import settings
+
+
+def measure(func, number: int, repeat: int) -> dict:
+    """
+    Per-call time in microseconds: best and median over `repeat` rounds of `number` calls.
+    """
+    rounds = [t / number for t in timeit.repeat(func, number=number, repeat=repeat)]
+    return {"best_us": round(min(rounds) * 1e6, 2), "median_us": round(statistics.median(rounds) * 1e6, 2),
+            "calls": number * repeat}
+
+
+def run(bcrypt_rounds: int, bcrypt_repeat: int, rows: int) -> dict:
+    token = create_access_token_for(user_id=1, username="bench_user_0")
+    decode_jwt_cached(token)
+    password_hash = hash_password("bench-password", bcrypt_rounds)
+
+    return {
+        "decode_jwt": measure(lambda: decode_jwt(token), number=200, repeat=5),
+        "decode_jwt_cached": measure(lambda: decode_jwt_cached(token), number=10000, repeat=5),
+        "hash_password": {"rounds": bcrypt_rounds,
+                          **measure(lambda: hash_password("bench-password", bcrypt_rounds), 1, bcrypt_repeat)},
+        "validate_password": {"rounds": bcrypt_rounds,
+                              **measure(lambda: validate_password("bench-password", password_hash), 1, bcrypt_repeat)},
+        "transaction_serialization": serialization.run(rows=rows, repeat=200),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bcrypt-rounds", type=int, default=settings.auth_jwt.bcrypt_rounds)
+    parser.add_argument("--bcrypt-repeat", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=100, help="rows per serialized page")
+    parser.add_argument("--out", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    output = json.dumps(run(args.bcrypt_rounds, args.bcrypt_repeat, args.rows), indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
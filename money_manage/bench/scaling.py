@@ -0,0 +1,108 @@
+"""
+Throughput of the real server (serve.py over TCP) as the worker count grows.
+Starts serve.py once per worker count, logs a bench user in per client and runs the
+list workload for a fixed time. Run `bench.seed` first.
+
+    python -m bench.scaling --workers 1 2 4 8 --duration 20 --concurrency 64 --out scaling.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from bench.load import summarize
+from bench.seed import BENCH_PASSWORD, bench_username
+from core.config import settings
+
+API = settings.api.prefix
+SERVE = Path(__file__).parent.parent / "serve.py"
+
+
+async def wait_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get("/docs")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout} seconds")
+
+
+async def _auth_cookies(client: httpx.AsyncClient, username: str) -> str:
+    response = await client.post(f"{API}/auth/login", data={"username": username, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    # The auth cookies are Secure and the bench talks plain http, so send them by hand.
+    return "; ".join(f"{name}={value}" for name, value in response.cookies.items())
+
+
+async def drive(base_url: str, duration: float, concurrency: int, users: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        cookies = await asyncio.gather(*(_auth_cookies(client, bench_username(n % users)) for n in range(concurrency)))
+
+        latencies: list[float] = []
+        errors = 0
+        deadline = time.perf_counter() + duration
+
+        async def loop(cookie: str):
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.get(f"{API}/transactions/get_transactions",
+                                            params={"limit": 50, "include_total": "false"},
+                                            headers={"Cookie": cookie})
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(loop(cookie) for cookie in cookies))
+        return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def run_for_workers(workers: int, args) -> dict:
+    env = {**os.environ, "APP_CONFIG__RATE_LIMIT__ENABLED": "false"}
+    server = subprocess.Popen([sys.executable, str(SERVE), "--host", "127.0.0.1", "--port", str(args.port),
+                               "--workers", str(workers)], cwd=SERVE.parent, env=env)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        asyncio.run(wait_ready(base_url))
+        return asyncio.run(drive(base_url, args.duration, args.concurrency, args.users))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load per worker count")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--out", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    results = {str(workers): run_for_workers(workers, args) for workers in args.workers}
+    baseline = results[str(args.workers[0])]["throughput_rps"] or 1
+    for result in results.values():
+        result["speedup"] = round(result["throughput_rps"] / baseline, 2)
+
+    output = json.dumps({"cpu_count": os.cpu_count(), "duration": args.duration,
+                         "concurrency": args.concurrency, "results": results}, indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
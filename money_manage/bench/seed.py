@@ -0,0 +1,128 @@
+"""
+Seed a local database with benchmark users and transactions. Users are named
+bench_user_<n> and share one password, so the load workloads can log in as any of them.
+Existing bench users are reused and only get transactions when they have none.
+
+    python -m bench.seed --users 100 --transactions 1000
+"""
+import argparse
+import asyncio
+import json
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from api.api_v1.auth.utils import hash_password
+from core.db_connection.db_helper import db_helper
+from core.db_init import init_transactions_types
+from core.models.budgets import Category
+from core.models.currencies import Currency
+from core.models.transactions import Transactions, TransactionsType
+from core.models.user import User
+from crud.daily_balances import rebuild_daily_balances
+
+BENCH_PASSWORD = "bench-password"
+BENCH_CATEGORIES = ("Food", "Transport", "Salary", "Rent", "Entertainment")
+BENCH_CURRENCIES = (("USD", "US Dollar", Decimal("1")), ("EUR", "Euro", Decimal("1.08")))
+BENCH_DESCRIPTIONS = ("Coffee", "Groceries", "Taxi to airport", "Monthly salary", "Cinema tickets", None)
+
+
+def bench_username(n: int) -> str:
+    return f"bench_user_{n}"
+
+
+async def _reference_ids(session):
+    await init_transactions_types(session)
+    # categories.name and currencies.code carry no unique constraint, so there is nothing for
+    # ON CONFLICT to match: insert only the names and codes that are missing.
+    existing = set((await session.scalars(select(Category.name).filter(Category.name.in_(BENCH_CATEGORIES)))).all())
+    missing = [{"name": name} for name in BENCH_CATEGORIES if name not in existing]
+    if missing:
+        await session.execute(pg_insert(Category), missing)
+
+    codes = [code for code, _, _ in BENCH_CURRENCIES]
+    existing = set((await session.scalars(select(Currency.code).filter(Currency.code.in_(codes)))).all())
+    missing = [{"code": code, "name": name, "exchange_rate": rate}
+               for code, name, rate in BENCH_CURRENCIES if code not in existing]
+    if missing:
+        await session.execute(pg_insert(Currency), missing)
+    await session.commit()
+
+    categories = (await session.scalars(select(Category.id))).all()
+    currencies = (await session.scalars(select(Currency.id))).all()
+    types = (await session.scalars(select(TransactionsType.id))).all()
+    return categories, currencies, types
+
+
+async def seed(users: int, transactions: int, days: int, batch_size: int, seed_value: int) -> dict:
+    rng = random.Random(seed_value)
+    # bcrypt is deliberately slow; every bench user gets the same hash.
+    password = hash_password(BENCH_PASSWORD)
+
+    async with db_helper.session_getter_md() as session:
+        categories, currencies, types = await _reference_ids(session)
+
+        await session.execute(pg_insert(User).values([
+            {"username": bench_username(n), "email": f"{bench_username(n)}@bench.local", "password": password}
+            for n in range(users)
+        ]).on_conflict_do_nothing(index_elements=["username"]))
+        await session.commit()
+
+        result = await session.execute(
+            select(User.id, func.count(Transactions.id))
+            .outerjoin(Transactions, Transactions.user_id == User.id)
+            .where(User.username.in_([bench_username(n) for n in range(users)]))
+            .group_by(User.id)
+        )
+        empty_users = [user_id for user_id, count in result.all() if count == 0]
+
+        today = date.today()
+        rows, written = [], 0
+        for user_id in empty_users:
+            for _ in range(transactions):
+                rows.append({
+                    "user_id": user_id,
+                    "category_id": rng.choice(categories),
+                    "description": rng.choice(BENCH_DESCRIPTIONS),
+                    "amount": Decimal(rng.randint(100, 500000)) / 100,
+                    "transaction_type_id": rng.choice(types),
+                    "currency_id": rng.choice(currencies),
+                    "date": today - timedelta(days=rng.randrange(days)),
+                })
+                if len(rows) >= batch_size:
+                    await session.execute(pg_insert(Transactions), rows)
+                    written += len(rows)
+                    rows = []
+        if rows:
+            await session.execute(pg_insert(Transactions), rows)
+            written += len(rows)
+
+        for user_id in empty_users:
+            await rebuild_daily_balances(session, user_id=user_id)
+
+    return {"users": users, "seeded_users": len(empty_users), "transactions": written}
+
+
+async def run(args) -> dict:
+    try:
+        return await seed(args.users, args.transactions, args.days, args.batch_size, args.seed)
+    finally:
+        await db_helper.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--transactions", type=int, default=1000, help="transactions per user")
+    parser.add_argument("--days", type=int, default=730, help="spread transactions over this many past days")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Per-row cost of the transaction list read path: ORM objects + pydantic (the old path)
+against row tuples + RowSerializer + orjson (the current path). Database time is not included.
+
+    python -m bench.serialization --rows 100 --repeat 200
+"""
+import argparse
+import json
+import timeit
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from core.models.transactions import Transactions
+from core.schemas.transaction import TransactionOut, TransactionListResponse
+from core.serialization import RowSerializer, dumps
+from crud.transactions import OUT_COLUMNS
+
+
+def make_rows(count: int) -> list[tuple]:
+    now = datetime(2025, 4, 26, 22, 49, 34, 557800)
+    values = {
+        "user_id": 1, "category_id": 3, "description": "Coffee", "amount": Decimal("4.50"),
+        "transaction_type_id": 2, "currency_id": 1, "created_at": now, "updated_at": now,
+    }
+    return [tuple({**values, "id": i, "date": date(2025, 1, 1) + timedelta(days=i % 365)}[name] for name in OUT_COLUMNS)
+            for i in range(count)]
+
+
+def orm_path(rows: list[tuple]) -> bytes:
+    objects = [Transactions(**dict(zip(OUT_COLUMNS, row))) for row in rows]
+    items = [TransactionOut.model_validate(obj, from_attributes=True) for obj in objects]
+    return TransactionListResponse(total=len(items), items=items).model_dump_json().encode()
+
+
+def row_path(rows: list[tuple], serializer: RowSerializer) -> bytes:
+    return dumps({"total": len(rows), "items": serializer.to_dicts(rows), "next_cursor": None})
+
+
+def run(rows: int, repeat: int) -> dict:
+    data = make_rows(rows)
+    serializer = RowSerializer(OUT_COLUMNS, float_columns=("amount",),
+                               extra={"converted_amount": None, "converted_currency_id": None})
+
+    results = {}
+    for name, func in (("orm_pydantic", lambda: orm_path(data)), ("rows_orjson", lambda: row_path(data, serializer))):
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        results[name] = {"page_ms": round(best * 1000, 4), "per_row_us": round(best / rows * 1e6, 3)}
+    results["speedup"] = round(results["orm_pydantic"]["page_ms"] / results["rows_orjson"]["page_ms"], 2)
+    return {"rows": rows, "repeat": repeat, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.repeat), indent=2))
+
+
+if __name__ == '__main__':
+    main()
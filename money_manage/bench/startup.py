@@ -0,0 +1,100 @@
+"""
+Cold import cost of the app, measured with `python -X importtime` in a fresh interpreter.
+
+Record a baseline on the machine that runs the check, then compare against it; the check
+exits with status 1 when the import got more than --tolerance slower than the baseline.
+Import times depend on the machine, so the baseline file is local and not committed.
+
+    python -m bench.startup --record
+    python -m bench.startup --tolerance 0.5 --top 15
+"""
+import argparse
+import json
+import platform
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).parent.parent
+BASELINE_FILE = Path(__file__).parent / "startup_baseline.json"
+# "import time:      self [us] |  cumulative | imported package"
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str) -> list[tuple[str, int, int]]:
+    """
+    (module, self_us, cumulative_us) for every top-level import reported by -X importtime.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=APP_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append((name, int(self_us), int(cumulative_us), len(indent)))
+    top_level_indent = min(indent for *_, indent in imports)
+    return [(name, self_us, cumulative_us) for name, self_us, cumulative_us, indent in imports
+            if indent == top_level_indent]
+
+
+def fastest_import(module: str, runs: int) -> tuple[float, list[tuple[str, int, int]]]:
+    """
+    (total_ms, imports) of the fastest of `runs` imports. The first run also pays for
+    writing .pyc files, and the minimum is the least noisy figure on a busy machine.
+    """
+    results = []
+    for _ in range(runs):
+        imports = measure(module)
+        results.append((sum(cumulative_us for _, _, cumulative_us in imports) / 1000, imports))
+    return min(results, key=lambda result: result[0])
+
+
+def load_baseline(module: str) -> dict | None:
+    if not BASELINE_FILE.exists():
+        return None
+    return json.loads(BASELINE_FILE.read_text()).get(module)
+
+
+def record_baseline(module: str, total_ms: float) -> None:
+    baselines = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    baselines[module] = {"total_ms": round(total_ms, 1), "python": platform.python_version()}
+    BASELINE_FILE.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed slowdown over the baseline, as a fraction of it")
+    parser.add_argument("--record", action="store_true", help=f"store the measurement in {BASELINE_FILE.name}")
+    parser.add_argument("--top", type=int, default=15, help="list the slowest top-level imports")
+    args = parser.parse_args()
+
+    total_ms, imports = fastest_import(args.module, args.runs)
+    if args.record:
+        record_baseline(args.module, total_ms)
+    baseline = load_baseline(args.module)
+    limit_ms = baseline["total_ms"] * (1 + args.tolerance) if baseline else None
+
+    slowest = sorted(imports, key=lambda item: item[2], reverse=True)[:args.top]
+    print(json.dumps({
+        "module": args.module,
+        "total_ms": round(total_ms, 1),
+        "baseline_ms": baseline["total_ms"] if baseline else None,
+        "limit_ms": round(limit_ms, 1) if limit_ms else None,
+        "slowest": [{"module": name, "cumulative_ms": round(cumulative_us / 1000, 1)}
+                    for name, _, cumulative_us in slowest],
+    }, indent=2))
+    if limit_ms is None:
+        raise SystemExit(f"No baseline for {args.module}; run with --record first")
+    raise SystemExit(0 if total_ms <= limit_ms else 1)
+
+
+if __name__ == '__main__':
+    main()
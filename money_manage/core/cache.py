@@ -0,0 +1,128 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Protocol
+
+
+class TTLCache:
+    """
+    Small in-process LRU cache whose entries expire after a time-to-live.
+
+    Each entry may carry its own ttl; the oldest entries are evicted once
+    `maxsize` is reached.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            self._data.pop(key, None)
+            return
+
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_MISSING = object()
+
+
+class CacheBackend(Protocol):
+    # Whether every worker sees the same entries.
+    shared: bool
+
+    async def get(self, key: str) -> str | None: ...
+
+    async def set(self, key: str, value: str, ttl: float) -> None: ...
+
+    async def delete(self, *keys: str) -> None: ...
+
+
+class InMemoryBackend:
+    """
+    Per-process `CacheBackend` on top of `TTLCache`.
+    """
+    shared = False
+
+    def __init__(self, maxsize: int = 10000):
+        self._cache = TTLCache(maxsize=maxsize)
+
+    async def get(self, key: str) -> str | None:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._cache.pop(key)
+
+
+class RedisBackend:
+    """
+    `CacheBackend` shared between workers. Accepts any client with the `redis.asyncio`
+    get/set/delete API, so tests and local runs can pass an in-memory stand-in.
+    """
+    shared = True
+
+    def __init__(self, client, prefix: str = "money_manage:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisBackend":
+        import redis.asyncio
+
+        return cls(redis.asyncio.from_url(url, decode_responses=True), **kwargs)
+
+    async def get(self, key: str) -> str | None:
+        value = await self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode()
+        return value
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        if ttl <= 0:
+            await self.delete(key)
+            return
+        await self.client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+
+def create_cache_backend(redis_url: str | None = None, maxsize: int = 10000) -> CacheBackend:
+    if redis_url:
+        return RedisBackend.from_url(redis_url)
+    return InMemoryBackend(maxsize=maxsize)
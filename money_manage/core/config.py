@@ -1,4 +1,7 @@
+from functools import lru_cache
 from pathlib import Path
+from typing import Literal
+
 from pydantic import BaseModel
 from pydantic import PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -10,16 +13,68 @@ BASE_DIR = Path(__file__).parent.parent
 class RunConfig(BaseModel):
     host: str = "localhost"
     port: int = 8000
+    workers: int = 1
+    loop: Literal["auto", "asyncio", "uvloop"] = "auto"
+    http: Literal["auto", "h11", "httptools"] = "auto"
+    backlog: int = 2048
+    timeout_keep_alive: int = 5
 
 class ApiPrefix(BaseModel):
     prefix: str = "/api/v1"
 
+class PaginationConfig(BaseModel):
+    count_cache_seconds: float = 30.0
+    count_cache_size: int = 10000
+
+class CacheConfig(BaseModel):
+    redis_url: str | None = None
+    size: int = 10000
+    user_ttl_seconds: float = 300.0
+    reissue_ttl_seconds: float = 5.0
+    # Without Redis: how long a "not revoked" answer from the database is trusted.
+    revocation_check_seconds: float = 5.0
+    # Categories, currencies and transaction types: reloaded on NOTIFY, or on this interval without it.
+    reference_listen: bool = True
+    reference_reload_seconds: float = 60.0
+
+class CurrencyConfig(BaseModel):
+    rates_check_seconds: float = 10.0
+
+class QueryConfig(BaseModel):
+    max_scan_days: int = 366
+    stats_enabled: bool = False
+    slow_query_ms: float = 200.0
+    slow_query_sample_rate: float = 1.0
+    repeated_statement_threshold: int = 10
+
+class RateLimitConfig(BaseModel):
+    enabled: bool = True
+    rate_per_second: float = 10.0
+    burst: int = 20
+    redis_url: str | None = None
+    max_concurrency: int = 50
+    max_queue: int = 200
+    max_wait_seconds: float = 2.0
+
+class MetricsConfig(BaseModel):
+    enabled: bool = False
+    path: str = "/metrics"
+
 class DataBaseConfig(BaseSettings):
     url: str = PostgresDsn
     echo: bool = False
     echo_pool: bool = False
     max_overflow: int = 50
     pool_size: int = 10
+    # Connections all workers together may open. When set, each worker gets an equal share
+    # instead of pool_size + max_overflow.
+    max_connections: int | None = None
+    # Read-only endpoints are spread over these by weight (one weight per url, default 1 each).
+    replica_urls: list[str] = []
+    replica_weights: list[int] | None = None
+    replica_check_seconds: float = 5.0
+    # After a user writes, their reads stay on the primary for this long.
+    read_your_writes_seconds: float = 5.0
 
     naming_convention: dict[str, str] = {
         "ix": "ix_%(column_0_label)s",
@@ -35,6 +90,11 @@ class AuthJWT(BaseModel):
     algorithm: str = 'RS256'
     expire_minutes: int = 1
     refresh_token_expire_minutes: int = 15000
+    key_check_seconds: float = 5.0
+    token_cache_size: int = 4096
+    bcrypt_rounds: int = 12
+    hash_executor: Literal["thread", "process"] = "thread"
+    hash_workers: int = 4
 
 
 class Settings(BaseSettings):
@@ -46,7 +106,52 @@ class Settings(BaseSettings):
     )
     run: RunConfig = RunConfig()
     api: ApiPrefix = ApiPrefix()
+    pagination: PaginationConfig = PaginationConfig()
+    cache: CacheConfig = CacheConfig()
+    currency: CurrencyConfig = CurrencyConfig()
+    query: QueryConfig = QueryConfig()
+    rate_limit: RateLimitConfig = RateLimitConfig()
+    metrics: MetricsConfig = MetricsConfig()
     db: DataBaseConfig
     auth_jwt: AuthJWT = AuthJWT()
 
-settings = Settings()
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
+
+class Lazy:
+    """
+    Stands in for the object `factory` returns and builds it on first attribute access.
+    Module-level singletons configured from the settings use it, so importing a module
+    reads neither .env nor the environment.
+    """
+    __slots__ = ("_factory", "_instance")
+
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+
+    def _get(self):
+        instance = object.__getattribute__(self, "_instance")
+        if instance is None:
+            instance = object.__getattribute__(self, "_factory")()
+            object.__setattr__(self, "_instance", instance)
+        return instance
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._get(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._get(), name)
+
+
+def is_loaded(lazy: Lazy) -> bool:
+    return object.__getattribute__(lazy, "_instance") is not None
+
+
+settings: Settings = Lazy(get_settings)  # type: ignore[assignment]
@@ -0,0 +1,148 @@
+import asyncio
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Iterable
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import Lazy, settings
+from core.models.currencies import Currency, CurrencyRate
+
+AMOUNT_QUANT = Decimal("0.01")
+
+
+class UnknownCurrencyError(ValueError):
+    pass
+
+
+class RateHistory:
+    """
+    Point-in-time rates: per currency, a sorted array of `valid_from` dates and a parallel
+    array of rates, searched with bisect.
+    """
+
+    def __init__(self, rows: Iterable[tuple[int, date, Decimal]] = ()):
+        self._dates: dict[int, list[date]] = {}
+        self._rates: dict[int, list[Decimal]] = {}
+        for currency_id, valid_from, rate in sorted(rows):
+            self._dates.setdefault(currency_id, []).append(valid_from)
+            self._rates.setdefault(currency_id, []).append(Decimal(rate))
+
+    def rate_at(self, currency_id: int, on: date) -> Decimal | None:
+        """
+        Rate in effect on `on`, or None if the currency has no history that early.
+        """
+        dates = self._dates.get(currency_id)
+        if not dates:
+            return None
+        index = bisect_right(dates, on) - 1
+        return self._rates[currency_id][index] if index >= 0 else None
+
+    def __len__(self) -> int:
+        return sum(len(dates) for dates in self._dates.values())
+
+
+@dataclass(frozen=True)
+class RatesSnapshot:
+    """
+    Immutable copy of every currency's latest `exchange_rate` (value of one unit in the base currency)
+    and of the `currency_rates` history. `version` changes whenever either table changes.
+    """
+    version: tuple = ()
+    rates: dict[int, Decimal] = field(default_factory=dict)
+    ids_by_code: dict[str, int] = field(default_factory=dict)
+    history: RateHistory = field(default_factory=RateHistory)
+
+    def currency_id(self, code: str) -> int:
+        try:
+            return self.ids_by_code[code.upper()]
+        except KeyError:
+            raise UnknownCurrencyError(f"Unknown currency: {code}")
+
+    def rate(self, currency_id: int) -> Decimal:
+        """
+        Latest `exchange_rate` of the currency.
+        """
+        try:
+            return self.rates[currency_id]
+        except KeyError:
+            raise UnknownCurrencyError(f"Unknown currency id: {currency_id}")
+
+    def factor(self, from_currency_id: int, to_currency_id: int, on: date | None = None) -> Decimal:
+        """
+        Multiplier from one currency into another. Both rates come from the history when it covers
+        `on` for both currencies, otherwise both are the latest rates; the two are never mixed.
+        """
+        if on is not None:
+            from_rate = self.history.rate_at(from_currency_id, on)
+            to_rate = self.history.rate_at(to_currency_id, on)
+            if from_rate is not None and to_rate is not None:
+                return from_rate / to_rate
+        return self.rate(from_currency_id) / self.rate(to_currency_id)
+
+    def convert_many(self, items: Iterable[tuple[Decimal | float, int] | tuple[Decimal | float, int, date | None]],
+                     to_currency_id: int) -> list[Decimal]:
+        """
+        Convert `(amount, currency_id)` or `(amount, currency_id, date)` items into `to_currency_id`
+        with Decimal arithmetic, rounding each result to cents. Items with a date use the rates in
+        effect on that date (see `factor`); the factor for each (currency, date) pair is computed once.
+        """
+        factors: dict[tuple[int, date | None], Decimal] = {}
+        converted = []
+        for amount, currency_id, *on in items:
+            on = on[0] if on else None
+            factor = factors.get((currency_id, on))
+            if factor is None:
+                factor = factors[(currency_id, on)] = self.factor(currency_id, to_currency_id, on)
+            converted.append((Decimal(str(amount)) * factor).quantize(AMOUNT_QUANT, rounding=ROUND_HALF_EVEN))
+        return converted
+
+
+class CurrencyConverter:
+    """
+    Keeps the current `RatesSnapshot` in memory. At most every `check_interval` seconds it asks
+    Postgres for max(updated_at) and the row count of both rate tables, and reloads the rates
+    only when they changed.
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._snapshot = RatesSnapshot()
+        self._checked_at = None
+        self._lock = asyncio.Lock()
+
+    async def snapshot(self, session: AsyncSession) -> RatesSnapshot:
+        if self._checked_at is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return self._snapshot
+
+        async with self._lock:
+            if self._checked_at is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return self._snapshot
+
+            result = await session.execute(select(
+                select(func.max(Currency.updated_at)).scalar_subquery(),
+                select(func.count(Currency.id)).scalar_subquery(),
+                select(func.max(CurrencyRate.updated_at)).scalar_subquery(),
+                select(func.count(CurrencyRate.id)).scalar_subquery(),
+            ))
+            version = tuple(result.one())
+            if version != self._snapshot.version:
+                result = await session.execute(select(Currency.id, Currency.code, Currency.exchange_rate))
+                rows = result.all()
+                history = await session.execute(
+                    select(CurrencyRate.currency_id, CurrencyRate.valid_from, CurrencyRate.rate))
+                self._snapshot = RatesSnapshot(
+                    version=version,
+                    rates={row.id: Decimal(row.exchange_rate) for row in rows},
+                    ids_by_code={row.code.upper(): row.id for row in rows},
+                    history=RateHistory(history.all()),
+                )
+            self._checked_at = time.monotonic()
+        return self._snapshot
+
+
+currency_converter = Lazy(lambda: CurrencyConverter(check_interval=settings.currency.rates_check_seconds))
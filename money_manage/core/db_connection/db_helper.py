@@ -1,8 +1,96 @@
+import asyncio
+import os
+import time
 from contextlib import asynccontextmanager
 
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
-from money_manage.core.config import settings
+from core.cache import create_cache_backend
+from core.metrics import TimedQueuePool, instrument_engine
+from core.query_stats import install_query_stats
+from core.config import Lazy, is_loaded, settings
+
+class Replica:
+    def __init__(self, url: str, weight: int, engine):
+        self.url = url
+        self.weight = weight
+        self.engine = engine
+        self.session_factory = _session_factory(engine)
+        self.healthy = True
+        self.current_weight = 0
+        event.listen(engine.sync_engine, "handle_error", self._on_error)
+
+    def _on_error(self, context):
+        # Any statement or checkout on this replica that loses its connection takes the
+        # replica out of rotation until the next health check.
+        if context.is_disconnect:
+            self.healthy = False
+
+
+class ReplicaPool:
+    """
+    Smooth weighted round-robin over the healthy replicas. Every `check_interval` seconds
+    a background `SELECT 1` against each replica updates its health; a replica that
+    cannot hand out a connection, or whose connection breaks mid-request, is taken out
+    of rotation until the next check.
+    """
+
+    def __init__(self, replicas: list[Replica], check_interval: float, check_timeout: float = 2.0):
+        self.replicas = replicas
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self._checked_at = time.monotonic()
+        self._checking: asyncio.Task | None = None
+
+    def pick(self) -> Replica | None:
+        self._schedule_check()
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+
+        total = 0
+        for replica in healthy:
+            replica.current_weight += replica.weight
+            total += replica.weight
+        best = max(healthy, key=lambda replica: replica.current_weight)
+        best.current_weight -= total
+        return best
+
+    def _schedule_check(self):
+        now = time.monotonic()
+        if self._checking is None and now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            self._checking = asyncio.ensure_future(self.check())
+            self._checking.add_done_callback(self._check_done)
+
+    def _check_done(self, task: asyncio.Task):
+        self._checking = None
+
+    async def check(self):
+        await asyncio.gather(*(self._check_one(replica) for replica in self.replicas))
+
+    async def _check_one(self, replica: Replica):
+        try:
+            await asyncio.wait_for(self._ping(replica), timeout=self.check_timeout)
+            replica.healthy = True
+        except Exception:
+            replica.healthy = False
+
+    @staticmethod
+    async def _ping(replica: Replica):
+        async with replica.engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+
+def _session_factory(engine):
+    return async_sessionmaker(bind=engine,
+                              autocommit=False,
+                              autoflush=False,
+                              expire_on_commit=False)
+
 
 class DatabaseHelper:
     def __init__(self,
@@ -11,34 +99,210 @@ class DatabaseHelper:
                  echo_pool: bool = False,
                  max_overflow: int = 10,
                  pool_size: int = 10,
+                 instrument: bool = False,
+                 track_queries: bool = False,
+                 replica_urls: list[str] | None = None,
+                 replica_weights: list[int] | None = None,
+                 replica_check_seconds: float = 5.0,
+                 read_your_writes_seconds: float = 5.0,
                  ):
-        self.engine = create_async_engine(url=url,
-                                          echo=echo,
-                                          echo_pool=echo_pool,
-                                          max_overflow=max_overflow,
-                                          pool_size=pool_size
-                                          )
-
-        self.session_factory = async_sessionmaker(bind=self.engine,
-                                                  autocommit=False,
-                                                  autoflush=False,
-                                                  expire_on_commit=False)
+        self.url = url
+        self.instrument = instrument
+        self.track_queries = track_queries
+        self._engine_kwargs = dict(echo=echo, echo_pool=echo_pool, max_overflow=max_overflow, pool_size=pool_size)
+        # Engines are created on first use, so importing the app does not load the driver.
+        self._engine = None
+        self._session_factory = None
+
+        self._replica_urls = list(replica_urls or [])
+        self._replica_weights = replica_weights or [1] * len(self._replica_urls)
+        if len(self._replica_weights) != len(self._replica_urls):
+            raise ValueError("replica_weights must have one weight per replica url")
+        self._replica_check_seconds = replica_check_seconds
+        self._replicas = None
+
+        # user id -> marker, set for `read_your_writes_seconds` after the user wrote something.
+        # Kept in the shared cache backend so every worker sees it.
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self._recent_writers = create_cache_backend(settings.cache.redis_url, maxsize=settings.cache.size)
+
+    def _create_engine(self, url: str, primary: bool = True):
+        engine_kwargs = {"poolclass": TimedQueuePool} if self.instrument else {}
+        if not primary:
+            # A replica that went away is noticed at checkout, where the read can still move to the primary.
+            engine_kwargs["pool_pre_ping"] = True
+        engine = create_async_engine(url=url, **self._engine_kwargs, **engine_kwargs)
+        if self.instrument:
+            instrument_engine(engine, pool_gauges=primary)
+        if self.track_queries:
+            install_query_stats(engine)
+        return engine
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = self._create_engine(self.url)
+        return self._engine
+
+    @property
+    def session_factory(self):
+        if self._session_factory is None:
+            self._session_factory = _session_factory(self.engine)
+        return self._session_factory
+
+    @property
+    def replicas(self) -> ReplicaPool | None:
+        if self._replicas is None and self._replica_urls:
+            self._replicas = ReplicaPool(
+                [Replica(replica_url, weight, self._create_engine(replica_url, primary=False))
+                 for replica_url, weight in zip(self._replica_urls, self._replica_weights)],
+                check_interval=self._replica_check_seconds,
+            )
+        return self._replicas
+
+    def _engines(self):
+        # Only the engines that were actually created.
+        if self._engine is not None:
+            yield self._engine
+        if self._replicas is not None:
+            for replica in self._replicas.replicas:
+                yield replica.engine
+
     async def dispose(self):
-        await self.engine.dispose()
+        for engine in self._engines():
+            await engine.dispose()
+
+    def reset_after_fork(self):
+        """
+        Drop the pooled connections inherited from the parent without closing them,
+        so a forked worker never shares a socket with its parent.
+        """
+        for engine in self._engines():
+            engine.sync_engine.dispose(close=False)
 
     @asynccontextmanager
     async def session_getter_md(self):
         async with self.session_factory() as session:
             yield session
 
-    async def session_getter(self):
+    @asynccontextmanager
+    async def write_session_getter_md(self, user_id: str | None = None):
+        """
+        Session on the primary. Once it commits, `user_id`'s reads go to the primary for
+        `read_your_writes_seconds`, since the replicas may not have the write yet.
+        """
         async with self.session_factory() as session:
+            if not self._replica_urls:
+                yield session
+                return
+
+            event.listen(session.sync_session, "after_commit", _record_commit)
+            try:
+                yield session
+            finally:
+                if session.info.get("committed"):
+                    await self.mark_write(user_id)
+
+    async def mark_write(self, user_id: str | None):
+        if self._replica_urls and user_id is not None:
+            await self._recent_writers.set(f"wrote:{user_id}", "1", ttl=self.read_your_writes_seconds)
+
+    async def _pick_replica(self, user_id: str | None) -> Replica | None:
+        if self.replicas is None:
+            return None
+        if user_id is not None and await self._recent_writers.get(f"wrote:{user_id}"):
+            return None
+        return self.replicas.pick()
+
+    @asynccontextmanager
+    async def read_session_getter_md(self, user_id: str | None = None):
+        """
+        Session on a replica, or on the primary when there are no healthy replicas, the picked
+        replica cannot hand out a connection, or `user_id` wrote recently.
+        `session.info["replica"]` tells which one it is.
+        """
+        replica = await self._pick_replica(user_id)
+        session = await self._replica_session(replica) if replica is not None else None
+        async with session or self.session_factory() as session:
+            session.info["replica"] = session.bind is not self.engine
             yield session
 
-db_helper = DatabaseHelper(
-    url=str(settings.db.url),
-    echo=settings.db.echo,
-    echo_pool=settings.db.echo_pool,
-    max_overflow=settings.db.max_overflow,
-    pool_size=settings.db.pool_size,
-)
\ No newline at end of file
+    async def _replica_session(self, replica: Replica):
+        """
+        Session on `replica` with its connection already checked out (and pre-pinged), or None
+        after marking the replica unhealthy when it cannot provide one in time.
+        """
+        session = replica.session_factory()
+        try:
+            await asyncio.wait_for(session.connection(), timeout=self.replicas.check_timeout)
+            return session
+        except (DBAPIError, OSError, asyncio.TimeoutError):
+            replica.healthy = False
+            await session.close()
+            return None
+
+
+
+def _record_commit(session):
+    session.info["committed"] = True
+
+
+def _request_user_id(request: Request) -> str | None:
+    user = getattr(request.state, "user", None)
+    return user.get("sub") if user else None
+
+
+def worker_pool_sizes(pool_size: int, max_overflow: int, max_connections: int | None, workers: int) -> tuple[int, int]:
+    """
+    (pool_size, max_overflow) for one worker so that `workers` processes together stay
+    within `max_connections`. Without a budget the configured sizes are used as they are.
+    """
+    if max_connections is None:
+        return pool_size, max_overflow
+    per_worker = max(1, max_connections // max(1, workers))
+    worker_pool_size = min(pool_size, per_worker)
+    return worker_pool_size, per_worker - worker_pool_size
+
+
+def _create_db_helper() -> DatabaseHelper:
+    pool_size, max_overflow = worker_pool_sizes(settings.db.pool_size, settings.db.max_overflow,
+                                                settings.db.max_connections, settings.run.workers)
+    return DatabaseHelper(
+        url=str(settings.db.url),
+        echo=settings.db.echo,
+        echo_pool=settings.db.echo_pool,
+        max_overflow=max_overflow,
+        pool_size=pool_size,
+        instrument=settings.metrics.enabled,
+        track_queries=settings.query.stats_enabled,
+        replica_urls=settings.db.replica_urls,
+        replica_weights=settings.db.replica_weights,
+        replica_check_seconds=settings.db.replica_check_seconds,
+        read_your_writes_seconds=settings.db.read_your_writes_seconds,
+    )
+
+
+db_helper: DatabaseHelper = Lazy(_create_db_helper)  # type: ignore[assignment]
+
+
+def _reset_after_fork():
+    # A helper that was never used has no connections to drop.
+    if is_loaded(db_helper):
+        db_helper.reset_after_fork()
+
+
+# Request dependencies. Module functions rather than bound methods, so declaring a route
+# does not build the helper.
+async def session_getter(request: Request):
+    async with db_helper.write_session_getter_md(_request_user_id(request)) as session:
+        yield session
+
+
+async def read_session_getter(request: Request):
+    async with db_helper.read_session_getter_md(_request_user_id(request)) as session:
+        yield session
+
+
+# Gunicorn and multiprocessing fork workers after the app module may have been imported.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
\ No newline at end of file
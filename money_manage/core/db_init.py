@@ -1,15 +1,11 @@
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from core.models.transactions import TransactionsType
+from core.models.transactions import TransactionsType, INCOME_TYPE_NAME, EXPENSE_TYPE_NAME
 
 async def init_transactions_types(session: AsyncSession):
-    result = await session.execute(select(TransactionsType))
-    existing_types = result.scalars().all()
-
-    if not existing_types:
-        default_types = [
-            TransactionsType(eng_name="Income", ru_name="Доход"),
-            TransactionsType(eng_name="Expense", ru_name="Расход")
-        ]
-        session.add_all(default_types)
-        await session.commit()
+    # One round trip, safe to run from every worker at once.
+    await session.execute(pg_insert(TransactionsType).values([
+        {"eng_name": INCOME_TYPE_NAME, "ru_name": "Доход"},
+        {"eng_name": EXPENSE_TYPE_NAME, "ru_name": "Расход"},
+    ]).on_conflict_do_nothing())
+    await session.commit()
@@ -0,0 +1,150 @@
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from core.config import settings
+
+# Seconds. Covers everything from a cached JWT check to a slow export query.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus text format. `observe` is a bisect
+    and three additions, so it is cheap enough for per-statement use.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Gauge:
+    """
+    Gauge read from `callback` at scrape time, so nothing is tracked between scrapes.
+    """
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge",
+                f"{self.name} {self.callback()}"]
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool | None = None):
+        # None: follow settings.metrics.enabled, read on first use.
+        self._enabled = enabled
+        self._metrics: dict[str, Histogram | Gauge] = {}
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is None:
+            self._enabled = settings.metrics.enabled
+        return self._enabled
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "Request latency by route template.", ("method", "route", "status")))
+db_query_seconds = registry.register(Histogram(
+    "db_query_duration_seconds", "Time spent executing SQL statements."))
+db_pool_wait_seconds = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection."))
+jwt_verify_seconds = registry.register(Histogram(
+    "jwt_verify_duration_seconds", "Time spent verifying JWT signatures (cache misses only)."))
+bcrypt_seconds = registry.register(Histogram(
+    "bcrypt_duration_seconds", "bcrypt hash/verify latency, including time queued for the hash pool.",
+    ("op",), buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)))
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout waited for a free connection.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_wait_seconds.observe(time.perf_counter() - start)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    db_query_seconds.observe(time.perf_counter() - context._metrics_start)
+
+
+def instrument_engine(engine, pool_gauges: bool = True) -> None:
+    """
+    Attach statement timing to `engine` and, with `pool_gauges`, publish its pool state as gauges.
+    The engine should be created with `poolclass=TimedQueuePool` to get checkout wait times.
+    """
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    if not pool_gauges:
+        return
+
+    pool = sync_engine.pool
+    registry.register(Gauge("db_pool_size", "Configured pool size.", pool.size))
+    registry.register(Gauge("db_pool_checked_out", "Connections currently checked out.", pool.checkedout))
+    registry.register(Gauge("db_pool_overflow", "Connections open beyond pool_size.",
+                            lambda: max(pool.overflow(), 0)))
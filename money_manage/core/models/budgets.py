@@ -1,6 +1,5 @@
 from sqlalchemy import String, nullsfirst
-from sqlalchemy.orm import Mapped, relationship
-from sqlalchemy.testing.schema import mapped_column
+from sqlalchemy.orm import Mapped, relationship, mapped_column
 from core.db_connection.database import Base
 
 class Category(Base):
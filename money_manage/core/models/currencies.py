@@ -1,8 +1,7 @@
-from datetime import datetime, timezone
+from datetime import datetime, timezone, date
 
-from sqlalchemy import String, DECIMAL, DateTime
-from sqlalchemy.orm import Mapped, relationship
-from sqlalchemy.testing.schema import mapped_column
+from sqlalchemy import String, DECIMAL, DateTime, Date, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, relationship, mapped_column
 
 from core.db_connection.database import Base
 
@@ -24,4 +23,28 @@ class Currency(Base):
         nullable=False
     )
 
-    transactions: Mapped[list["Transactions"]] = relationship(back_populates="currency")
\ No newline at end of file
+    transactions: Mapped[list["Transactions"]] = relationship(back_populates="currency")
+    rates: Mapped[list["CurrencyRate"]] = relationship(back_populates="currency")
+
+
+class CurrencyRate(Base):
+    """
+    Exchange rate of a currency from `valid_from` until the next entry for the same currency.
+    """
+    __tablename__ = 'currency_rates'
+
+    currency_id: Mapped[int] = mapped_column(ForeignKey('currencies.id'))
+    valid_from: Mapped[date] = mapped_column(Date, nullable=False)
+    rate: Mapped[DECIMAL] = mapped_column(DECIMAL, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        onupdate=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        nullable=False
+    )
+
+    currency: Mapped["Currency"] = relationship(back_populates="rates")
+
+    __table_args__ = (
+        UniqueConstraint('currency_id', 'valid_from', name='uq_currency_rates_currency_id_valid_from'),
+    )
@@ -0,0 +1,27 @@
+from datetime import date
+
+from sqlalchemy import ForeignKey, Date, DECIMAL, Integer, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.db_connection.database import Base
+
+
+class DailyBalance(Base):
+    """
+    Sum and count of a user's transactions per day, category, type and currency.
+    Maintained in the same transaction as every write to `transactions`.
+    """
+    __tablename__ = 'daily_balances'
+
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    date: Mapped[date] = mapped_column(Date, nullable=False)
+    category_id: Mapped[int] = mapped_column(ForeignKey('categories.id'))
+    transaction_type_id: Mapped[int] = mapped_column(ForeignKey('transactions_type.id'))
+    currency_id: Mapped[int] = mapped_column(ForeignKey('currencies.id'))
+    amount: Mapped[float] = mapped_column(DECIMAL, nullable=False, default=0)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'date', 'category_id', 'transaction_type_id', 'currency_id',
+                         name='uq_daily_balances_key'),
+    )
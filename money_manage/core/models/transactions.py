@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
 from sqlalchemy.orm import Mapped, mapped_column, foreign, relationship
-from sqlalchemy import String, Boolean, DateTime, ForeignKey, Date, CheckConstraint, DECIMAL
+from sqlalchemy import String, Boolean, DateTime, ForeignKey, Date, CheckConstraint, DECIMAL, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from datetime import date
 from core.db_connection.database import Base
 from core.models.budgets import Category
@@ -16,6 +17,8 @@ class Transactions(Base):
     )
     category_id: Mapped[int] = mapped_column(ForeignKey('categories.id'))
     description: Mapped[str] = mapped_column(String(256), nullable=True)
+    # Filled by the trg_transactions_description_tsv trigger (see the description search migration).
+    description_tsv: Mapped[str] = mapped_column(TSVECTOR, nullable=True, deferred=True)
     amount: Mapped[float] = mapped_column(DECIMAL, nullable=False)
     transaction_type_id: Mapped[int] = mapped_column(ForeignKey('transactions_type.id'))
     currency_id: Mapped[int] = mapped_column(ForeignKey('currencies.id'))
@@ -36,9 +39,20 @@ class Transactions(Base):
 
     __table_args__ = (
         CheckConstraint('amount >= 0 AND amount <= 999999999999', name='check_amount_positive'),
+        Index('ix_transactions_user_id_date_id', 'user_id', text('date DESC'), 'id'),
+        Index('ix_transactions_user_id_category_id_date', 'user_id', 'category_id', 'date'),
+        # GIN over (user_id, ...) needs btree_gin; the trigram index needs pg_trgm. The migration
+        # drops user_id from the first and skips the second when those extensions are missing.
+        Index('ix_transactions_user_id_description_tsv', 'user_id', 'description_tsv', postgresql_using='gin'),
+        Index('ix_transactions_user_id_description_trgm', 'user_id', 'description', postgresql_using='gin',
+              postgresql_ops={'description': 'gin_trgm_ops'}),
     )
 
 
+INCOME_TYPE_NAME = "Income"
+EXPENSE_TYPE_NAME = "Expense"
+
+
 class TransactionsType(Base):
     __tablename__ = 'transactions_type'
 
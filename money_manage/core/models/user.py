@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Boolean, DateTime
+from sqlalchemy import String, Boolean, DateTime, BigInteger
 
 from core.db_connection.database import Base
 
@@ -23,5 +23,18 @@ class User(Base):
     )
     first_name: Mapped[str] = mapped_column(String(50), nullable=True)
     last_name: Mapped[str] = mapped_column(String(50), nullable=True)
+    # Bumped by every write to the user's transactions; read endpoints build their ETags from it.
+    transactions_version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
 
-    transactions: Mapped[list['Transactions']] = relationship(back_populates="user",cascade="all, delete-orphan")
\ No newline at end of file
+    transactions: Mapped[list['Transactions']] = relationship(back_populates="user",cascade="all, delete-orphan")
+
+
+class RevokedToken(Base):
+    """
+    Refresh tokens revoked by logout, by sha256 of the token, kept until they would have expired.
+    """
+    __tablename__ = 'revoked_tokens'
+
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    # Indexed for pruning the expired rows.
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
@@ -0,0 +1,44 @@
+import base64
+import json
+from datetime import date
+
+
+def encode_cursor(*values) -> str:
+    """
+    Pack the sort key of the last returned row into an opaque, url-safe token.
+    """
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Reverse of `encode_cursor`. Raises ValueError for anything that was not produced by it.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def decode_rank_id_cursor(cursor: str) -> tuple[float, int]:
+    values = decode_cursor(cursor)
+    try:
+        rank, cursor_id = values
+        return float(rank), int(cursor_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def decode_date_id_cursor(cursor: str) -> tuple[date, int]:
+    values = decode_cursor(cursor)
+    try:
+        cursor_date, cursor_id = values
+        return date.fromisoformat(cursor_date), int(cursor_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
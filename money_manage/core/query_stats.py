@@ -0,0 +1,91 @@
+import logging
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+
+from core.config import settings
+
+slow_query_logger = logging.getLogger("money_manage.slow_query")
+
+
+@dataclass
+class QueryStats:
+    """
+    SQL executed on behalf of one request. The middleware creates it, and cursor events on the
+    engine add to it through `_current_stats`.
+    """
+    count: int = 0
+    total: float = 0.0
+    slowest: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def add(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        self.statements[statement] += 1
+        self.slowest = max(self.slowest, duration)
+
+    def server_timing(self) -> str:
+        return (f'db;dur={self.total * 1000:.1f};desc="{self.count} queries", '
+                f'db-slowest;dur={self.slowest * 1000:.1f}')
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def start_request_stats() -> QueryStats:
+    stats = QueryStats()
+    _current_stats.set(stats)
+    return stats
+
+
+def redact_parameters(parameters):
+    """
+    Replace bound values with their type names so amounts, descriptions and password hashes
+    never reach the log. For executemany only the batch size is kept.
+    """
+    if isinstance(parameters, list):
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, tuple):
+        return tuple(type(value).__name__ for value in parameters)
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._stats_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - context._stats_start
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.add(statement, duration)
+
+    if (duration * 1000 >= settings.query.slow_query_ms
+            and random.random() < settings.query.slow_query_sample_rate):
+        slow_query_logger.warning("slow query %.1f ms: %s params=%s", duration * 1000, statement,
+                                  redact_parameters(parameters))
+
+
+def log_repeated_statements(stats: QueryStats, path: str) -> None:
+    """
+    Log statements run at least `repeated_statement_threshold` times in one request,
+    which is usually a lazy load inside a loop (N+1).
+    """
+    threshold = settings.query.repeated_statement_threshold
+    for statement, count in stats.statements.most_common():
+        if count < threshold:
+            break
+        slow_query_logger.warning("%s ran the same statement %d times: %s", path, count, statement)
+
+
+def install_query_stats(engine) -> None:
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Iterable, NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import Lazy, settings
+from core.models.budgets import Category
+from core.models.currencies import Currency
+from core.models.transactions import TransactionsType
+
+# Sent by the triggers on categories, currencies and transactions_type (see the
+# reference_data_notify migration) with the table name as payload.
+CHANNEL = "reference_data_changed"
+
+logger = logging.getLogger("money_manage.reference_data")
+
+
+class CategoryRecord(NamedTuple):
+    id: int
+    name: str
+
+
+class CurrencyRecord(NamedTuple):
+    id: int
+    code: str
+    name: str
+
+
+class TransactionTypeRecord(NamedTuple):
+    id: int
+    eng_name: str
+    ru_name: str
+
+
+def _index_by_id(records) -> tuple:
+    """
+    Records laid out so that `table[id]` is the record with that id and gaps are None.
+    The ids are small serials, so this is a compact array rather than a hash table.
+    """
+    table = [None] * (max((record.id for record in records), default=-1) + 1)
+    for record in records:
+        table[record.id] = record
+    return tuple(table)
+
+
+def _lookup(table: tuple, record_id: int):
+    return table[record_id] if 0 <= record_id < len(table) else None
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    categories: tuple = ()
+    currencies: tuple = ()
+    transaction_types: tuple = ()
+
+    def category(self, category_id: int) -> CategoryRecord | None:
+        return _lookup(self.categories, category_id)
+
+    def currency(self, currency_id: int) -> CurrencyRecord | None:
+        return _lookup(self.currencies, currency_id)
+
+    def transaction_type(self, transaction_type_id: int) -> TransactionTypeRecord | None:
+        return _lookup(self.transaction_types, transaction_type_id)
+
+
+class ReferenceDataCache:
+    """
+    In-process copy of the categories, currencies and transaction types.
+
+    `start` loads it and LISTENs on CHANNEL on a dedicated connection; every notification
+    schedules a reload. When listening is off or the connection is lost, the data is
+    reloaded in the background every `reload_seconds` instead.
+    """
+
+    def __init__(self, reload_seconds: float):
+        self.reload_seconds = reload_seconds
+        self._data: ReferenceData | None = None
+        self._loaded_at = 0.0
+        self._listener = None
+        self._reload_task: asyncio.Task | None = None
+
+    def current(self) -> ReferenceData | None:
+        """
+        The loaded data, or None before the first load.
+        """
+        if (self._data is not None and self._listener is None
+                and time.monotonic() - self._loaded_at >= self.reload_seconds):
+            self.schedule_reload()
+        return self._data
+
+    async def reload(self) -> ReferenceData:
+        from core.db_connection.db_helper import db_helper
+
+        async with db_helper.session_getter_md() as session:
+            categories = (await session.execute(select(Category.id, Category.name))).all()
+            currencies = (await session.execute(select(Currency.id, Currency.code, Currency.name))).all()
+            types = (await session.execute(
+                select(TransactionsType.id, TransactionsType.eng_name, TransactionsType.ru_name))).all()
+
+        self._data = ReferenceData(
+            categories=_index_by_id([CategoryRecord(*row) for row in categories]),
+            currencies=_index_by_id([CurrencyRecord(*row) for row in currencies]),
+            transaction_types=_index_by_id([TransactionTypeRecord(*row) for row in types]),
+        )
+        self._loaded_at = time.monotonic()
+        return self._data
+
+    def schedule_reload(self):
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.ensure_future(self.reload())
+            self._reload_task.add_done_callback(self._reload_done)
+
+    @staticmethod
+    def _reload_done(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Reloading reference data failed: %s", task.exception())
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self.schedule_reload()
+
+    def _on_listener_lost(self, connection):
+        logger.warning("Lost the %s listener, falling back to reloading every %s seconds",
+                       CHANNEL, self.reload_seconds)
+        self._listener = None
+
+    async def start(self, url: str, listen: bool = True):
+        # Listen before loading, so a change made in between still triggers a reload.
+        if listen:
+            try:
+                import asyncpg
+
+                dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+                self._listener = await asyncpg.connect(dsn)
+                await self._listener.add_listener(CHANNEL, self._on_notify)
+                self._listener.add_termination_listener(self._on_listener_lost)
+            except Exception as e:
+                logger.warning("Cannot LISTEN on %s (%s), reloading every %s seconds instead",
+                               CHANNEL, e, self.reload_seconds)
+                self._listener = None
+        await self.reload()
+
+    async def stop(self):
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            await listener.close()
+        if self._reload_task is not None:
+            self._reload_task.cancel()
+
+
+reference_data = Lazy(lambda: ReferenceDataCache(reload_seconds=settings.cache.reference_reload_seconds))
+
+
+# Checked column -> (ReferenceData lookup, primary key to fall back on).
+_REFERENCE_COLUMNS = {
+    "category_id": ("category", Category.id),
+    "currency_id": ("currency", Currency.id),
+    "transaction_type_id": ("transaction_type", TransactionsType.id),
+}
+
+
+async def unknown_reference_ids(session: AsyncSession, **ids: Iterable[int]) -> dict[str, set[int]]:
+    """
+    The given ids (`category_id=[...]`, `currency_id=[...]`, `transaction_type_id=[...]`) that exist
+    neither in the cache nor in the database. Cache misses are looked up by primary key, since the
+    row may have been added after the last reload; finding one schedules a reload. Nothing is
+    checked before the first load; the foreign keys still apply either way.
+    """
+    data = reference_data.current()
+    if data is None:
+        return {}
+
+    unknown = {}
+    for column, values in ids.items():
+        lookup, primary_key = _REFERENCE_COLUMNS[column]
+        missing = {value for value in values if value is not None and getattr(data, lookup)(value) is None}
+        if missing:
+            found = set((await session.scalars(select(primary_key).filter(primary_key.in_(missing)))).all())
+            if found:
+                reference_data.schedule_reload()
+            if missing - found:
+                unknown[column] = missing - found
+    return unknown
+
+
+async def check_reference_ids(session: AsyncSession, category_id: int | None = None, currency_id: int | None = None,
+                              transaction_type_id: int | None = None) -> None:
+    """
+    Raises ValueError naming every id that does not exist. None means "not given".
+    """
+    unknown = await unknown_reference_ids(session, category_id=[category_id], currency_id=[currency_id],
+                                          transaction_type_id=[transaction_type_id])
+    if unknown:
+        raise ValueError("; ".join(f"Unknown {column}: {value}"
+                                   for column, values in unknown.items() for value in sorted(values)))
@@ -1,7 +1,22 @@
+import datetime as dt
 from datetime import date, datetime
-from typing import List
+from decimal import Decimal
+from typing import List, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
+
+
+# The amount column's CHECK constraint (check_amount_positive).
+MAX_AMOUNT = 999999999999
+# NOT NULL columns: partial updates may leave them out, but not set them to null.
+REQUIRED_COLUMNS = ("category_id", "amount", "transaction_type_id", "currency_id")
+
+
+def reject_null_columns(model: BaseModel) -> BaseModel:
+    nulls = [name for name in REQUIRED_COLUMNS if name in model.model_fields_set and getattr(model, name) is None]
+    if nulls:
+        raise ValueError(f"{', '.join(nulls)} cannot be null")
+    return model
 
 
 class TransactionBase(BaseModel):
@@ -21,16 +36,109 @@ class TransactionOut(TransactionBase):
     date: date
     created_at: datetime
     updated_at: datetime
+    converted_amount: Decimal | None = None
+    converted_currency_id: int | None = None
+
+TransactionSort = Literal["-date", "date", "-amount", "amount"]
+
+class TransactionFilter(BaseModel):
+    date_from: date | None = None
+    date_to: date | None = None
+    amount_min: float | None = None
+    amount_max: float | None = None
+    category_id: int | None = None
+    currency_id: int | None = None
+    transaction_type_id: int | None = None
+    sort: TransactionSort = "-date"
 
 class TransactionListResponse(BaseModel):
-    total: int
+    total: int | None = None
     items: List[TransactionOut]
+    next_cursor: str | None = None
 
 
 class TransactionUpdate(BaseModel):
     user_id: int | None = None
     category_id: int | None = None
     description: str | None = None
-    amount: float | None = None
+    amount: float | None = Field(None, ge=0, le=MAX_AMOUNT)
+    transaction_type_id: int | None = None
+    currency_id: int | None = None
+
+    check_not_null = model_validator(mode="after")(reject_null_columns)
+
+
+class TransactionBulkFilter(BaseModel):
+    ids: List[int] | None = Field(None, max_length=10000)
+    date_from: date | None = None
+    date_to: date | None = None
+    category_id: int | None = None
+    description_contains: str | None = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self):
+        if all(value is None for _, value in self):
+            raise ValueError("At least one filter condition is required")
+        return self
+
+class TransactionBulkChanges(BaseModel):
+    category_id: int | None = None
+    description: str | None = None
+    amount: float | None = Field(None, ge=0, le=MAX_AMOUNT)
     transaction_type_id: int | None = None
     currency_id: int | None = None
+
+    check_not_null = model_validator(mode="after")(reject_null_columns)
+
+class TransactionBulkUpdate(BaseModel):
+    filter: TransactionBulkFilter
+    changes: TransactionBulkChanges
+    chunk_size: int | None = Field(None, ge=1, le=10000)
+
+class TransactionBulkDelete(BaseModel):
+    filter: TransactionBulkFilter
+    chunk_size: int | None = Field(None, ge=1, le=10000)
+
+class TransactionBulkResponse(BaseModel):
+    affected: int
+
+
+SearchMode = Literal["fts", "substring"]
+
+class TransactionSearchItem(TransactionOut):
+    rank: float
+
+class TransactionSearchResponse(BaseModel):
+    items: List[TransactionSearchItem]
+    next_cursor: str | None = None
+
+
+class TransactionImportRow(TransactionIn):
+    # dt.date: a field named `date` with a default would shadow the type in its own annotation.
+    date: dt.date | None = None
+
+class TransactionImportError(BaseModel):
+    line: int
+    error: str
+
+class TransactionImportResponse(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[TransactionImportError]
+
+
+SummaryGroup = Literal["category", "type"]
+SummaryPeriod = Literal["day", "week", "month"]
+
+class TransactionSummaryItem(BaseModel):
+    period: date | None = None
+    category_id: int | None = None
+    transaction_type_id: int | None = None
+    currency_id: int
+    income: float
+    expense: float
+    balance: float
+    count: int
+
+class TransactionSummaryResponse(BaseModel):
+    items: List[TransactionSummaryItem]
@@ -0,0 +1,62 @@
+from decimal import Decimal
+from typing import Sequence
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+    import json
+
+
+def dumps(obj) -> bytes:
+    """
+    JSON-encode plain dicts/lists with date, datetime and Decimal values.
+    Uses orjson when installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default_json, separators=(",", ":")).encode()
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+def _default_json(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class RowSerializer:
+    """
+    Turns row tuples into dicts shaped like a response schema, without pydantic validation.
+
+    `columns` are the output field names in row order; `float_columns` are converted
+    from Decimal to float, as the schema declares them; `extra` holds constant fields
+    appended to every dict (e.g. optional schema fields left at None). Everything is
+    resolved once here so `to_dicts` does only the per-row work.
+    """
+
+    def __init__(self, columns: Sequence[str], float_columns: Sequence[str] = (), extra: dict | None = None):
+        self.columns = tuple(columns)
+        self._float_indexes = tuple(self.columns.index(name) for name in float_columns)
+        self._extra = dict(extra or {})
+
+    def to_dict(self, row: Sequence) -> dict:
+        if self._float_indexes:
+            row = list(row)
+            for index in self._float_indexes:
+                if row[index] is not None:
+                    row[index] = float(row[index])
+        result = dict(zip(self.columns, row))
+        if self._extra:
+            result.update(self._extra)
+        return result
+
+    def to_dicts(self, rows: Sequence[Sequence]) -> list[dict]:
+        return [self.to_dict(row) for row in rows]
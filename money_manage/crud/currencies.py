@@ -0,0 +1,46 @@
+from datetime import date
+from decimal import Decimal
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models.currencies import Currency, CurrencyRate
+
+
+async def load_currency_rates(session: AsyncSession, rates: Iterable[tuple[str, date, Decimal]],
+                              batch_size: int = 5000) -> int:
+    """
+    Upsert `(currency code, valid_from, rate)` entries into currency_rates, one executemany
+    statement and commit per batch. Returns the number of entries written.
+    Raises ValueError on an unknown currency code.
+    """
+    result = await session.execute(select(Currency.code, Currency.id))
+    ids_by_code = {code.upper(): currency_id for code, currency_id in result.all()}
+
+    stmt = pg_insert(CurrencyRate)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_currency_rates_currency_id_valid_from",
+        set_={"rate": stmt.excluded.rate, "updated_at": stmt.excluded.updated_at},
+    )
+
+    written = 0
+    batch = []
+    for code, valid_from, rate in rates:
+        currency_id = ids_by_code.get(code.upper())
+        if currency_id is None:
+            raise ValueError(f"Unknown currency: {code}")
+        batch.append({"currency_id": currency_id, "valid_from": valid_from, "rate": rate})
+
+        if len(batch) >= batch_size:
+            await session.execute(stmt, batch)
+            await session.commit()
+            written += len(batch)
+            batch = []
+
+    if batch:
+        await session.execute(stmt, batch)
+        await session.commit()
+        written += len(batch)
+    return written
@@ -0,0 +1,110 @@
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import select, func, delete, insert, and_, or_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.models.daily_balances import DailyBalance
+from core.models.transactions import Transactions
+
+ROLLUP_KEY = ("user_id", "date", "category_id", "transaction_type_id", "currency_id")
+
+
+class DailyBalanceDeltas:
+    """
+    Collects +/- changes per rollup key so one write touches each daily_balances row once.
+    Rows may be ORM objects, pydantic models or mappings with the ROLLUP_KEY fields and `amount`.
+    """
+
+    def __init__(self):
+        self._deltas: dict[tuple, list] = defaultdict(lambda: [Decimal(0), 0])
+
+    def add(self, row: Any, sign: int = 1):
+        get = row.get if isinstance(row, dict) else lambda name: getattr(row, name)
+        delta = self._deltas[tuple(get(name) for name in ROLLUP_KEY)]
+        delta[0] += sign * Decimal(str(get("amount")))
+        delta[1] += sign
+
+    def rows(self) -> list[dict]:
+        # Sorted so concurrent writers lock daily_balances rows in the same order.
+        return [dict(zip(ROLLUP_KEY, key), amount=amount, count=count)
+                for key, (amount, count) in sorted(self._deltas.items())
+                if amount or count]
+
+
+async def apply_daily_balance_deltas(session: AsyncSession, deltas: DailyBalanceDeltas) -> None:
+    """
+    Upsert the collected deltas. Does not commit, so it joins the caller's unit of work.
+    """
+    rows = deltas.rows()
+    if not rows:
+        return
+
+    stmt = pg_insert(DailyBalance)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_daily_balances_key",
+        set_={"amount": DailyBalance.amount + stmt.excluded.amount,
+              "count": DailyBalance.count + stmt.excluded.count},
+    )
+    await session.execute(stmt, rows)
+
+
+def _source_totals(user_id: int | None = None):
+    key_columns = [getattr(Transactions, name) for name in ROLLUP_KEY]
+    query = (select(*key_columns,
+                    func.sum(Transactions.amount).label("amount"),
+                    func.count().label("count"))
+             .group_by(*key_columns))
+    if user_id is not None:
+        query = query.filter(Transactions.user_id == user_id)
+    return query
+
+
+async def rebuild_daily_balances(session: AsyncSession, user_id: int | None = None) -> int:
+    """
+    Recompute daily_balances from `transactions` (for one user or everyone) and commit.
+    Returns the number of rollup rows written.
+
+    Holds a SHARE lock on `transactions` until the commit: in-flight writes finish first, so the
+    recount sees them, and new writes wait, so none of their deltas lands on the rows being
+    replaced. Writers touch `transactions` before `daily_balances`, so this cannot deadlock.
+    """
+    await session.execute(text("LOCK TABLE transactions IN SHARE MODE"))
+
+    query = delete(DailyBalance)
+    if user_id is not None:
+        query = query.filter(DailyBalance.user_id == user_id)
+    await session.execute(query)
+
+    result = await session.execute(
+        insert(DailyBalance).from_select([*ROLLUP_KEY, "amount", "count"], _source_totals(user_id))
+    )
+    await session.commit()
+    return result.rowcount
+
+
+async def verify_daily_balances(session: AsyncSession, user_id: int | None = None) -> list[dict]:
+    """
+    Compare daily_balances with totals recomputed from `transactions`.
+    Returns one entry per drifted key with the expected and stored amount/count.
+    """
+    source = _source_totals(user_id).subquery("source")
+    rollup = select(DailyBalance).filter(DailyBalance.count != 0)
+    if user_id is not None:
+        rollup = rollup.filter(DailyBalance.user_id == user_id)
+    rollup = rollup.subquery("rollup")
+
+    on_key = and_(*(source.c[name] == rollup.c[name] for name in ROLLUP_KEY))
+    query = (select(*(func.coalesce(source.c[name], rollup.c[name]).label(name) for name in ROLLUP_KEY),
+                    source.c.amount.label("expected_amount"),
+                    rollup.c.amount.label("stored_amount"),
+                    source.c.count.label("expected_count"),
+                    rollup.c.count.label("stored_count"))
+             .select_from(source.join(rollup, on_key, full=True))
+             .filter(or_(source.c.amount.is_distinct_from(rollup.c.amount),
+                         source.c.count.is_distinct_from(rollup.c.count))))
+
+    result = await session.execute(query)
+    return [dict(row) for row in result.mappings().all()]
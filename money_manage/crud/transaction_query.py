@@ -0,0 +1,101 @@
+from datetime import date
+
+from sqlalchemy import and_, or_
+
+from core.config import settings
+from core.models.transactions import Transactions
+from core.query_stats import slow_query_logger
+from core.schemas.transaction import TransactionFilter
+
+
+class QueryRejected(ValueError):
+    """
+    The filter/sort combination cannot be served from an index without scanning
+    an unbounded part of the user's transactions.
+    """
+
+
+# Filters that no index leads with after user_id; each one alone could mean scanning
+# every transaction of the user.
+UNINDEXED_FILTERS = ("amount_min", "amount_max", "currency_id", "transaction_type_id")
+
+
+def _date_span_days(filters: TransactionFilter) -> int | None:
+    if filters.date_from is None or filters.date_to is None:
+        return None
+    return (filters.date_to - filters.date_from).days + 1
+
+
+def check_query_cost(user_id: int, filters: TransactionFilter, cursor: tuple[date, int] | None = None) -> None:
+    """
+    Every list query filters on user_id and walks either ix_transactions_user_id_date_id or
+    ix_transactions_user_id_category_id_date. Amount, currency and transaction type are not indexed,
+    so sorting or filtering on them is only allowed inside a bounded date window. Rejections are
+    written to the slow-query log with the names of the filters used, never their values.
+    """
+    reason = None
+    span = _date_span_days(filters)
+    bounded = span is not None and span <= settings.query.max_scan_days
+    sort_by_amount = filters.sort in ("amount", "-amount")
+
+    if sort_by_amount and not bounded:
+        reason = f"sorting by amount needs date_from and date_to at most {settings.query.max_scan_days} days apart"
+    elif sort_by_amount and cursor is not None:
+        reason = "cursor pagination is only available when sorting by date"
+    elif not bounded:
+        unindexed = [name for name in UNINDEXED_FILTERS if getattr(filters, name) is not None]
+        if unindexed:
+            reason = (f"{', '.join(unindexed)} filters need date_from and date_to "
+                      f"at most {settings.query.max_scan_days} days apart")
+
+    if reason is not None:
+        slow_query_logger.warning("Rejected transaction query: %s (user_id=%s, filters=%s)",
+                                  reason, user_id, sorted(filters.model_dump(exclude_none=True)))
+        raise QueryRejected(reason)
+
+
+def build_transaction_page_query(query, user_id: int, filters: TransactionFilter, limit: int, offset: int = 0,
+                                 cursor: tuple[date, int] | None = None):
+    """
+    Apply `filters`, sort and pagination to `query` (a select over Transactions columns).
+
+    Date sorts order by (date, id) in the direction ix_transactions_user_id_date_id can be scanned,
+    and `cursor` (date and id of the last row already seen) finds the page by keyset instead of OFFSET.
+    Call `check_query_cost` first.
+    """
+    query = query.filter(Transactions.user_id == user_id)
+    if filters.date_from is not None:
+        query = query.filter(Transactions.date >= filters.date_from)
+    if filters.date_to is not None:
+        query = query.filter(Transactions.date <= filters.date_to)
+    if filters.category_id is not None:
+        query = query.filter(Transactions.category_id == filters.category_id)
+    if filters.currency_id is not None:
+        query = query.filter(Transactions.currency_id == filters.currency_id)
+    if filters.transaction_type_id is not None:
+        query = query.filter(Transactions.transaction_type_id == filters.transaction_type_id)
+    if filters.amount_min is not None:
+        query = query.filter(Transactions.amount >= filters.amount_min)
+    if filters.amount_max is not None:
+        query = query.filter(Transactions.amount <= filters.amount_max)
+
+    if filters.sort == "-date":
+        query = query.order_by(Transactions.date.desc(), Transactions.id)
+        if cursor is not None:
+            cursor_date, cursor_id = cursor
+            query = query.filter(or_(Transactions.date < cursor_date,
+                                     and_(Transactions.date == cursor_date, Transactions.id > cursor_id)))
+    elif filters.sort == "date":
+        query = query.order_by(Transactions.date, Transactions.id.desc())
+        if cursor is not None:
+            cursor_date, cursor_id = cursor
+            query = query.filter(or_(Transactions.date > cursor_date,
+                                     and_(Transactions.date == cursor_date, Transactions.id < cursor_id)))
+    elif filters.sort == "amount":
+        query = query.order_by(Transactions.amount, Transactions.id)
+    else:
+        query = query.order_by(Transactions.amount.desc(), Transactions.id)
+
+    if cursor is None:
+        query = query.offset(offset)
+    return query.limit(limit)
@@ -1,73 +1,348 @@
-from typing import List, Sequence
+from datetime import date
+from typing import List, Sequence, AsyncIterator
 
 from fastapi import HTTPException
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, or_, func, insert, update, delete, cast, Date, Float, text
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.testing import exclude
 
-from core.models.transactions import Transactions
+from core.cache import TTLCache
+from core.config import Lazy, settings
+from core.models.daily_balances import DailyBalance
+from core.models.transactions import Transactions, TransactionsType, INCOME_TYPE_NAME, EXPENSE_TYPE_NAME
 from core.models.user import User
-from core.schemas.transaction import TransactionIn, TransactionUpdate
+from core.schemas.transaction import TransactionIn, TransactionUpdate, TransactionImportRow, SummaryGroup, SummaryPeriod, \
+    TransactionBulkFilter, TransactionFilter, SearchMode
+from crud.transaction_query import build_transaction_page_query
+from crud.daily_balances import DailyBalanceDeltas, apply_daily_balance_deltas, ROLLUP_KEY
+
+# Per-user row counts for list responses. Short-lived, so other workers catch up within the ttl.
+_count_cache = Lazy(lambda: TTLCache(maxsize=settings.pagination.count_cache_size,
+                                     ttl=settings.pagination.count_cache_seconds))
 
 
 async def add_transaction_in_db(session: AsyncSession, transaction: TransactionIn) -> Transactions:
     try:
-        transaction = Transactions(**transaction.model_dump())
+        values = transaction.model_dump()
+        values["date"] = date.today()
+
+        # INSERT ... RETURNING hands back the server-side columns without a refresh SELECT.
+        result = await session.scalars(insert(Transactions).values(**values).returning(Transactions))
+        transaction = result.one()
 
-        session.add(transaction)
+        deltas = DailyBalanceDeltas()
+        deltas.add(values)
+        await apply_daily_balance_deltas(session, deltas)
+        await bump_transactions_version(session, [transaction.user_id])
 
         await session.commit()
-        await session.refresh(transaction)
+        _count_cache.pop(int(transaction.user_id))
 
         return transaction
 
     except Exception as e:
         raise e
 
-async def get_transaction_by_id(session: AsyncSession, transaction_id: int, user_id: str) -> Transactions:
-    try:
-        query = select(Transactions).filter(and_(Transactions.id == transaction_id, Transactions.user_id == user_id))
-        transaction = await session.execute(query)
-        result = transaction.scalar_one_or_none()
-        return result
+async def add_transactions_batch_in_db(session: AsyncSession, transactions: Sequence[TransactionImportRow]) -> list[int]:
+    """
+    Insert many rows with one executemany INSERT ... RETURNING id (sent as multi-row VALUES).
+    Does not commit; call `forget_transaction_counts` for the users once the caller has.
+    """
+    rows = []
+    for transaction in transactions:
+        row = transaction.model_dump()
+        if row["date"] is None:
+            row["date"] = date.today()
+        rows.append(row)
 
-    except Exception as e:
-        raise e
+    result = await session.execute(insert(Transactions).returning(Transactions.id), rows)
+    ids = list(result.scalars().all())
+
+    deltas = DailyBalanceDeltas()
+    for row in rows:
+        deltas.add(row)
+    await apply_daily_balance_deltas(session, deltas)
+    await bump_transactions_version(session, {row["user_id"] for row in rows})
+    return ids
+
+def forget_transaction_counts(user_ids) -> None:
+    """
+    Drop the cached row counts of `user_ids`. Call after committing, so a concurrent
+    count cannot cache the old total again in between.
+    """
+    for user_id in user_ids:
+        _count_cache.pop(int(user_id))
+
+async def bump_transactions_version(session: AsyncSession, user_ids) -> None:
+    """
+    Advance users.transactions_version inside the caller's transaction, so ETags handed out
+    for the old data stop matching once it commits. updated_at is left alone.
+    """
+    await session.execute(update(User)
+                          .where(User.id.in_([int(user_id) for user_id in user_ids]))
+                          .values(transactions_version=User.transactions_version + 1, updated_at=User.updated_at)
+                          .execution_options(synchronize_session=False))
+
+async def get_transactions_version_db(session: AsyncSession, user_id: str) -> int | None:
+    query = select(User.transactions_version).filter(User.id == int(user_id))
+    return (await session.execute(query)).scalar_one_or_none()
+
+# TransactionOut fields that come straight from the table, in the schema's field order.
+OUT_COLUMNS = ("user_id", "category_id", "description", "amount", "transaction_type_id", "currency_id",
+               "id", "date", "created_at", "updated_at")
+
+async def get_transaction_rows_db(session: AsyncSession, limit: int, user_id: str, offset: int = 0,
+                                  cursor: tuple[date, int] | None = None,
+                                  filters: TransactionFilter | None = None) -> list[tuple]:
+    """
+    One page of the user's transactions as OUT_COLUMNS tuples, without ORM instances.
+    """
+    query = build_transaction_page_query(select(*(getattr(Transactions, name) for name in OUT_COLUMNS)),
+                                         user_id=user_id, filters=filters or TransactionFilter(),
+                                         limit=limit, offset=offset, cursor=cursor)
+    result = await session.execute(query)
+    return [tuple(row) for row in result.all()]
+
+# Whether pg_trgm is installed; looked up once per process (see the description search migration).
+_trigram_available: bool | None = None
+
+async def _has_trigram(session: AsyncSession) -> bool:
+    global _trigram_available
+    if _trigram_available is None:
+        _trigram_available = await session.scalar(
+            text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')"))
+    return _trigram_available
+
+def _like_pattern(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+async def search_transactions_db(session: AsyncSession, user_id: int, q: str, mode: SearchMode, limit: int,
+                                 cursor: tuple[float, int] | None = None) -> list[tuple]:
+    """
+    Ranked description search. `fts` matches words through the description_tsv GIN index and ranks with
+    ts_rank; `substring` matches ILIKE '%q%' through the trigram index and ranks by similarity. Without
+    pg_trgm, `substring` scans the user's rows and ranks earlier matches higher.
+    Rows are OUT_COLUMNS plus the rank, best first; `cursor` is the (rank, id) of the last row seen.
+    """
+    if mode == "fts":
+        ts_query = func.websearch_to_tsquery("simple", q)
+        match = Transactions.description_tsv.op("@@")(ts_query)
+        rank = func.ts_rank(Transactions.description_tsv, ts_query)
+    else:
+        match = Transactions.description.ilike(_like_pattern(q), escape="\\")
+        if await _has_trigram(session):
+            rank = func.similarity(Transactions.description, q)
+        else:
+            rank = cast(1.0 / func.greatest(func.strpos(func.lower(Transactions.description), q.lower()), 1), Float)
+
+    query = (select(*(getattr(Transactions, name) for name in OUT_COLUMNS), rank.label("rank"))
+             .filter(Transactions.user_id == user_id, match)
+             .order_by(rank.desc(), Transactions.id.desc())
+             .limit(limit))
+    if cursor is not None:
+        cursor_rank, cursor_id = cursor
+        query = query.filter(or_(rank < cursor_rank, and_(rank == cursor_rank, Transactions.id < cursor_id)))
+
+    result = await session.execute(query)
+    return [tuple(row) for row in result.all()]
+
+async def get_transaction_row_by_id(session: AsyncSession, transaction_id: int, user_id: str) -> tuple | None:
+    query = (select(*(getattr(Transactions, name) for name in OUT_COLUMNS))
+             .filter(and_(Transactions.id == transaction_id, Transactions.user_id == user_id)))
+    row = (await session.execute(query)).one_or_none()
+    return tuple(row) if row is not None else None
+
+async def count_transactions_db(session: AsyncSession, user_id: str, use_cache: bool = True) -> int:
+    key = int(user_id)
+    if use_cache:
+        total = _count_cache.get(key)
+        if total is not None:
+            return total
+
+    query = select(func.count()).select_from(Transactions).filter(Transactions.user_id == user_id)
+    total = (await session.execute(query)).scalar_one()
+    _count_cache.set(key, total)
+    return total
+
+async def get_transactions_summary_db(session: AsyncSession, user_id: int, group_by: Sequence[SummaryGroup] = (),
+                                     period: SummaryPeriod | None = None, date_from: date | None = None,
+                                     date_to: date | None = None) -> list[dict]:
+    """
+    Income, expense, balance and row count per currency, optionally split by category,
+    transaction type and day/week/month. Read from the daily_balances rollup, so the cost
+    depends on the number of active days rather than the number of transactions.
+    """
+    group_columns = []
+    if period is not None:
+        group_columns.append(cast(func.date_trunc(period, DailyBalance.date), Date).label("period"))
+    if "category" in group_by:
+        group_columns.append(DailyBalance.category_id)
+    if "type" in group_by:
+        group_columns.append(DailyBalance.transaction_type_id)
+    group_columns.append(DailyBalance.currency_id)
 
-async def get_transactions_db(session: AsyncSession, limit: int, offset: int, user_id: str) -> Sequence[Transactions]:
+    income = func.coalesce(func.sum(DailyBalance.amount).filter(TransactionsType.eng_name == INCOME_TYPE_NAME), 0)
+    expense = func.coalesce(func.sum(DailyBalance.amount).filter(TransactionsType.eng_name == EXPENSE_TYPE_NAME), 0)
+    count = func.sum(DailyBalance.count)
+
+    query = (select(*group_columns,
+                    income.label("income"),
+                    expense.label("expense"),
+                    (income - expense).label("balance"),
+                    count.label("count"))
+             .join(TransactionsType, DailyBalance.transaction_type_id == TransactionsType.id)
+             .filter(DailyBalance.user_id == user_id)
+             .group_by(*group_columns)
+             .having(count > 0)
+             .order_by(*group_columns))
+    if date_from is not None:
+        query = query.filter(DailyBalance.date >= date_from)
+    if date_to is not None:
+        query = query.filter(DailyBalance.date <= date_to)
+
+    result = await session.execute(query)
+    return [dict(row) for row in result.mappings().all()]
+
+EXPORT_COLUMNS = ("id", "date", "category_id", "description", "amount", "transaction_type_id", "currency_id",
+                  "created_at", "updated_at")
+
+async def stream_transactions_db(session: AsyncSession, user_id: int, batch_size: int = 10000) -> AsyncIterator[Sequence[tuple]]:
+    """
+    Yield a user's transactions as plain row tuples (EXPORT_COLUMNS), `batch_size` rows at a time,
+    through a server-side cursor. No ORM objects are built and only one batch is in memory.
+    """
+    query = (select(*(getattr(Transactions, name) for name in EXPORT_COLUMNS))
+             .filter(Transactions.user_id == user_id)
+             .order_by(Transactions.date.desc(), Transactions.id)
+             .execution_options(yield_per=batch_size))
+    result = await session.stream(query)
+    async for partition in result.partitions():
+        yield [tuple(row) for row in partition]
+
+async def update_transaction_db(session: AsyncSession, transaction_update: TransactionUpdate, transaction_id: int) -> dict:
+    """
+    Conditional UPDATE ... WHERE id AND user_id ... RETURNING in one statement. The `old` CTE locks
+    the row and returns its previous rollup key and amount alongside the new values.
+    """
     try:
-        query = select(Transactions).filter(Transactions.user_id == user_id).offset(offset).limit(limit)
-        transactions = await session.execute(query)
-        result = transactions.scalars().all()
-        return result
+        update_data = transaction_update.model_dump(exclude_unset=True)
+
+        old = (select(*(getattr(Transactions, name) for name in ("id", "amount", *ROLLUP_KEY)))
+               .filter(and_(Transactions.id == transaction_id,
+                            Transactions.user_id == transaction_update.user_id))
+               .with_for_update()
+               .cte("old"))
+        query = (update(Transactions)
+                 .where(Transactions.id == old.c.id)
+                 .values(**update_data)
+                 .returning(*(getattr(Transactions, name) for name in OUT_COLUMNS),
+                            *(old.c[name].label(f"old_{name}") for name in ("amount", *ROLLUP_KEY)))
+                 .execution_options(synchronize_session=False))
+        row = (await session.execute(query)).mappings().one_or_none()
+
+        if row is None:
+            raise HTTPException(status_code=404, detail="Transaction not found")
+
+        # Move the amount between rollup rows when the date, category, type, currency or amount change.
+        deltas = DailyBalanceDeltas()
+        deltas.add({name: row[f"old_{name}"] for name in ("amount", *ROLLUP_KEY)}, sign=-1)
+        deltas.add(row)
+        await apply_daily_balance_deltas(session, deltas)
+        await bump_transactions_version(session, [row["user_id"]])
+
+        await session.commit()
+
+        return {name: row[name] for name in OUT_COLUMNS}
 
     except Exception as e:
         raise e
 
-async def update_transaction_db(session: AsyncSession, transaction_update: TransactionUpdate, transaction_id: int) -> Transactions:
-    try:
-        result = await session.execute(
-            select(Transactions).filter(
-                and_(
-                    Transactions.id == transaction_id,
-                    Transactions.user_id == transaction_update.user_id
-                )
-            )
-        )
-        db_transaction = result.scalar_one_or_none()
-
-        if db_transaction is None:
-            raise HTTPException(status_code=404, detail="Transaction not found")
+def _bulk_filter_conditions(user_id: int, bulk_filter: TransactionBulkFilter) -> list:
+    conditions = [Transactions.user_id == user_id]
+    if bulk_filter.ids is not None:
+        conditions.append(Transactions.id.in_(bulk_filter.ids))
+    if bulk_filter.date_from is not None:
+        conditions.append(Transactions.date >= bulk_filter.date_from)
+    if bulk_filter.date_to is not None:
+        conditions.append(Transactions.date <= bulk_filter.date_to)
+    if bulk_filter.category_id is not None:
+        conditions.append(Transactions.category_id == bulk_filter.category_id)
+    if bulk_filter.description_contains is not None:
+        conditions.append(Transactions.description.icontains(bulk_filter.description_contains, autoescape=True))
+    return conditions
 
-        update_data = transaction_update.model_dump(exclude_unset=True)
+def _bulk_batch(user_id: int, bulk_filter: TransactionBulkFilter, after_id: int, chunk_size: int | None):
+    """
+    CTE that locks the next chunk of matching rows (by id, after `after_id`) and
+    exposes their current rollup key and amount.
+    """
+    query = (select(*(getattr(Transactions, name) for name in ("id", "amount", *ROLLUP_KEY)))
+             .filter(*_bulk_filter_conditions(user_id, bulk_filter), Transactions.id > after_id)
+             .order_by(Transactions.id)
+             .with_for_update())
+    if chunk_size is not None:
+        query = query.limit(chunk_size)
+    return query.cte("batch")
 
-        for key, value in update_data.items():
-            setattr(db_transaction, key, value)
+async def bulk_update_transactions_db(session: AsyncSession, user_id: int, bulk_filter: TransactionBulkFilter,
+                                      changes: dict, chunk_size: int | None = None) -> int:
+    """
+    Set-based UPDATE of every transaction of `user_id` matching `bulk_filter`. With `chunk_size`,
+    rows are updated and committed `chunk_size` at a time so locks are held briefly.
+    Returns the number of updated rows.
+    """
+    affected, after_id = 0, 0
+    while True:
+        batch = _bulk_batch(user_id, bulk_filter, after_id, chunk_size)
+        query = (update(Transactions)
+                 .where(Transactions.id == batch.c.id)
+                 .values(**changes)
+                 .returning(Transactions.id, Transactions.amount, *(getattr(Transactions, name) for name in ROLLUP_KEY),
+                            *(batch.c[name].label(f"old_{name}") for name in ("amount", *ROLLUP_KEY)))
+                 .execution_options(synchronize_session=False))
+        rows = (await session.execute(query)).mappings().all()
 
+        deltas = DailyBalanceDeltas()
+        for row in rows:
+            deltas.add({name: row[f"old_{name}"] for name in ("amount", *ROLLUP_KEY)}, sign=-1)
+            deltas.add(row)
+        await apply_daily_balance_deltas(session, deltas)
+        if rows:
+            await bump_transactions_version(session, [user_id])
         await session.commit()
-        await session.refresh(db_transaction)
 
-        return db_transaction
+        affected += len(rows)
+        if chunk_size is None or len(rows) < chunk_size:
+            return affected
+        after_id = max(row["id"] for row in rows)
 
-    except Exception as e:
-        raise e
\ No newline at end of file
+async def bulk_delete_transactions_db(session: AsyncSession, user_id: int, bulk_filter: TransactionBulkFilter,
+                                      chunk_size: int | None = None) -> int:
+    """
+    Set-based DELETE of every transaction of `user_id` matching `bulk_filter`, optionally
+    `chunk_size` rows per statement and commit. Returns the number of deleted rows.
+    """
+    affected, after_id = 0, 0
+    try:
+        while True:
+            batch = _bulk_batch(user_id, bulk_filter, after_id, chunk_size)
+            query = (delete(Transactions)
+                     .where(Transactions.id == batch.c.id)
+                     .returning(Transactions.id, Transactions.amount, *(getattr(Transactions, name) for name in ROLLUP_KEY))
+                     .execution_options(synchronize_session=False))
+            rows = (await session.execute(query)).mappings().all()
+
+            deltas = DailyBalanceDeltas()
+            for row in rows:
+                deltas.add(row, sign=-1)
+            await apply_daily_balance_deltas(session, deltas)
+            if rows:
+                await bump_transactions_version(session, [user_id])
+            await session.commit()
+
+            affected += len(rows)
+            if chunk_size is None or len(rows) < chunk_size:
+                return affected
+            after_id = max(row["id"] for row in rows)
+    finally:
+        _count_cache.pop(int(user_id))
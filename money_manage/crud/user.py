@@ -1,8 +1,17 @@
-from sqlalchemy import select, or_
+from datetime import datetime, timezone
+
+from sqlalchemy import select, or_, insert, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.api_v1.auth.utils import hash_password
-from core.models.user import User
+from api.api_v1.auth.utils import hash_password_async
+from core.cache import create_cache_backend
+from core.config import Lazy, settings
+from core.models.user import User, RevokedToken
+
+# username/email -> user id, or MISSING_USER when no such user exists.
+user_cache = Lazy(lambda: create_cache_backend(settings.cache.redis_url, maxsize=settings.cache.size))
+MISSING_USER = "-"
 
 
 async def get_user(session: AsyncSession, username: str | None = None) -> User:
@@ -17,15 +26,41 @@ async def get_user(session: AsyncSession, username: str | None = None) -> User:
 
     return user
 
+async def get_cached_user_id(username: str) -> str | None:
+    """
+    Returns the cached user id, MISSING_USER for a cached miss, or None when the cache has no entry.
+    """
+    return await user_cache.get(f"user:{username}")
+
+async def cache_user_id(username: str, user_id: int | None) -> None:
+    value = MISSING_USER if user_id is None else str(user_id)
+    await user_cache.set(f"user:{username}", value, ttl=settings.cache.user_ttl_seconds)
+
 async def add_user_in_db(session: AsyncSession, username: str, password: str, email: str) -> User:
     try:
-        password = hash_password(password)
-        new_user = User(username=username, password=password, email=email)
-
-        session.add(new_user)
+        password = await hash_password_async(password)
+        result = await session.scalars(
+            insert(User).values(username=username, password=password, email=email).returning(User)
+        )
+        new_user = result.one()
         await session.commit()
-        await session.refresh(new_user)
+        await user_cache.delete(f"user:{username}", f"user:{email}")
         return new_user
 
     except Exception as e:
-        raise e
\ No newline at end of file
+        raise e
+
+
+async def revoke_token_db(session: AsyncSession, token_hash: str, expires_at: datetime) -> None:
+    """
+    Record a revoked token and drop the ones that have expired anyway.
+    """
+    await session.execute(pg_insert(RevokedToken).values(token_hash=token_hash, expires_at=expires_at)
+                          .on_conflict_do_nothing(index_elements=["token_hash"]))
+    await session.execute(delete(RevokedToken)
+                          .where(RevokedToken.expires_at < datetime.now(timezone.utc).replace(tzinfo=None)))
+    await session.commit()
+
+async def is_token_revoked_db(session: AsyncSession, token_hash: str) -> bool:
+    query = select(RevokedToken.id).filter(RevokedToken.token_hash == token_hash)
+    return (await session.execute(query)).first() is not None
@@ -0,0 +1,15 @@
+# APP_CONFIG__RUN__WORKERS=4 gunicorn -c gunicorn.conf.py main:main_app
+#
+# Set the worker count through APP_CONFIG__RUN__WORKERS rather than -w: each worker reads it
+# to size its share of db.max_connections.
+# UvicornWorker picks uvloop and httptools when they are installed. Forked workers drop the
+# inherited pooled connections through the os.register_at_fork hook in db_helper.
+from core.config import settings
+
+bind = f"{settings.run.host}:{settings.run.port}"
+workers = settings.run.workers
+worker_class = "uvicorn.workers.UvicornWorker"
+backlog = settings.run.backlog
+keepalive = settings.run.timeout_keep_alive
+graceful_timeout = 30
+accesslog = None
@@ -1,3 +1,5 @@
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 
 import uvicorn
@@ -5,24 +7,61 @@ from fastapi import FastAPI
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api import router as api_router
+from api.api_v1.auth.utils import shutdown_hash_executor
 from core.db_init import init_transactions_types
+from core.reference_data import reference_data
 from middleware.auth import jwt_middleware
-from money_manage.core.config import settings
+from middleware.metrics import MetricsMiddleware, metrics
+from middleware.query_stats import QueryStatsMiddleware
+from middleware.rate_limit import RateLimitMiddleware, AdmissionMiddleware
+from core.config import settings
 from core.db_connection.db_helper import db_helper
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+logger = logging.getLogger("money_manage.startup")
+
+
+async def warm_up():
     async with db_helper.session_getter_md() as session:
         await init_transactions_types(session)
+    await reference_data.start(str(settings.db.url), listen=settings.cache.reference_listen)
+
+
+def _warm_up_done(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Warming up failed: %s", task.exception())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Seeding and the reference data load run in the background so the worker serves at once.
+    # Until the load finishes, reference ids are checked by the foreign keys alone.
+    app.state.warm_up = asyncio.create_task(warm_up())
+    app.state.warm_up.add_done_callback(_warm_up_done)
     yield
-    db_helper.dispose()
+    app.state.warm_up.cancel()
+    await reference_data.stop()
+    shutdown_hash_executor()
+    await db_helper.dispose()
 
 
 main_app = FastAPI(lifespan=lifespan)
 
+# The last registered middleware runs first: timing, SQL accounting (so token refresh queries
+# are counted too), admission gate, then auth, then the per-user limiter. Optional layers are
+# only added when enabled, so a disabled feature costs nothing per request.
+if settings.rate_limit.enabled:
+    main_app.add_middleware(RateLimitMiddleware)
 main_app.middleware("http")(jwt_middleware)
+if settings.rate_limit.enabled:
+    main_app.add_middleware(AdmissionMiddleware)
+if settings.query.stats_enabled:
+    main_app.add_middleware(QueryStatsMiddleware)
+if settings.metrics.enabled:
+    main_app.add_middleware(MetricsMiddleware)
 main_app.include_router(api_router,
                         prefix=settings.api.prefix,)
+if settings.metrics.enabled:
+    main_app.add_api_route(settings.metrics.path, metrics, include_in_schema=False)
 
 if __name__ == '__main__':
     uvicorn.run(
@@ -0,0 +1,67 @@
+import argparse
+import asyncio
+import csv
+from datetime import date
+from decimal import Decimal
+
+from core.db_connection.db_helper import db_helper
+from crud.currencies import load_currency_rates
+from crud.daily_balances import rebuild_daily_balances, verify_daily_balances
+
+
+async def rollups(args):
+    async with db_helper.session_getter_md() as session:
+        if args.action == "rebuild":
+            written = await rebuild_daily_balances(session, user_id=args.user_id)
+            print(f"Rebuilt daily_balances: {written} rows")
+            return 0
+
+        drift = await verify_daily_balances(session, user_id=args.user_id)
+        for row in drift:
+            print(row)
+        print(f"{len(drift)} drifted daily_balances keys")
+        return 1 if drift else 0
+
+
+def read_rates_file(path: str):
+    # CSV with a header row: code,valid_from,rate
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            yield row["code"].strip(), date.fromisoformat(row["valid_from"].strip()), Decimal(row["rate"].strip())
+
+
+async def rates(args):
+    async with db_helper.session_getter_md() as session:
+        written = await load_currency_rates(session, read_rates_file(args.file), batch_size=args.batch_size)
+    print(f"Loaded {written} currency rates")
+    return 0
+
+
+async def run(args):
+    try:
+        return await args.handler(args)
+    finally:
+        await db_helper.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Money manage maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rollups_parser = commands.add_parser("rollups", help="Verify or rebuild the daily_balances rollup")
+    rollups_parser.add_argument("action", choices=["verify", "rebuild"])
+    rollups_parser.add_argument("--user-id", type=int, default=None)
+    rollups_parser.set_defaults(handler=rollups)
+
+    rates_parser = commands.add_parser("rates", help="Load historical exchange rates")
+    rates_parser.add_argument("action", choices=["load"])
+    rates_parser.add_argument("file", help="CSV file with code,valid_from,rate columns")
+    rates_parser.add_argument("--batch-size", type=int, default=5000)
+    rates_parser.set_defaults(handler=rates)
+
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(run(args)))
+
+
+if __name__ == '__main__':
+    main()
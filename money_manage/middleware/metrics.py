@@ -0,0 +1,54 @@
+import time
+
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.metrics import registry, http_request_seconds
+
+
+async def metrics():
+    """
+    Prometheus text exposition of every registered metric. main.py mounts it at
+    `settings.metrics.path` when metrics are enabled.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+def _route_template(scope: Scope) -> str:
+    # FastAPI keeps included routers as wrappers, so the matched route's own path lacks the
+    # include prefixes; the effective route context carries the full template.
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None:
+        return context.path
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Request latency by method, route template and status, measured until the last body chunk
+    is sent. Plain ASGI, and only registered when metrics are enabled.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Label by route template, not the raw path, to keep the number of series bounded.
+            http_request_seconds.observe(time.perf_counter() - start, scope["method"],
+                                         _route_template(scope), str(status))
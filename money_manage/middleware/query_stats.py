@@ -0,0 +1,30 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.query_stats import start_request_stats, log_repeated_statements
+
+
+class QueryStatsMiddleware:
+    """
+    Counts the SQL each request runs and reports it in a Server-Timing header.
+    Plain ASGI, and only registered when query stats are enabled.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        # The stats object is shared with the context copies of tasks the app starts, so it is
+        # filled in by the engine's cursor events while the request runs.
+        stats = start_request_stats()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+        log_repeated_statements(stats, scope["path"])
@@ -0,0 +1,174 @@
+import asyncio
+import time
+from typing import Protocol
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.cache import TTLCache
+from core.config import settings
+
+
+class TokenBucketBackend(Protocol):
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """
+        Take one token from `key`'s bucket. Returns 0 when allowed, otherwise
+        the number of seconds until a token is available.
+        """
+        ...
+
+
+class InMemoryTokenBucket:
+    """
+    Per-process buckets. Idle buckets are full again after burst/rate seconds, so they are dropped then.
+    """
+
+    def __init__(self, maxsize: int = 100000):
+        self._buckets = TTLCache(maxsize=maxsize)
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated) * rate)
+
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets.set(key, (tokens, now), ttl=burst / rate + 1)
+        return wait
+
+
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisTokenBucket:
+    """
+    Buckets shared by every worker, updated atomically by a Lua script.
+    Accepts any client with the `redis.asyncio` `eval` API.
+    """
+
+    def __init__(self, client, prefix: str = "money_manage:rate:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisTokenBucket":
+        import redis.asyncio
+
+        return cls(redis.asyncio.from_url(url, decode_responses=True), **kwargs)
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        wait = await self.client.eval(_TOKEN_BUCKET_SCRIPT, 1, self.prefix + key, rate, burst, time.time())
+        return float(wait)
+
+
+class AdmissionGate:
+    """
+    Caps the number of requests being processed at once. Extra requests wait up to
+    `max_wait` seconds for a slot; beyond `max_queue` waiters they are turned away at once.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, max_wait: float):
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def acquire(self) -> bool:
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            return False
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+
+    def release(self):
+        self._semaphore.release()
+
+
+def _create_bucket_backend() -> TokenBucketBackend:
+    if settings.rate_limit.redis_url:
+        return RedisTokenBucket.from_url(settings.rate_limit.redis_url)
+    return InMemoryTokenBucket()
+
+
+class RateLimitMiddleware:
+    """
+    Token bucket per user (JWT `sub`, set by jwt_middleware) or per client address for open endpoints.
+    Plain ASGI, and only registered when rate limiting is enabled.
+    """
+
+    def __init__(self, app: ASGIApp, backend: TokenBucketBackend | None = None,
+                 rate: float | None = None, burst: int | None = None):
+        self.app = app
+        self.backend = backend or _create_bucket_backend()
+        self.rate = settings.rate_limit.rate_per_second if rate is None else rate
+        self.burst = settings.rate_limit.burst if burst is None else burst
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        user = scope.get("state", {}).get("user")
+        if user and user.get("sub"):
+            key = f"user:{user['sub']}"
+        else:
+            key = f"ip:{scope['client'][0] if scope.get('client') else 'unknown'}"
+
+        wait = await self.backend.take(key, self.rate, self.burst)
+        if wait > 0:
+            response = JSONResponse(status_code=429, content={"detail": "Too many requests"},
+                                    headers={"Retry-After": str(max(1, round(wait)))})
+            return await response(scope, receive, send)
+        await self.app(scope, receive, send)
+
+
+class AdmissionMiddleware:
+    """
+    Sheds load with 503 before a request can queue up on the database pool. The slot is held
+    until the response body has been sent, so streamed exports count for their whole duration.
+    Plain ASGI, and only registered when rate limiting is enabled.
+    """
+
+    def __init__(self, app: ASGIApp, gate: AdmissionGate | None = None):
+        self.app = app
+        self.gate = gate or AdmissionGate(max_concurrency=settings.rate_limit.max_concurrency,
+                                          max_queue=settings.rate_limit.max_queue,
+                                          max_wait=settings.rate_limit.max_wait_seconds)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        if not await self.gate.acquire():
+            response = JSONResponse(status_code=503, content={"detail": "Server is busy, try again later"},
+                                    headers={"Retry-After": "1"})
+            return await response(scope, receive, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.gate.release()
@@ -0,0 +1,47 @@
+"""
+Production entry point: several uvicorn worker processes, no reload.
+
+    python serve.py --workers 4
+
+Every worker has its own engine. With db.max_connections set, the workers split that
+budget between them, so N workers never open more than max_connections to Postgres.
+`--loop auto` / `--http auto` pick uvloop and httptools when they are installed.
+The same settings are used by gunicorn through gunicorn.conf.py.
+"""
+import argparse
+import os
+
+import uvicorn
+
+from core.config import settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.run.host)
+    parser.add_argument("--port", type=int, default=settings.run.port)
+    parser.add_argument("--workers", type=int, default=settings.run.workers)
+    parser.add_argument("--loop", choices=["auto", "asyncio", "uvloop"], default=settings.run.loop)
+    parser.add_argument("--http", choices=["auto", "h11", "httptools"], default=settings.run.http)
+    args = parser.parse_args()
+
+    # Workers are fresh interpreters that read their settings from the environment;
+    # they need the worker count to size their share of the connection budget.
+    os.environ["APP_CONFIG__RUN__WORKERS"] = str(args.workers)
+
+    uvicorn.run(
+        app="main:main_app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=args.loop,
+        http=args.http,
+        backlog=settings.run.backlog,
+        timeout_keep_alive=settings.run.timeout_keep_alive,
+        access_log=False,
+        proxy_headers=True,
+    )
+
+
+if __name__ == '__main__':
+    main()
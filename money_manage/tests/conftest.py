@@ -0,0 +1,258 @@
+"""
+Integration tests run against a throwaway PostgreSQL: TEST_DATABASE_URL when set, otherwise a
+local server started with pgserver. The schema comes from the alembic migrations, and each
+test works as its own freshly registered user, so tests do not see each other's rows.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+import warnings
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+APP_DIR = Path(__file__).parent.parent
+TEST_DATABASE = "money_manage_test"
+PASSWORD = "test-password"
+
+_server = None
+
+
+def _generate_keys(directory: Path) -> tuple[Path, Path]:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_key, public_key = directory / "private.pem", directory / "public.pem"
+    private_key.write_bytes(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                              serialization.NoEncryption()))
+    public_key.write_bytes(key.public_key().public_bytes(serialization.Encoding.PEM,
+                                                         serialization.PublicFormat.SubjectPublicKeyInfo))
+    return private_key, public_key
+
+
+def _start_database() -> str | None:
+    global _server
+    if os.environ.get("TEST_DATABASE_URL"):
+        return os.environ["TEST_DATABASE_URL"]
+    try:
+        with warnings.catch_warnings():
+            # platformdirs warns when XDG_RUNTIME_DIR is unset, as it is in most containers.
+            warnings.simplefilter("ignore")
+            import pgserver
+    except ImportError:
+        return None
+
+    _server = pgserver.get_server(tempfile.mkdtemp(prefix="money_manage_pg_"), cleanup_mode="delete")
+    _server.psql(f"CREATE DATABASE {TEST_DATABASE};")
+    socket_dir = parse_qs(urlparse(_server.get_uri()).query)["host"][0]
+    return f"postgresql+asyncpg://postgres@/{TEST_DATABASE}?host={socket_dir}"
+
+
+def pytest_configure(config):
+    # Settings are read from the environment on first use, which is after this hook.
+    private_key, public_key = _generate_keys(Path(tempfile.mkdtemp(prefix="money_manage_keys_")))
+    os.environ["APP_CONFIG__AUTH_JWT__PRIVATE_KEY"] = str(private_key)
+    os.environ["APP_CONFIG__AUTH_JWT__PUBLIC_KEY"] = str(public_key)
+    os.environ["APP_CONFIG__AUTH_JWT__BCRYPT_ROUNDS"] = "4"
+    os.environ["APP_CONFIG__RATE_LIMIT__ENABLED"] = "false"
+
+    url = _start_database()
+    if url is not None:
+        os.environ["APP_CONFIG__DB__URL"] = url
+    config.database_url = url
+
+
+@pytest.fixture(scope="session")
+def database_url(pytestconfig) -> str:
+    if pytestconfig.database_url is None:
+        pytest.skip("needs TEST_DATABASE_URL or pgserver")
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=APP_DIR, check=True,
+                   capture_output=True)
+    return pytestconfig.database_url
+
+
+@pytest.fixture
+async def session(database_url):
+    from core.db_connection.db_helper import db_helper
+
+    async with db_helper.session_getter_md() as session:
+        yield session
+
+
+@pytest.fixture(scope="session")
+async def reference_ids(database_url) -> dict[str, int]:
+    from sqlalchemy import select
+    from core.db_connection.db_helper import db_helper
+    from core.db_init import init_transactions_types
+    from core.models.budgets import Category
+    from core.models.currencies import Currency
+    from core.models.transactions import TransactionsType, INCOME_TYPE_NAME, EXPENSE_TYPE_NAME
+
+    async def get_or_create(session, model, **values) -> int:
+        # categories.name and currencies.code are not unique in the migrated schema, so no ON CONFLICT.
+        filters = [getattr(model, key) == value for key, value in values.items() if key in ("name", "code")]
+        row_id = await session.scalar(select(model.id).filter(*filters))
+        if row_id is None:
+            row = model(**values)
+            session.add(row)
+            await session.flush()
+            row_id = row.id
+        return row_id
+
+    async with db_helper.session_getter_md() as session:
+        await init_transactions_types(session)
+        ids = {
+            "category_id": await get_or_create(session, Category, name="Food"),
+            "usd_id": await get_or_create(session, Currency, code="USD", name="US Dollar", exchange_rate=1),
+            "eur_id": await get_or_create(session, Currency, code="EUR", name="Euro", exchange_rate=2),
+        }
+        await session.commit()
+
+        types = dict((await session.execute(select(TransactionsType.eng_name, TransactionsType.id))).all())
+        return {**ids, "income_type_id": types[INCOME_TYPE_NAME], "expense_type_id": types[EXPENSE_TYPE_NAME]}
+
+
+@pytest.fixture
+async def user_id(session) -> int:
+    """
+    A new user created directly in the database, for crud-level tests.
+    """
+    from core.models.user import User
+
+    username = f"user_{uuid.uuid4().hex[:12]}"
+    user = User(username=username, email=f"{username}@example.com", password="x")
+    session.add(user)
+    await session.commit()
+    return user.id
+
+
+@pytest.fixture
+def new_transaction(reference_ids):
+    """
+    Builds /transactions/add bodies: a 3.50 USD coffee expense with the given fields overridden.
+    """
+    def new_transaction(**overrides) -> dict:
+        return {"category_id": reference_ids["category_id"], "description": "Coffee", "amount": 3.5,
+                "transaction_type_id": reference_ids["expense_type_id"], "currency_id": reference_ids["usd_id"],
+                **overrides}
+
+    return new_transaction
+
+
+class FakeClock:
+    """
+    Stands in for time.monotonic and time.time; moves only when a test sets `now`.
+    """
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    import time
+
+    clock = FakeClock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    monkeypatch.setattr(time, "time", clock)
+    return clock
+
+
+@pytest.fixture(scope="session")
+async def app(reference_ids):
+    from main import main_app
+
+    async with main_app.router.lifespan_context(main_app):
+        # Tests rely on the reference data being loaded.
+        await main_app.state.warm_up
+        yield main_app
+
+
+@pytest.fixture
+async def client(app):
+    """
+    An https client (the auth cookies are Secure) logged in as a new user.
+    """
+    import httpx
+
+    from core.config import settings
+
+    username = f"user_{uuid.uuid4().hex[:12]}"
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="https://test") as client:
+        response = await client.post(f"{settings.api.prefix}/auth/register",
+                                     json={"username": username, "email": f"{username}@example.com",
+                                           "password": PASSWORD})
+        assert response.status_code == 200, response.text
+        client.user_id = response.json()["id"]
+        response = await client.post(f"{settings.api.prefix}/auth/login",
+                                     data={"username": username, "password": PASSWORD})
+        assert response.status_code == 200, response.text
+        yield client
+
+
+SEED_USERS = 200
+SEED_ROWS_PER_USER = 500
+
+
+@pytest.fixture(scope="session")
+async def seeded_user_ids(reference_ids) -> list[int]:
+    """
+    A table big enough for the planner to care: SEED_USERS users with SEED_ROWS_PER_USER
+    transactions each, spread over two years and analyzed. Only a handful of rows mention a refund.
+    """
+    from sqlalchemy import text
+
+    from core.db_connection.db_helper import db_helper
+
+    prefix = f"seed_{uuid.uuid4().hex[:8]}_"
+    async with db_helper.session_getter_md() as session:
+        user_ids = (await session.scalars(text(
+            "INSERT INTO users (username, email, password, is_superuser, created_at, updated_at) "
+            "SELECT :prefix || n, :prefix || n || '@example.com', 'x', false, now(), now() "
+            "FROM generate_series(1, :users) n RETURNING id"
+        ), {"prefix": prefix, "users": SEED_USERS})).all()
+        await session.execute(text(
+            "INSERT INTO transactions (user_id, date, category_id, description, amount, transaction_type_id, "
+            "currency_id, created_at, updated_at) "
+            "SELECT u.id, current_date - n % 730, :category_id, "
+            "CASE WHEN n = 1 AND u.id % 50 = 0 THEN 'Refund for order ' || n "
+            "ELSE (ARRAY['Coffee', 'Groceries', 'Taxi to airport', 'Monthly salary'])[1 + n % 4] END, "
+            "n % 1000 + 1, :type_id, :currency_id, now(), now() "
+            "FROM users u CROSS JOIN generate_series(1, :rows) n WHERE u.username LIKE :prefix || '%'"
+        ), {"prefix": prefix, "rows": SEED_ROWS_PER_USER, "category_id": reference_ids["category_id"],
+            "type_id": reference_ids["expense_type_id"], "currency_id": reference_ids["usd_id"]})
+        await session.commit()
+
+    # VACUUM also moves the new rows out of the GIN pending list, as autovacuum would.
+    async with db_helper.engine.connect() as connection:
+        await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await connection.exec_driver_sql("VACUUM ANALYZE transactions")
+    return list(user_ids)
+
+
+def _plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from _plan_nodes(child)
+
+
+@pytest.fixture
+def explain(session):
+    """
+    `await explain(query)` -> the plan nodes of a select, as dicts from EXPLAIN (FORMAT JSON).
+    """
+    async def explain(query) -> list[dict]:
+        connection = await session.connection()
+        compiled = query.compile(dialect=connection.dialect)
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)).scalar_one()
+        return list(_plan_nodes(plan[0]["Plan"]))
+
+    return explain
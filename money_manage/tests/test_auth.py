@@ -0,0 +1,99 @@
+import hashlib
+from datetime import datetime, timedelta
+
+import pytest
+
+from api.api_v1.auth import jwt_auth
+from core.cache import RedisBackend
+from core.config import settings
+from core.models.user import RevokedToken
+
+AUTH = f"{settings.api.prefix}/auth"
+LIST = f"{settings.api.prefix}/transactions/get_transactions"
+
+
+async def _get_with_refresh_token_only(client, refresh_token: str):
+    client.cookies.clear()
+    return await client.get(LIST, headers={"Cookie": f"refresh_token={refresh_token}"})
+
+
+async def test_expired_access_token_is_reissued_from_the_refresh_token(client):
+    client.cookies.delete("access_token")
+
+    response = await client.get(LIST)
+
+    assert response.status_code == 200
+    assert "access_token" in response.cookies
+
+
+@pytest.fixture
+def revocation_lookups(monkeypatch) -> list[str]:
+    lookups = []
+    is_token_revoked_db = jwt_auth.is_token_revoked_db
+
+    async def counting(session, token_hash):
+        lookups.append(token_hash)
+        return await is_token_revoked_db(session, token_hash)
+
+    monkeypatch.setattr(jwt_auth, "is_token_revoked_db", counting)
+    return lookups
+
+
+async def _forget_recent_checks(refresh_token: str):
+    # What expiring the reissue cache and the "not revoked" answer amounts to.
+    key = hashlib.sha256(refresh_token.encode()).hexdigest()
+    jwt_auth._reissued_tokens.clear()
+    await jwt_auth.user_cache.delete(f"not_revoked:{key}")
+
+
+async def test_refreshes_do_not_ask_the_database_again_for_a_while(client, revocation_lookups):
+    refresh_token = client.cookies["refresh_token"]
+
+    for _ in range(2):
+        assert (await _get_with_refresh_token_only(client, refresh_token)).status_code == 200
+    jwt_auth._reissued_tokens.clear()
+    assert (await _get_with_refresh_token_only(client, refresh_token)).status_code == 200
+
+    assert len(revocation_lookups) == 1
+
+
+async def test_revocation_on_another_worker_stops_reissued_tokens(client, session):
+    refresh_token = client.cookies["refresh_token"]
+    assert (await _get_with_refresh_token_only(client, refresh_token)).status_code == 200
+
+    # Another worker's logout: only the database knows about it.
+    session.add(RevokedToken(token_hash=hashlib.sha256(refresh_token.encode()).hexdigest(),
+                             expires_at=datetime.now() + timedelta(days=1)))
+    await session.commit()
+    await _forget_recent_checks(refresh_token)
+
+    response = await _get_with_refresh_token_only(client, refresh_token)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Refresh token has been revoked"
+
+
+async def test_logout_revokes_the_refresh_token(client):
+    refresh_token = client.cookies["refresh_token"]
+
+    assert (await client.post(f"{AUTH}/logout")).status_code == 200
+
+    assert (await _get_with_refresh_token_only(client, refresh_token)).status_code == 401
+
+
+async def test_with_redis_only_the_shared_cache_is_checked(client, monkeypatch, revocation_lookups):
+    fakeredis = pytest.importorskip("fakeredis")
+    monkeypatch.setattr(jwt_auth, "user_cache", RedisBackend(fakeredis.FakeAsyncRedis()))
+    refresh_token = client.cookies["refresh_token"]
+    assert (await _get_with_refresh_token_only(client, refresh_token)).status_code == 200
+
+    client.cookies.set("refresh_token", refresh_token)
+    assert (await client.post(f"{AUTH}/logout")).status_code == 200
+    await _forget_recent_checks(refresh_token)
+
+    assert (await _get_with_refresh_token_only(client, refresh_token)).status_code == 401
+    assert revocation_lookups == []
+
+
+async def test_login_rejects_a_wrong_password(client, app):
+    response = await client.post(f"{AUTH}/login", data={"username": "nobody", "password": "wrong"})
+    assert response.status_code == 401
@@ -0,0 +1,90 @@
+import json
+from decimal import Decimal
+
+from sqlalchemy import insert, select
+
+from core.config import settings
+from core.models.transactions import Transactions
+from crud.daily_balances import verify_daily_balances
+
+API = f"{settings.api.prefix}/transactions"
+
+
+async def _import(client, *rows) -> list[int]:
+    """
+    Adds rows with explicit dates through the import endpoint; returns the user's ids, oldest first.
+    """
+    response = await client.post(f"{API}/import", params={"format": "ndjson"},
+                                 content="\n".join(json.dumps(row) for row in rows))
+    assert response.status_code == 200 and response.json()["failed"] == 0, response.text
+    page = (await client.get(f"{API}/get_transactions", params={"limit": 100, "sort": "date"})).json()
+    return [item["id"] for item in page["items"]]
+
+
+async def _amounts(session, user_id) -> dict[int, Decimal]:
+    rows = await session.execute(select(Transactions.id, Transactions.amount).filter(Transactions.user_id == user_id))
+    return dict(rows.all())
+
+
+async def test_bulk_update_by_ids_and_by_filters(client, session, new_transaction, reference_ids):
+    ids = await _import(client,
+                        new_transaction(date="2026-01-10", description="Taxi home"),
+                        new_transaction(date="2026-02-10", description="Coffee"),
+                        new_transaction(date="2026-03-10", description="Late taxi"))
+
+    response = await client.patch(f"{API}/bulk_update", json={"filter": {"ids": ids[:1]}, "changes": {"amount": 1}})
+    assert response.json() == {"affected": 1}
+
+    response = await client.patch(f"{API}/bulk_update", json={
+        "filter": {"date_from": "2026-02-01", "date_to": "2026-03-31", "category_id": reference_ids["category_id"]},
+        "changes": {"amount": 2}})
+    assert response.json() == {"affected": 2}
+
+    response = await client.patch(f"{API}/bulk_update", json={"filter": {"description_contains": "TAXI"},
+                                                               "changes": {"description": None}})
+    assert response.json() == {"affected": 2}
+
+    assert await _amounts(session, client.user_id) == {ids[0]: 1, ids[1]: 2, ids[2]: 2}
+    descriptions = dict((await session.execute(select(Transactions.id, Transactions.description)
+                                               .filter(Transactions.user_id == client.user_id))).all())
+    assert descriptions == {ids[0]: None, ids[1]: "Coffee", ids[2]: None}
+    assert await verify_daily_balances(session, user_id=client.user_id) == []
+
+
+async def test_bulk_changes_run_in_chunks_and_keep_rollups(client, session, new_transaction, reference_ids):
+    ids = await _import(client, *(new_transaction(date=f"2026-04-0{day}", amount=day) for day in range(1, 6)))
+
+    response = await client.patch(f"{API}/bulk_update", json={
+        "filter": {"date_from": "2026-04-01"}, "changes": {"currency_id": reference_ids["eur_id"]}, "chunk_size": 2})
+    assert response.json() == {"affected": 5}
+    assert await verify_daily_balances(session, user_id=client.user_id) == []
+
+    response = await client.post(f"{API}/bulk_delete", json={"filter": {"ids": ids[1:]}, "chunk_size": 2})
+    assert response.json() == {"affected": 4}
+    assert list(await _amounts(session, client.user_id)) == ids[:1]
+    assert await verify_daily_balances(session, user_id=client.user_id) == []
+
+
+async def test_bulk_changes_leave_other_users_alone(client, session, user_id, new_transaction, reference_ids):
+    await client.post(f"{API}/add", json=new_transaction())
+    await session.execute(insert(Transactions).values(user_id=user_id, **new_transaction()))
+    await session.commit()
+
+    coffee = {"description_contains": "coffee"}
+    assert (await client.patch(f"{API}/bulk_update", json={"filter": coffee, "changes": {"amount": 9}})).json() \
+           == {"affected": 1}
+    assert (await client.post(f"{API}/bulk_delete", json={"filter": coffee})).json() == {"affected": 1}
+
+    assert list((await _amounts(session, user_id)).values()) == [Decimal("3.5")]
+
+
+async def test_bulk_requests_are_validated(client):
+    response = await client.patch(f"{API}/bulk_update", json={"filter": {}, "changes": {"amount": 1}})
+    assert response.status_code == 422
+    response = await client.post(f"{API}/bulk_delete", json={"filter": {}})
+    assert response.status_code == 422
+
+    for changes in ({"amount": None}, {"category_id": None}, {"amount": -1}):
+        response = await client.patch(f"{API}/bulk_update", json={"filter": {"ids": [1]}, "changes": changes})
+        assert response.status_code == 422, changes
+        assert "SELECT" not in response.text and "UPDATE" not in response.text
@@ -0,0 +1,71 @@
+import pytest
+
+from core.cache import InMemoryBackend, RedisBackend, TTLCache
+
+
+def test_entries_expire_after_their_ttl(clock):
+    ttl_cache = TTLCache(ttl=10)
+    ttl_cache.set("default", 1)
+    ttl_cache.set("short", 2, ttl=1)
+
+    clock.now += 5
+    assert ttl_cache.get("default") == 1
+    assert ttl_cache.get("short") is None
+    assert "short" not in ttl_cache
+
+    clock.now += 5
+    assert ttl_cache.get("default", "gone") == "gone"
+    assert len(ttl_cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    ttl_cache = TTLCache(maxsize=2)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.get("a")
+    ttl_cache.set("c", 3)
+
+    assert "a" in ttl_cache and "c" in ttl_cache
+    assert "b" not in ttl_cache
+
+
+def test_non_positive_ttl_removes_the_entry(clock):
+    ttl_cache = TTLCache()
+    ttl_cache.set("key", "value")
+    ttl_cache.set("key", "other", ttl=0)
+
+    assert ttl_cache.get("key") is None
+    assert ttl_cache.pop("key", "missing") == "missing"
+
+
+def test_falsy_values_are_cached(clock):
+    ttl_cache = TTLCache()
+    ttl_cache.set("zero", 0)
+
+    assert ttl_cache.get("zero", "missing") == 0
+    assert ttl_cache.pop("zero") == 0
+
+
+async def test_in_memory_backend(clock):
+    backend = InMemoryBackend()
+    await backend.set("a", "1", ttl=5)
+    await backend.set("b", "2", ttl=5)
+    await backend.delete("a", "missing")
+
+    assert await backend.get("a") is None
+    assert await backend.get("b") == "2"
+    clock.now += 5
+    assert await backend.get("b") is None
+
+
+async def test_redis_backend_prefixes_keys_and_expires():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeAsyncRedis()
+    backend = RedisBackend(client, prefix="test:")
+
+    await backend.set("user:alice", "7", ttl=60)
+    assert await backend.get("user:alice") == "7"
+    assert 0 < await client.pttl("test:user:alice") <= 60000
+
+    await backend.set("user:alice", "8", ttl=0)
+    assert await backend.get("user:alice") is None
@@ -0,0 +1,142 @@
+import json
+import subprocess
+import sys
+import uuid
+from datetime import date
+from pathlib import Path
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from core.config import settings
+from core.currency_conversion import RateHistory, RatesSnapshot, UnknownCurrencyError, currency_converter
+from core.models.currencies import Currency, CurrencyRate
+from crud.currencies import load_currency_rates
+
+APP_DIR = Path(__file__).parent.parent
+API = f"{settings.api.prefix}/transactions"
+
+USD, EUR, GBP = 1, 2, 3
+
+
+def test_rate_history_picks_the_rate_in_effect():
+    history = RateHistory([(EUR, date(2026, 3, 1), "1.10"), (EUR, date(2026, 1, 1), "1.05"), (GBP, date(2026, 2, 1), "1.3")])
+
+    assert history.rate_at(EUR, date(2025, 12, 31)) is None
+    assert history.rate_at(EUR, date(2026, 1, 1)) == Decimal("1.05")
+    assert history.rate_at(EUR, date(2026, 2, 28)) == Decimal("1.05")
+    assert history.rate_at(EUR, date(2026, 3, 1)) == Decimal("1.10")
+    assert history.rate_at(USD, date(2026, 3, 1)) is None
+    assert len(history) == 3
+
+
+def _snapshot(history_rows=()) -> RatesSnapshot:
+    return RatesSnapshot(rates={USD: Decimal("1"), EUR: Decimal("1.20"), GBP: Decimal("1.50")},
+                         ids_by_code={"USD": USD, "EUR": EUR, "GBP": GBP},
+                         history=RateHistory(history_rows))
+
+
+def test_historical_rates_are_used_when_both_currencies_have_one():
+    snapshot = _snapshot([(EUR, date(2026, 1, 1), "1.00"), (GBP, date(2026, 1, 1), "2.00")])
+
+    assert snapshot.convert_many([(10, GBP, date(2026, 6, 1))], EUR) == [Decimal("20.00")]
+
+
+def test_rates_are_not_mixed_when_only_one_currency_has_history():
+    snapshot = _snapshot([(EUR, date(2026, 1, 1), "1.00")])
+
+    # EUR's history would give 1.00 / 1 (latest USD); latest rates for both give 1.20 / 1.
+    assert snapshot.convert_many([(10, EUR, date(2026, 6, 1))], USD) == [Decimal("12.00")]
+    # Before any history, and without a date, the latest rates are used too.
+    assert snapshot.convert_many([(10, EUR, date(2025, 6, 1)), (10, EUR)], USD) == [Decimal("12.00")] * 2
+
+
+def test_convert_many_rounds_to_cents_half_even():
+    snapshot = _snapshot()
+
+    assert snapshot.convert_many([(Decimal("0.125"), USD), (Decimal("0.135"), USD)], USD) == [Decimal("0.12"), Decimal("0.14")]
+
+
+def test_unknown_currencies_are_reported():
+    snapshot = _snapshot()
+
+    with pytest.raises(UnknownCurrencyError):
+        snapshot.currency_id("XYZ")
+    with pytest.raises(UnknownCurrencyError):
+        snapshot.convert_many([(1, 99)], USD)
+
+
+@pytest.fixture
+async def rate_currencies(session, monkeypatch) -> tuple[Currency, Currency]:
+    """
+    Two new currencies: `foreign` at 3 units of `base` now, and at 2 from 2026-01-01 per currency_rates.
+    """
+    suffix = uuid.uuid4().hex[:8].upper()
+    foreign = Currency(code=f"F{suffix}", name="Foreign", exchange_rate=3)
+    base = Currency(code=f"B{suffix}", name="Base", exchange_rate=1)
+    session.add_all([foreign, base])
+    await session.commit()
+    await load_currency_rates(session, [(foreign.code, date(2026, 1, 1), Decimal(2)),
+                                        (base.code, date(2026, 1, 1), Decimal(1))])
+    # Make the next request look at the rate tables instead of the snapshot it already has.
+    monkeypatch.setattr(currency_converter, "_checked_at", None)
+    return foreign, base
+
+
+async def _add_foreign_rows(client, new_transaction, foreign: Currency):
+    body = "\n".join(json.dumps(new_transaction(date=day, amount=10, currency_id=foreign.id))
+                     for day in ("2025-06-01", "2026-02-01"))
+    response = await client.post(f"{API}/import", params={"format": "ndjson"}, content=body)
+    assert response.json()["inserted"] == 2
+
+
+async def test_list_is_converted_at_each_days_rate(client, new_transaction, rate_currencies):
+    foreign, base = rate_currencies
+    await _add_foreign_rows(client, new_transaction, foreign)
+
+    response = await client.get(f"{API}/get_transactions", params={"convert_to": base.code.lower()})
+
+    assert response.status_code == 200, response.text
+    # Before the history starts the latest rate (3) applies, after it the historical one (2).
+    assert {item["date"]: (Decimal(str(item["converted_amount"])), item["converted_currency_id"])
+            for item in response.json()["items"]} == {"2025-06-01": (Decimal(30), base.id),
+                                                      "2026-02-01": (Decimal(20), base.id)}
+
+
+async def test_summary_is_converted_per_day_and_merged(client, new_transaction, rate_currencies):
+    foreign, base = rate_currencies
+    await _add_foreign_rows(client, new_transaction, foreign)
+
+    response = await client.get(f"{API}/summary", params={"convert_to": base.code, "period": "month"})
+
+    assert response.status_code == 200, response.text
+    assert [(item["period"], item["currency_id"], item["expense"], item["count"]) for item in response.json()["items"]] \
+           == [("2025-06-01", base.id, 30, 1), ("2026-02-01", base.id, 20, 1)]
+
+    response = await client.get(f"{API}/summary", params={"convert_to": base.code})
+    assert [(item["expense"], item["count"]) for item in response.json()["items"]] == [(50, 2)]
+
+
+async def test_unknown_target_currency_is_400(client):
+    for path in ("get_transactions", "summary"):
+        response = await client.get(f"{API}/{path}", params={"convert_to": "XXX-NOPE"})
+        assert response.status_code == 400, path
+
+
+async def test_rates_load_command_upserts(session, rate_currencies, tmp_path):
+    foreign, _ = rate_currencies
+    rates_file = tmp_path / "rates.csv"
+
+    for rate in ("2.5", "2.75"):
+        rates_file.write_text(f"code,valid_from,rate\n{foreign.code},2026-05-01,{rate}\n"
+                              f"{foreign.code.lower()},2026-06-01,2.9\n")
+        result = subprocess.run([sys.executable, "manage.py", "rates", "load", str(rates_file)],
+                                cwd=APP_DIR, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert "Loaded 2 currency rates" in result.stdout
+
+    rows = (await session.execute(select(CurrencyRate.valid_from, CurrencyRate.rate)
+                                  .filter(CurrencyRate.currency_id == foreign.id)
+                                  .order_by(CurrencyRate.valid_from))).all()
+    assert rows == [(date(2026, 1, 1), 2), (date(2026, 5, 1), Decimal("2.75")), (date(2026, 6, 1), Decimal("2.9"))]
@@ -0,0 +1,112 @@
+import asyncio
+import json
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import func, insert, select
+
+from core.config import settings
+from core.db_connection.db_helper import db_helper
+from core.models.budgets import Category
+from core.models.transactions import Transactions
+from crud.daily_balances import DailyBalanceDeltas, apply_daily_balance_deltas, rebuild_daily_balances, \
+    verify_daily_balances
+
+DAY = date(2026, 10, 1)
+API = f"{settings.api.prefix}/transactions"
+
+
+def _row(amount, **key) -> dict:
+    return {"user_id": 1, "date": DAY, "category_id": 1, "transaction_type_id": 1, "currency_id": 1,
+            "amount": amount, **key}
+
+
+def test_deltas_merge_rows_with_the_same_key():
+    deltas = DailyBalanceDeltas()
+    deltas.add(_row(10))
+    deltas.add(_row(2.5))
+    deltas.add(_row(4, category_id=2))
+
+    assert deltas.rows() == [
+        {**_row(Decimal("12.5")), "count": 2},
+        {**_row(Decimal("4"), category_id=2), "count": 1},
+    ]
+
+
+def test_deltas_that_cancel_out_are_dropped():
+    deltas = DailyBalanceDeltas()
+    deltas.add(_row(0.1))
+    deltas.add(_row(0.1), sign=-1)
+
+    assert deltas.rows() == []
+
+
+def test_deltas_accept_objects():
+    class Row:
+        user_id, date, category_id, transaction_type_id, currency_id, amount = 1, DAY, 1, 1, 1, 3
+
+    deltas = DailyBalanceDeltas()
+    deltas.add(Row(), sign=-1)
+
+    assert deltas.rows() == [{**_row(Decimal("-3")), "count": -1}]
+
+
+async def _write_uncommitted(session, user_id, reference_ids):
+    row = {"user_id": user_id, "date": DAY, "category_id": reference_ids["category_id"],
+           "transaction_type_id": reference_ids["expense_type_id"], "currency_id": reference_ids["usd_id"],
+           "amount": Decimal("7.25"), "description": None}
+    await session.execute(insert(Transactions).values(**row))
+    deltas = DailyBalanceDeltas()
+    deltas.add(row)
+    await apply_daily_balance_deltas(session, deltas)
+
+
+async def test_rebuild_waits_for_in_flight_writes(session, user_id, reference_ids):
+    await _write_uncommitted(session, user_id, reference_ids)
+
+    async def rebuild():
+        async with db_helper.session_getter_md() as rebuild_session:
+            return await rebuild_daily_balances(rebuild_session, user_id=user_id)
+
+    rebuilding = asyncio.create_task(rebuild())
+    await asyncio.sleep(0.3)
+    assert not rebuilding.done()
+
+    await session.commit()
+    assert await asyncio.wait_for(rebuilding, timeout=10) == 1
+    assert await verify_daily_balances(session, user_id=user_id) == []
+
+
+async def _raw_totals(session, user_id) -> dict[tuple, tuple]:
+    query = (select(Transactions.category_id, Transactions.transaction_type_id, Transactions.currency_id,
+                    func.sum(Transactions.amount), func.count())
+             .filter(Transactions.user_id == user_id)
+             .group_by(Transactions.category_id, Transactions.transaction_type_id, Transactions.currency_id))
+    return {tuple(row[:3]): (row[3], row[4]) for row in (await session.execute(query)).all()}
+
+
+async def test_every_write_path_keeps_the_rollup_in_step(client, session, new_transaction, reference_ids):
+    other_category = Category(name="Transport")
+    session.add(other_category)
+    await session.commit()
+
+    ids = [(await client.post(f"{API}/add", json=new_transaction(description=description, amount=amount))).json()["id"]
+           for description, amount in (("Coffee", 3.5), ("Taxi", 20), ("Salary", 1000), ("Cinema", 12))]
+    assert (await client.patch(f"{API}/update_transaction", params={"transaction_id": ids[1]}, json={
+        "category_id": other_category.id, "currency_id": reference_ids["eur_id"], "amount": 25})).status_code == 201
+    assert (await client.patch(f"{API}/bulk_update", json={
+        "filter": {"description_contains": "salary"},
+        "changes": {"transaction_type_id": reference_ids["income_type_id"]}})).json() == {"affected": 1}
+    assert (await client.post(f"{API}/bulk_delete", json={"filter": {"ids": [ids[3]]}})).json() == {"affected": 1}
+    imported = [new_transaction(date="2026-01-15", amount=7), new_transaction(date="2026-02-01", amount=5,
+                                                                             category_id=other_category.id)]
+    response = await client.post(f"{API}/import", params={"format": "ndjson"},
+                                 content="\n".join(json.dumps(row) for row in imported))
+    assert response.json()["inserted"] == 2
+
+    assert await verify_daily_balances(session, user_id=client.user_id) == []
+
+    summary = (await client.get(f"{API}/summary", params={"group_by": ["category", "type"]})).json()["items"]
+    assert {(item["category_id"], item["transaction_type_id"], item["currency_id"]):
+            (Decimal(str(item["income"] + item["expense"])), item["count"]) for item in summary} \
+           == await _raw_totals(session, client.user_id)
@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import text
+
+from core.config import Lazy, is_loaded
+from core.db_connection import db_helper as db_helper_module
+from core.db_connection.db_helper import DatabaseHelper, worker_pool_sizes
+
+
+@pytest.mark.parametrize("pool_size, max_overflow, max_connections, workers, expected", [
+    # No budget: the configured sizes as they are.
+    (10, 10, None, 4, (10, 10)),
+    # 100 connections over 4 workers: 25 each, the pool keeps its size and overflow takes the rest.
+    (10, 10, 100, 4, (10, 15)),
+    # A budget below pool_size shrinks the pool and leaves no overflow.
+    (10, 10, 20, 4, (5, 0)),
+    # Rounded down: 7 // 2 = 3 per worker.
+    (10, 5, 7, 2, (3, 0)),
+    # Every worker keeps at least one connection, even past the budget.
+    (10, 10, 3, 8, (1, 0)),
+    # workers=0 counts as one worker.
+    (10, 10, 20, 0, (10, 10)),
+])
+def test_worker_pool_sizes(pool_size, max_overflow, max_connections, workers, expected):
+    assert worker_pool_sizes(pool_size, max_overflow, max_connections, workers) == expected
+
+
+async def _backend_pid(helper) -> int:
+    async with helper.session_getter_md() as session:
+        return await session.scalar(text("SELECT pg_backend_pid()"))
+
+
+async def test_reset_after_fork_gives_the_child_new_connections(database_url, monkeypatch):
+    helper = Lazy(lambda: DatabaseHelper(url=database_url))
+    monkeypatch.setattr(db_helper_module, "db_helper", helper)
+
+    # Nothing to reset, and nothing gets built, before the helper is first used.
+    db_helper_module._reset_after_fork()
+    assert not is_loaded(helper)
+
+    parent_pid = await _backend_pid(helper)
+    parent_pool = helper.engine.pool
+    db_helper_module._reset_after_fork()
+
+    assert helper.engine.pool is not parent_pool
+    assert await _backend_pid(helper) != parent_pid
+    # The parent's connection was left open for the parent to keep using; closed here from the server side.
+    async with helper.session_getter_md() as session:
+        assert await session.scalar(text("SELECT pg_terminate_backend(:pid)"), {"pid": parent_pid})
+
+    await helper.dispose()
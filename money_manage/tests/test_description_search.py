@@ -0,0 +1,46 @@
+from sqlalchemy import func, select, text, update
+
+from core.config import settings
+from core.models.transactions import Transactions
+
+API = f"{settings.api.prefix}/transactions"
+
+
+async def test_word_search_uses_the_tsvector_index(seeded_user_ids, explain):
+    ts_query = func.websearch_to_tsquery("simple", "refund")
+    query = (select(Transactions.id, func.ts_rank(Transactions.description_tsv, ts_query).label("rank"))
+             .filter(Transactions.user_id == seeded_user_ids[0], Transactions.description_tsv.op("@@")(ts_query))
+             .order_by(text("rank DESC"), Transactions.id.desc())
+             .limit(20))
+    nodes = await explain(query)
+
+    assert "ix_transactions_user_id_description_tsv" in {node.get("Index Name") for node in nodes}
+    assert not any(node["Node Type"] == "Seq Scan" and node.get("Relation Name") == "transactions"
+                   for node in nodes)
+
+
+async def test_trigger_keeps_description_tsv_current(session, seeded_user_ids):
+    transaction_id = await session.scalar(select(Transactions.id)
+                                          .filter(Transactions.user_id == seeded_user_ids[3]).limit(1))
+    await session.execute(update(Transactions).filter(Transactions.id == transaction_id)
+                          .values(description="Airport parking"))
+    await session.commit()
+
+    tsv = await session.scalar(select(text("description_tsv::text")).select_from(Transactions)
+                               .filter(Transactions.id == transaction_id))
+    assert tsv == "'airport':1 'parking':2"
+
+
+async def test_search_endpoint_modes(client, reference_ids):
+    for description in ("Taxi to airport", "Airport parking", "Groceries"):
+        response = await client.post(f"{API}/add", json={
+            "category_id": reference_ids["category_id"], "description": description, "amount": 10,
+            "transaction_type_id": reference_ids["expense_type_id"], "currency_id": reference_ids["usd_id"]})
+        assert response.status_code == 201
+
+    words = (await client.get(f"{API}/search", params={"q": "airport"})).json()["items"]
+    assert {item["description"] for item in words} == {"Taxi to airport", "Airport parking"}
+
+    # Works with or without pg_trgm; without it, earlier matches rank higher.
+    substring = (await client.get(f"{API}/search", params={"q": "ocer", "mode": "substring"})).json()["items"]
+    assert [item["description"] for item in substring] == ["Groceries"]
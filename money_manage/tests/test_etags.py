@@ -0,0 +1,51 @@
+from starlette.requests import Request
+
+from api.api_v1.transactions.transactions import _etag, _etag_matches
+from core.config import settings
+
+API = f"{settings.api.prefix}/transactions"
+
+
+def _request(path: str = "/items", query: str = "", if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match is not None else []
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query.encode(),
+                    "headers": headers, "scheme": "https", "server": ("test", 443)})
+
+
+def test_etag_depends_on_version_query_and_extra():
+    etag = _etag(_request(query="limit=10"), 3)
+
+    assert etag.startswith('W/"3-')
+    assert _etag(_request(query="limit=10"), 3) == etag
+    assert _etag(_request(query="limit=10"), 4) != etag
+    assert _etag(_request(query="limit=20"), 3) != etag
+    assert _etag(_request(query="limit=10"), 3, "rates-2") != etag
+
+
+def test_if_none_match_uses_weak_comparison():
+    etag = 'W/"3-abc"'
+
+    assert _etag_matches(_request(if_none_match='W/"3-abc"'), etag)
+    assert _etag_matches(_request(if_none_match='"3-abc"'), etag)
+    assert _etag_matches(_request(if_none_match='"other", W/"3-abc"'), etag)
+    assert _etag_matches(_request(if_none_match="*"), etag)
+    assert not _etag_matches(_request(if_none_match='W/"2-abc"'), etag)
+    assert not _etag_matches(_request(), etag)
+
+
+async def test_list_revalidates_until_a_write(client, new_transaction):
+    await client.post(f"{API}/add", json=new_transaction())
+    first = await client.get(f"{API}/get_transactions", params={"limit": 10})
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    response = await client.get(f"{API}/get_transactions", params={"limit": 10}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    await client.post(f"{API}/add", json=new_transaction(amount=7))
+    response = await client.get(f"{API}/get_transactions", params={"limit": 10}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json()["items"]) == 2
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from api.api_v1.auth import utils
+from api.api_v1.auth.utils import hash_password_async, hash_queue_depth, validate_password_async
+from core.config import settings
+
+
+@pytest.fixture
+def hash_pool(monkeypatch):
+    """
+    A fresh hash pool configured by the test, shut down afterwards.
+    """
+    def configure(executor: str = "thread", workers: int = 2):
+        monkeypatch.setattr(settings.auth_jwt, "hash_executor", executor)
+        monkeypatch.setattr(settings.auth_jwt, "hash_workers", workers)
+
+    monkeypatch.setattr(utils, "_hash_executor", None)
+    yield configure
+    utils.shutdown_hash_executor()
+
+
+async def test_at_most_hash_workers_run_at_once(hash_pool):
+    hash_pool(workers=2)
+    lock, running, peak = threading.Lock(), [0], [0]
+    release = threading.Event()
+
+    def work():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        release.wait(timeout=5)
+        with lock:
+            running[0] -= 1
+
+    calls = [asyncio.ensure_future(utils._run_in_hash_pool("hash", work)) for _ in range(6)]
+    await asyncio.sleep(0.1)
+    assert hash_queue_depth() == 6
+
+    release.set()
+    await asyncio.gather(*calls)
+    assert peak[0] == 2
+    assert hash_queue_depth() == 0
+
+
+async def test_hashing_in_a_process_pool(hash_pool):
+    hash_pool(executor="process", workers=1)
+
+    hashed = await hash_password_async("secret")
+
+    assert await validate_password_async("secret", hashed)
+    assert not await validate_password_async("other", hashed)
+    assert hash_queue_depth() == 0
+
+
+async def test_lifespan_shuts_the_pool_down(hash_pool, monkeypatch):
+    hash_pool(workers=1)
+    await hash_password_async("secret")
+    executor = utils._hash_executor
+
+    class Stub:
+        async def stop(self):
+            pass
+
+        async def dispose(self):
+            pass
+
+    async def warm_up():
+        pass
+
+    # Only the pool is under test: keep the shared database helper and reference data running.
+    monkeypatch.setattr(main, "warm_up", warm_up)
+    monkeypatch.setattr(main, "reference_data", Stub())
+    monkeypatch.setattr(main, "db_helper", Stub())
+    async with main.lifespan(SimpleNamespace(state=SimpleNamespace())):
+        pass
+
+    assert utils._hash_executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(time.sleep, 0)
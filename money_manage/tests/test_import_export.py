@@ -0,0 +1,49 @@
+import json
+
+from core.config import settings
+
+API = f"{settings.api.prefix}/transactions"
+
+
+def _ndjson(*records) -> str:
+    return "\n".join(record if isinstance(record, str) else json.dumps(record) for record in records)
+
+
+async def test_import_reports_short_errors_in_line_order(client, reference_ids):
+    row = {"category_id": reference_ids["category_id"], "amount": 12.5, "description": "Imported",
+           "transaction_type_id": reference_ids["expense_type_id"], "currency_id": reference_ids["usd_id"]}
+    body = _ndjson(row, {**row, "amount": -5}, "not json", {**row, "date": "2026-01-31"}, {**row, "amount": 10**13})
+
+    response = await client.post(f"{API}/import", params={"format": "ndjson", "batch_size": 10}, content=body)
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["inserted"] == 2
+    assert result["failed"] == 3
+    assert [error["line"] for error in result["errors"]] == [2, 3, 5]
+    assert result["errors"][0]["error"] == "amount: must be between 0 and 999999999999"
+    assert all("DETAIL" not in error["error"] and "Failing row" not in error["error"]
+               for error in result["errors"])
+
+
+async def test_export_round_trips_imported_rows(client, reference_ids):
+    row = {"category_id": reference_ids["category_id"], "amount": 1, "description": "Export me",
+           "transaction_type_id": reference_ids["income_type_id"], "currency_id": reference_ids["usd_id"]}
+    await client.post(f"{API}/import", params={"format": "ndjson"}, content=_ndjson(row, row, row))
+
+    response = await client.get(f"{API}/export", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines() if line]
+    assert len(lines) == 3
+    assert {line["description"] for line in lines} == {"Export me"}
+
+
+async def test_import_refreshes_the_cached_total(client, reference_ids):
+    row = {"category_id": reference_ids["category_id"], "amount": 2, "description": "Counted",
+           "transaction_type_id": reference_ids["expense_type_id"], "currency_id": reference_ids["usd_id"]}
+    assert (await client.get(f"{API}/get_transactions")).json()["total"] == 0
+
+    await client.post(f"{API}/import", params={"format": "ndjson"}, content=_ndjson(row, row))
+
+    assert (await client.get(f"{API}/get_transactions")).json()["total"] == 2
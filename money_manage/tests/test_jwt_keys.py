@@ -0,0 +1,106 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from api.api_v1.auth import utils
+from api.api_v1.auth.utils import KeyFile, decode_jwt_cached, encode_jwt
+from core.cache import TTLCache
+
+
+def _key_pair() -> tuple[bytes, bytes]:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return (key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                              serialization.NoEncryption()),
+            key.public_key().public_bytes(serialization.Encoding.PEM,
+                                          serialization.PublicFormat.SubjectPublicKeyInfo))
+
+
+def _rewrite(path, content: bytes):
+    # A new mtime even when the filesystem's timestamps are coarse.
+    mtime = path.stat().st_mtime_ns + 10**9 if path.exists() else None
+    path.write_bytes(content)
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def keys(tmp_path, monkeypatch):
+    """
+    Two key pairs, with the public key file used by decode_jwt_cached holding the first one.
+    """
+    pairs = [_key_pair(), _key_pair()]
+    path = tmp_path / "public.pem"
+    _rewrite(path, pairs[0][1])
+    monkeypatch.setattr(utils, "public_key_file", KeyFile(path, "RS256", check_interval=0))
+    monkeypatch.setattr(utils, "_token_cache", TTLCache())
+    return pairs, path
+
+
+@pytest.fixture
+def verifications(monkeypatch) -> list[str]:
+    tokens = []
+    decode_jwt = utils.decode_jwt
+
+    def counting(token, **kwargs):
+        tokens.append(token)
+        return decode_jwt(token, **kwargs)
+
+    monkeypatch.setattr(utils, "decode_jwt", counting)
+    return tokens
+
+
+def _token(private_key: bytes, minutes: int = 5) -> str:
+    return encode_jwt({"sub": "1"}, private_key=serialization.load_pem_private_key(private_key, None),
+                      expire_minutes=minutes)
+
+
+def test_a_rewritten_key_file_is_picked_up(keys):
+    (first, second), path = keys
+    key_file = utils.public_key_file
+    old_key = key_file.get()
+
+    _rewrite(path, second[1])
+
+    assert key_file.get() is not old_key
+    assert key_file.version == 2
+    assert key_file.get() is key_file.get()
+
+
+def test_the_same_token_is_verified_once(keys, verifications):
+    (first, _), _ = keys
+    token = _token(first[0])
+
+    assert decode_jwt_cached(token) == decode_jwt_cached(token)
+    assert len(verifications) == 1
+
+
+def test_cached_payloads_are_dropped_after_a_key_rotation(keys, verifications):
+    (first, second), path = keys
+    token = _token(first[0])
+    decode_jwt_cached(token)
+
+    _rewrite(path, second[1])
+
+    with pytest.raises(jwt.InvalidSignatureError):
+        decode_jwt_cached(token)
+    assert len(verifications) == 2
+
+
+def test_cached_payloads_expire_with_the_token(keys, verifications, clock):
+    (first, _), _ = keys
+    clock.now = datetime.now(timezone.utc).timestamp()
+    token = _token(first[0], minutes=5)
+
+    decode_jwt_cached(token)
+    clock.now += timedelta(minutes=4).total_seconds()
+    decode_jwt_cached(token)
+    assert len(verifications) == 1
+
+    # Past `exp` by the cache's clock the entry is gone and the token is verified again.
+    clock.now += timedelta(minutes=2).total_seconds()
+    decode_jwt_cached(token)
+    assert len(verifications) == 2
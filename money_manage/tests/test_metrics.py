@@ -0,0 +1,55 @@
+import httpx
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import StreamingResponse
+
+from core.metrics import Histogram, Gauge, MetricsRegistry, http_request_seconds
+from middleware.metrics import MetricsMiddleware
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("job_seconds", "Job time.", ("kind",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+    histogram.observe(5, "a")
+
+    assert histogram.render() == [
+        "# HELP job_seconds Job time.",
+        "# TYPE job_seconds histogram",
+        'job_seconds_bucket{kind="a",le="0.1"} 1',
+        'job_seconds_bucket{kind="a",le="1.0"} 2',
+        'job_seconds_bucket{kind="a",le="+Inf"} 3',
+        'job_seconds_sum{kind="a"} 5.55',
+        'job_seconds_count{kind="a"} 3',
+    ]
+
+
+def test_registry_renders_every_metric():
+    registry = MetricsRegistry(enabled=True)
+    registry.register(Gauge("queue_depth", "Queued jobs.", lambda: 3))
+
+    assert registry.render() == "# HELP queue_depth Queued jobs.\n# TYPE queue_depth gauge\nqueue_depth 3\n"
+
+
+async def test_requests_are_labelled_by_route_template():
+    router = APIRouter(prefix="/items")
+
+    @router.get("/{item_id}")
+    async def get_item(item_id: int):
+        return StreamingResponse(iter([b"item"]), status_code=202)
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.add_middleware(MetricsMiddleware)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        await client.get("/api/items/17")
+        await client.get("/nowhere")
+
+    assert ("GET", "/api/items/{item_id}", "202") in http_request_seconds._series
+    assert ("GET", "unmatched", "404") in http_request_seconds._series
+
+
+async def test_disabled_metrics_add_no_middleware_or_route(app):
+    assert MetricsMiddleware not in {middleware.cls for middleware in app.user_middleware}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="https://test") as client:
+        assert (await client.get("/metrics")).status_code == 404
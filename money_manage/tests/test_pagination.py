@@ -0,0 +1,29 @@
+from datetime import date
+
+import pytest
+
+from core.pagination import encode_cursor, decode_cursor, decode_date_id_cursor, decode_rank_id_cursor
+
+
+def test_date_id_cursor_round_trip():
+    cursor = encode_cursor(date(2026, 3, 1), 42)
+
+    assert "=" not in cursor
+    assert decode_date_id_cursor(cursor) == (date(2026, 3, 1), 42)
+
+
+def test_rank_id_cursor_round_trip():
+    assert decode_rank_id_cursor(encode_cursor(0.25, 7)) == (0.25, 7)
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", encode_cursor(1), encode_cursor("x", 1),
+                                    encode_cursor(date(2026, 1, 1), "id"), "eyJhIjoxfQ"])
+def test_malformed_date_id_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_date_id_cursor(cursor)
+
+
+def test_cursor_must_decode_to_a_list():
+    # base64 of {"a":1}
+    with pytest.raises(ValueError):
+        decode_cursor("eyJhIjoxfQ")
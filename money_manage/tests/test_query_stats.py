@@ -0,0 +1,54 @@
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import event, text
+
+from core.db_connection.db_helper import db_helper
+from core import query_stats
+from core.query_stats import QueryStats, install_query_stats, redact_parameters
+from middleware.query_stats import QueryStatsMiddleware
+
+
+def test_server_timing_reports_count_total_and_slowest():
+    stats = QueryStats()
+    stats.add("SELECT 1", 0.002)
+    stats.add("SELECT 2", 0.010)
+
+    assert stats.server_timing() == 'db;dur=12.0;desc="2 queries", db-slowest;dur=10.0'
+
+
+def test_parameters_are_redacted_to_types():
+    assert redact_parameters({"amount": 12.5, "description": "rent"}) == {"amount": "float", "description": "str"}
+    assert redact_parameters((1, "secret")) == ("int", "str")
+    assert redact_parameters([{"a": 1}, {"a": 2}]) == "<2 parameter sets>"
+
+
+@pytest.fixture
+def tracked_engine(database_url):
+    install_query_stats(db_helper.engine)
+    yield db_helper.engine
+    sync_engine = db_helper.engine.sync_engine
+    event.remove(sync_engine, "before_cursor_execute", query_stats._before_cursor_execute)
+    event.remove(sync_engine, "after_cursor_execute", query_stats._after_cursor_execute)
+
+
+async def test_requests_get_a_server_timing_header(tracked_engine, caplog):
+    app = FastAPI()
+
+    @app.get("/queries")
+    async def queries():
+        async with db_helper.session_getter_md() as session:
+            for _ in range(12):
+                await session.execute(text("SELECT 1"))
+        return {}
+
+    app.add_middleware(QueryStatsMiddleware)
+
+    with caplog.at_level(logging.WARNING, logger="money_manage.slow_query"):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/queries")
+
+    assert 'desc="12 queries"' in response.headers["Server-Timing"]
+    assert any("/queries ran the same statement 12 times" in record.getMessage() for record in caplog.records)
@@ -0,0 +1,97 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from middleware.rate_limit import InMemoryTokenBucket, RedisTokenBucket, AdmissionGate, AdmissionMiddleware, \
+    RateLimitMiddleware
+
+
+async def test_in_memory_bucket_allows_a_burst_then_refills(clock):
+    bucket = InMemoryTokenBucket()
+
+    assert [await bucket.take("user:1", rate=2, burst=3) for _ in range(3)] == [0, 0, 0]
+    assert await bucket.take("user:1", rate=2, burst=3) == pytest.approx(0.5)
+    assert await bucket.take("user:2", rate=2, burst=3) == 0
+
+    clock.now += 0.5
+    assert await bucket.take("user:1", rate=2, burst=3) == 0
+    assert await bucket.take("user:1", rate=2, burst=3) > 0
+
+
+async def test_redis_bucket_matches_the_in_memory_one(clock):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    bucket = RedisTokenBucket(fakeredis.FakeAsyncRedis(decode_responses=True))
+
+    assert [await bucket.take("user:1", rate=2, burst=2) for _ in range(2)] == [0, 0]
+    assert await bucket.take("user:1", rate=2, burst=2) == pytest.approx(0.5)
+    clock.now += 1
+    assert await bucket.take("user:1", rate=2, burst=2) == 0
+
+
+async def test_admission_gate_queues_then_turns_away():
+    gate = AdmissionGate(max_concurrency=1, max_queue=1, max_wait=0.05)
+    assert await gate.acquire()
+
+    waiter = asyncio.create_task(gate.acquire())
+    await asyncio.sleep(0)
+    assert not await gate.acquire()  # queue is full
+    assert not await waiter  # timed out
+
+    gate.release()
+    assert await gate.acquire()
+
+
+def _app(middleware, **options) -> FastAPI:
+    app = FastAPI()
+    release = asyncio.Event()
+
+    @app.get("/stream")
+    async def stream():
+        async def body():
+            yield b"first,"
+            await release.wait()
+            yield b"last"
+        return StreamingResponse(body())
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    app.add_middleware(middleware, **options)
+    app.state.release = release
+    return app
+
+
+async def test_admission_slot_is_held_until_a_streamed_body_is_sent():
+    app = _app(AdmissionMiddleware, gate=AdmissionGate(max_concurrency=1, max_queue=0, max_wait=0.01))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        streaming = asyncio.create_task(client.get("/stream"))
+        await asyncio.sleep(0.05)  # headers and the first chunk are out
+
+        busy = await client.get("/ping")
+        assert busy.status_code == 503
+        assert busy.headers["Retry-After"] == "1"
+
+        app.state.release.set()
+        assert (await streaming).text == "first,last"
+        assert (await client.get("/ping")).status_code == 200
+
+
+async def test_rate_limit_middleware_answers_429_with_retry_after(clock):
+    app = _app(RateLimitMiddleware, backend=InMemoryTokenBucket(), rate=0.5, burst=1)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/ping")).status_code == 200
+
+        limited = await client.get("/ping")
+        assert limited.status_code == 429
+        assert limited.headers["Retry-After"] == "2"
+
+
+async def test_disabled_layers_are_not_registered(app):
+    # The test settings switch rate limiting off.
+    registered = {middleware.cls for middleware in app.user_middleware}
+    assert RateLimitMiddleware not in registered and AdmissionMiddleware not in registered
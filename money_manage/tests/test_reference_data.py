@@ -0,0 +1,41 @@
+import json
+
+from core.config import settings
+from core.models.budgets import Category
+from core.reference_data import ReferenceData, CategoryRecord, reference_data, unknown_reference_ids, \
+    _index_by_id
+
+API = f"{settings.api.prefix}/transactions"
+
+
+def test_reference_data_lookups():
+    data = ReferenceData(categories=_index_by_id([CategoryRecord(1, "Food"), CategoryRecord(4, "Rent")]))
+
+    assert data.category(4).name == "Rent"
+    assert data.category(2) is None and data.category(-1) is None and data.category(99) is None
+
+
+async def test_cache_misses_are_checked_in_the_database(app, session, monkeypatch):
+    category = Category(name="Added after the last reload")
+    session.add(category)
+    await session.commit()
+    monkeypatch.setattr(reference_data, "current", lambda: ReferenceData())
+
+    unknown = await unknown_reference_ids(session, category_id=[category.id, 10**6], currency_id=[None])
+
+    assert unknown == {"category_id": {10**6}}
+
+
+async def test_unknown_ids_are_rejected(client, reference_ids):
+    body = {"category_id": 10**6, "amount": 1, "transaction_type_id": reference_ids["expense_type_id"],
+            "currency_id": reference_ids["usd_id"]}
+
+    response = await client.post(f"{API}/add", json=body)
+    assert response.status_code == 422
+    assert response.json()["detail"] == f"Unknown category_id: {10**6}"
+
+    response = await client.post(f"{API}/import", params={"format": "ndjson"},
+                                 content=json.dumps({**body, "category_id": reference_ids["category_id"]})
+                                 + "\n" + json.dumps(body))
+    assert response.json()["inserted"] == 1
+    assert response.json()["errors"] == [{"line": 2, "error": f"Unknown category_id: {10**6}"}]
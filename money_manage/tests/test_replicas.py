@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import text
+
+from core.db_connection.db_helper import DatabaseHelper
+
+# Nothing listens on port 1, so connecting fails straight away.
+DOWN_URL = "postgresql+asyncpg://postgres@127.0.0.1:1/money_manage_test"
+
+
+@pytest.fixture
+async def make_helper(database_url):
+    helpers = []
+
+    def make(replica_urls):
+        helper = DatabaseHelper(url=database_url, replica_urls=replica_urls)
+        helpers.append(helper)
+        return helper
+
+    yield make
+    for helper in helpers:
+        await helper.dispose()
+
+
+async def test_reads_go_to_a_healthy_replica(make_helper, database_url):
+    # The test database stands in for a replica of itself.
+    helper = make_helper([database_url])
+
+    async with helper.read_session_getter_md("1") as session:
+        assert session.info["replica"]
+        assert await session.scalar(text("SELECT 1")) == 1
+
+
+async def test_unreachable_replica_falls_back_to_the_primary(make_helper):
+    helper = make_helper([DOWN_URL])
+
+    async with helper.read_session_getter_md("1") as session:
+        assert not session.info["replica"]
+        assert await session.scalar(text("SELECT 1")) == 1
+
+    assert not helper.replicas.replicas[0].healthy
+
+
+async def test_only_committed_writes_pin_reads_to_the_primary(make_helper, database_url):
+    helper = make_helper([database_url])
+
+    async with helper.write_session_getter_md("7") as session:
+        await session.execute(text("SELECT 1"))
+        await session.rollback()
+    assert await helper._recent_writers.get("wrote:7") is None
+
+    async with helper.write_session_getter_md("7") as session:
+        await session.execute(text("SELECT 1"))
+        await session.commit()
+    assert await helper._recent_writers.get("wrote:7")
+
+    async with helper.read_session_getter_md("7") as session:
+        assert not session.info["replica"]
+
+
+async def test_connection_lost_mid_request_takes_the_replica_out(make_helper, database_url):
+    helper = make_helper([database_url])
+    replica = helper.replicas.replicas[0]
+
+    async with helper.read_session_getter_md("1") as session:
+        assert session.info["replica"]
+        backend_pid = await session.scalar(text("SELECT pg_backend_pid()"))
+        async with helper.session_getter_md() as primary:
+            await primary.execute(text("SELECT pg_terminate_backend(:pid)"), {"pid": backend_pid})
+        with pytest.raises(Exception):
+            await session.execute(text("SELECT 1"))
+
+    assert not replica.healthy
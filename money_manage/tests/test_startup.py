@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+import pytest
+
+from bench.startup import APP_DIR, fastest_import, load_baseline
+
+# Everything but `main`, which has to read the settings to pick its middleware.
+LIBRARY_MODULES = (
+    "api",
+    "core.db_connection.db_helper",
+    "core.currency_conversion",
+    "core.metrics",
+    "core.reference_data",
+    "crud.transactions",
+    "middleware.auth",
+    "middleware.metrics",
+    "middleware.query_stats",
+    "middleware.rate_limit",
+)
+
+
+def test_importing_does_not_build_the_settings():
+    code = "\n".join([*(f"import {module}" for module in LIBRARY_MODULES),
+                      "from core.config import get_settings",
+                      "print(get_settings.cache_info().currsize)"])
+    result = subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "0"
+
+
+def test_import_time_stays_near_the_recorded_baseline():
+    # Only meaningful against a baseline recorded on this machine.
+    baseline = load_baseline("main")
+    if baseline is None:
+        pytest.skip("no startup baseline recorded; run python -m bench.startup --record")
+
+    total_ms, imports = fastest_import("main", runs=3)
+
+    slowest = sorted(imports, key=lambda item: item[2], reverse=True)[:5]
+    assert total_ms <= baseline["total_ms"] * 1.5, slowest
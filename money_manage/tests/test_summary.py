@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from core.config import settings
+from core.models.budgets import Category
+
+API = f"{settings.api.prefix}/transactions"
+
+
+@pytest.fixture
+async def rows(client, session, new_transaction, reference_ids) -> dict[str, int]:
+    """
+    Income and expenses over March and April 2026 in USD and EUR, in two categories.
+    2026-03-02 is a Monday.
+    """
+    other_category = Category(name="Rent")
+    session.add(other_category)
+    await session.commit()
+
+    income, eur = reference_ids["income_type_id"], reference_ids["eur_id"]
+    body = [
+        new_transaction(date="2026-03-02", amount=1000, transaction_type_id=income),
+        new_transaction(date="2026-03-02", amount=10),
+        new_transaction(date="2026-03-04", amount=30, category_id=other_category.id),
+        new_transaction(date="2026-03-10", amount=5),
+        new_transaction(date="2026-04-01", amount=40, currency_id=eur),
+        new_transaction(date="2026-04-02", amount=100, currency_id=eur, transaction_type_id=income),
+    ]
+    response = await client.post(f"{API}/import", params={"format": "ndjson"},
+                                 content="\n".join(json.dumps(row) for row in body))
+    assert response.json()["inserted"] == len(body)
+    return {**reference_ids, "other_category_id": other_category.id}
+
+
+async def _summary(client, **params) -> list[dict]:
+    response = await client.get(f"{API}/summary", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()["items"]
+
+
+def _totals(item) -> tuple:
+    return item["income"], item["expense"], item["balance"], item["count"]
+
+
+async def test_totals_are_split_by_currency(client, rows):
+    items = {item["currency_id"]: _totals(item) for item in await _summary(client)}
+
+    assert items == {rows["usd_id"]: (1000, 45, 955, 4), rows["eur_id"]: (100, 40, 60, 2)}
+
+
+async def test_group_by_category_and_type(client, rows):
+    by_category = {(item["category_id"], item["currency_id"]): _totals(item)
+                   for item in await _summary(client, group_by="category")}
+    assert by_category == {(rows["category_id"], rows["usd_id"]): (1000, 15, 985, 3),
+                           (rows["other_category_id"], rows["usd_id"]): (0, 30, -30, 1),
+                           (rows["category_id"], rows["eur_id"]): (100, 40, 60, 2)}
+
+    by_type = {(item["transaction_type_id"], item["currency_id"]): item["count"]
+               for item in await _summary(client, group_by="type")}
+    assert by_type == {(rows["income_type_id"], rows["usd_id"]): 1, (rows["expense_type_id"], rows["usd_id"]): 3,
+                       (rows["income_type_id"], rows["eur_id"]): 1, (rows["expense_type_id"], rows["eur_id"]): 1}
+
+
+@pytest.mark.parametrize("period, expected", [
+    ("day", {"2026-03-02": 2, "2026-03-04": 1, "2026-03-10": 1}),
+    ("week", {"2026-03-02": 3, "2026-03-09": 1}),
+    ("month", {"2026-03-01": 4}),
+])
+async def test_group_by_period(client, rows, period, expected):
+    items = await _summary(client, period=period)
+
+    assert {item["period"]: item["count"] for item in items if item["currency_id"] == rows["usd_id"]} == expected
+
+
+async def test_date_bounds_are_inclusive(client, rows):
+    items = await _summary(client, date_from="2026-03-04", date_to="2026-04-01")
+
+    assert {item["currency_id"]: _totals(item) for item in items} == {rows["usd_id"]: (0, 35, -35, 2),
+                                                                      rows["eur_id"]: (0, 40, -40, 1)}
+
+
+async def test_a_user_without_transactions_gets_no_items(client):
+    assert await _summary(client, group_by=["category", "type"], period="month") == []
@@ -0,0 +1,48 @@
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from core.models.transactions import Transactions
+from core.schemas.transaction import TransactionFilter
+from crud.transaction_query import build_transaction_page_query
+from crud.transactions import OUT_COLUMNS
+
+
+def _page_query(user_id: int, **filters):
+    return build_transaction_page_query(select(*(getattr(Transactions, name) for name in OUT_COLUMNS)),
+                                        user_id=user_id, filters=TransactionFilter(**filters), limit=50)
+
+
+def _indexes(nodes: list[dict]) -> set[str]:
+    return {node["Index Name"] for node in nodes if "Index Name" in node}
+
+
+def _seq_scanned(nodes: list[dict]) -> bool:
+    return any(node["Node Type"] == "Seq Scan" and node.get("Relation Name") == "transactions" for node in nodes)
+
+
+async def test_newest_first_page_walks_user_date_index(seeded_user_ids, explain):
+    nodes = await explain(_page_query(seeded_user_ids[0], sort="-date"))
+
+    assert "ix_transactions_user_id_date_id" in _indexes(nodes)
+    assert not _seq_scanned(nodes)
+    # Rows come out of the index already ordered, so no sort step is needed.
+    assert not any(node["Node Type"] == "Sort" for node in nodes)
+
+
+async def test_keyset_page_walks_user_date_index(seeded_user_ids, explain):
+    query = build_transaction_page_query(select(Transactions.id), user_id=seeded_user_ids[1],
+                                         filters=TransactionFilter(sort="-date"), limit=50,
+                                         cursor=(date.today() - timedelta(days=300), 10**9))
+    nodes = await explain(query)
+
+    assert "ix_transactions_user_id_date_id" in _indexes(nodes)
+    assert not _seq_scanned(nodes)
+
+
+async def test_category_filter_uses_an_index(seeded_user_ids, reference_ids, explain):
+    nodes = await explain(_page_query(seeded_user_ids[2], category_id=reference_ids["category_id"],
+                                      date_from=date.today() - timedelta(days=30), date_to=date.today()))
+
+    assert _indexes(nodes) & {"ix_transactions_user_id_category_id_date", "ix_transactions_user_id_date_id"}
+    assert not _seq_scanned(nodes)
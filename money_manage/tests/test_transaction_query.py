@@ -0,0 +1,50 @@
+import logging
+from datetime import date, timedelta
+
+import pytest
+
+from core.config import settings
+from core.schemas.transaction import TransactionFilter
+from crud.transaction_query import check_query_cost, QueryRejected
+
+TODAY = date(2026, 10, 18)
+WINDOW = {"date_from": TODAY - timedelta(days=30), "date_to": TODAY}
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"category_id": 3},
+    {"date_from": TODAY},
+    {"sort": "date"},
+    {"sort": "-amount", **WINDOW},
+    {"amount_min": 10, "currency_id": 2, "transaction_type_id": 1, **WINDOW},
+])
+def test_indexed_queries_are_allowed(filters):
+    check_query_cost(user_id=1, filters=TransactionFilter(**filters))
+
+
+@pytest.mark.parametrize("filters", [
+    {"sort": "amount"},
+    {"amount_max": 100},
+    {"currency_id": 2},
+    {"transaction_type_id": 1},
+    {"currency_id": 2, "date_from": TODAY - timedelta(days=30)},
+    {"transaction_type_id": 1, "date_from": TODAY - timedelta(days=settings.query.max_scan_days), "date_to": TODAY},
+])
+def test_unbounded_scans_are_rejected(filters):
+    with pytest.raises(QueryRejected):
+        check_query_cost(user_id=1, filters=TransactionFilter(**filters))
+
+
+def test_amount_sort_cannot_use_a_cursor():
+    with pytest.raises(QueryRejected, match="cursor"):
+        check_query_cost(user_id=1, filters=TransactionFilter(sort="amount", **WINDOW), cursor=(TODAY, 5))
+
+
+def test_rejections_log_filter_names_without_values(caplog):
+    with caplog.at_level(logging.WARNING, logger="money_manage.slow_query"), pytest.raises(QueryRejected):
+        check_query_cost(user_id=1, filters=TransactionFilter(currency_id=987654, amount_min=123456.75))
+
+    message = caplog.records[-1].getMessage()
+    assert "currency_id" in message and "amount_min" in message
+    assert "987654" not in message and "123456" not in message
@@ -0,0 +1,94 @@
+from sqlalchemy import event, insert, select
+
+from core.config import settings
+from core.db_connection.db_helper import db_helper
+from core.models.transactions import Transactions
+from core.schemas.transaction import TransactionOut
+
+API = f"{settings.api.prefix}/transactions"
+
+
+async def test_add_then_get(client, new_transaction):
+    response = await client.post(f"{API}/add", json=new_transaction())
+    assert response.status_code == 201, response.text
+    created = response.json()
+    assert created["user_id"] == client.user_id
+
+    response = await client.get(f"{API}/get_transaction", params={"transaction_id": created["id"]})
+    assert response.status_code == 200
+    assert response.json()["description"] == "Coffee"
+
+
+async def test_list_pages_by_cursor(client, new_transaction):
+    for amount in range(1, 6):
+        response = await client.post(f"{API}/add", json=new_transaction(amount=amount))
+        assert response.status_code == 201
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get(f"{API}/get_transactions", params=params)).json()
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen)) == 5
+
+
+async def test_requests_without_tokens_are_rejected(client, new_transaction):
+    created = (await client.post(f"{API}/add", json=new_transaction())).json()
+
+    client.cookies.clear()
+    response = await client.get(f"{API}/get_transaction", params={"transaction_id": created["id"]})
+    assert response.status_code == 401
+
+
+async def test_update_returns_the_row_without_reading_it_back(client, new_transaction, reference_ids):
+    created = (await client.post(f"{API}/add", json=new_transaction())).json()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db_helper.engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await client.patch(f"{API}/update_transaction", params={"transaction_id": created["id"]},
+                                      json={"amount": 8, "currency_id": reference_ids["eur_id"]})
+    finally:
+        event.remove(db_helper.engine.sync_engine, "before_cursor_execute", record)
+
+    assert response.status_code == 201, response.text
+    updated = TransactionOut.model_validate(response.json())
+    assert (updated.id, updated.amount, updated.currency_id, updated.description) == \
+           (created["id"], 8, reference_ids["eur_id"], "Coffee")
+    assert updated.created_at.isoformat() == created["created_at"]
+    assert not [statement for statement in statements if statement.lstrip().upper().startswith("SELECT")]
+
+
+async def test_update_of_a_missing_or_foreign_transaction_is_404(client, session, user_id, new_transaction):
+    foreign_id = await session.scalar(insert(Transactions).values(user_id=user_id, **new_transaction())
+                                      .returning(Transactions.id))
+    await session.commit()
+
+    for transaction_id in (foreign_id, foreign_id + 10**6):
+        response = await client.patch(f"{API}/update_transaction", params={"transaction_id": transaction_id},
+                                      json={"amount": 1})
+        assert response.status_code == 404
+
+    assert await session.scalar(select(Transactions.amount).filter(Transactions.id == foreign_id)) == 3.5
+
+
+async def test_update_rejects_nulls_for_required_columns(client, new_transaction):
+    created = (await client.post(f"{API}/add", json=new_transaction())).json()
+
+    for body in ({"amount": None}, {"category_id": None}, {"amount": -1}):
+        response = await client.patch(f"{API}/update_transaction", params={"transaction_id": created["id"]},
+                                      json=body)
+        assert response.status_code == 422, body
+        assert "UPDATE" not in response.text
+
+    response = await client.patch(f"{API}/update_transaction", params={"transaction_id": created["id"]},
+                                  json={"description": None})
+    assert response.status_code == 201
+    assert response.json()["description"] is None